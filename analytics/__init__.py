@@ -0,0 +1,2 @@
+# Shared, Streamlit-free computations used by the dashboard pages.
+# Pages wrap these helpers in st.cache_data so each result is built once per dataset.
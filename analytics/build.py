@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import io
+import json
+import zipfile
+
+import pandas as pd
+
+from analytics.datasets import BUILD_DIR, DATASETS, MANIFEST_PATH, RAW_DIR
+from analytics.panel import year_columns
+
+WORLD_BANK = {
+    "gdp": 'API_NY.GDP.MKTP.CD_DS2_en_csv_v2_2.zip',
+    "gdp_growth": 'API_NY.GDP.MKTP.KD.ZG_DS2_en_csv_v2_101.zip',
+    "gdp_per_capita": 'API_NY.GDP.PCAP.PP.CD_DS2_en_csv_v2_47.zip',
+}
+# Population (SP.POP.TOTL) weights the per-capita roll-ups of the aggregation cube. It is an
+# optional input: the artifact is built whenever its World Bank download is in Datasets/raw.
+POPULATION = next(iter(sorted(RAW_DIR.glob("API_SP.POP.TOTL_DS2_*.zip"))), None)
+if POPULATION is not None:
+    WORLD_BANK["population"] = POPULATION.name
+UNEMPLOYMENT_CURATED = 'unemployment-rate-curated.csv'
+UNEMPLOYMENT_IMF = 'unemployment-rate-imf.csv'
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _source(name):
+    path = RAW_DIR / name
+    return {"path": str(path.relative_to(RAW_DIR.parent)), "sha256": _sha256(path.read_bytes())}
+
+
+def _read_zip_member(archive_name, prefix, **kwargs):
+    with zipfile.ZipFile(RAW_DIR / archive_name) as archive:
+        member = next(name for name in archive.namelist() if name.startswith(prefix))
+        return pd.read_csv(archive.open(member), **kwargs)
+
+
+def build_country_metadata():
+    metadata = _read_zip_member(WORLD_BANK["gdp"], "Metadata_Country_")
+    metadata = metadata.dropna(subset=["Region"]).rename(columns={"TableName": "Country", "IncomeGroup": "Income Group"})
+    metadata["Income Group"] = metadata["Income Group"].fillna("Unclassified")
+    metadata = metadata[["Country Code", "Country", "Region", "Income Group"]].sort_values("Country Code")
+    steps = [
+        "read Metadata_Country_*.csv from the World Bank GDP download",
+        "drop aggregates (rows without a region)",
+        "missing income group -> 'Unclassified'",
+    ]
+    return metadata, [_source(WORLD_BANK["gdp"])], steps
+
+
+def build_world_bank(name, countries_only):
+    raw = _read_zip_member(WORLD_BANK[name], "API_", skiprows=4)
+    data = raw[["Country Name", "Country Code"] + year_columns(raw)]
+    steps = [f"read API_*.csv from {WORLD_BANK[name]}", "drop Indicator Name/Code and empty trailing columns"]
+    if countries_only:
+        metadata, _, _ = build_country_metadata()
+        data = data[data["Country Code"].isin(metadata["Country Code"])]
+        steps.append("keep individual economies listed in the country metadata")
+    return data.reset_index(drop=True), [_source(WORLD_BANK[name])], steps
+
+
+def build_unemployment():
+    spec = DATASETS["unemployment"]
+    data = pd.read_csv(RAW_DIR / UNEMPLOYMENT_CURATED)
+    # The curated file repeats some (country, year) pairs with two different values; the
+    # later row is the one that agrees with the IMF source, so it is the one kept
+    data = data.drop_duplicates(subset=[spec["name_col"], spec["year_col"]], keep="last")
+    data = data[[spec["name_col"], spec["code_col"], spec["year_col"], spec["value_col"]]]
+    data = data.sort_values([spec["name_col"], spec["year_col"]]).reset_index(drop=True)
+    steps = [
+        f"read {UNEMPLOYMENT_CURATED} (superset of the earlier cleaned/merged unemployment files)",
+        "drop duplicate (Entity, Year) rows, keeping the later row that matches the IMF source",
+        "sort by Entity, Year",
+    ]
+    return data, [_source(UNEMPLOYMENT_CURATED), _source(UNEMPLOYMENT_IMF)], steps
+
+
+def build_growth_unemployment():
+    # Real GDP growth and the unemployment rate of every economy aligned by ISO3 code and
+    # year, with the year-on-year change in unemployment that Okun's law relates to growth
+    u_spec = DATASETS["unemployment"]
+    metadata, _, _ = build_country_metadata()
+    growth, growth_sources, _ = build_world_bank("gdp_growth", countries_only=True)
+    unemployment, unemployment_sources, _ = build_unemployment()
+
+    growth = growth.melt(id_vars="Country Code", value_vars=year_columns(growth), var_name="Year", value_name="GDP Growth")
+    growth["Year"] = growth["Year"].astype(int)
+    unemployment = unemployment.rename(columns={
+        u_spec["code_col"]: "Country Code", u_spec["year_col"]: "Year", u_spec["value_col"]: "Unemployment Rate",
+    })[["Country Code", "Year", "Unemployment Rate"]]
+
+    panel = growth.merge(unemployment, on=["Country Code", "Year"], how="outer")
+    panel = panel.merge(metadata[["Country Code", "Country"]], on="Country Code")
+    panel = panel.dropna(subset=["GDP Growth", "Unemployment Rate"], how="all")
+    panel = panel.sort_values(["Country Code", "Year"]).reset_index(drop=True)
+    by_country = panel.groupby("Country Code")
+    consecutive = by_country["Year"].diff() == 1
+    panel["Unemployment Change"] = by_country["Unemployment Rate"].diff().where(consecutive)
+    panel = panel[["Country Code", "Country", "Year", "GDP Growth", "Unemployment Rate", "Unemployment Change"]]
+    steps = [
+        "melt the GDP growth artifact's individual economies to (Country Code, Year) rows",
+        "rename the unemployment artifact's Code/Year/rate columns to the same keys",
+        "outer join on (Country Code, Year); keep economies in the country metadata and take their names from it",
+        "drop rows with neither value",
+        "Unemployment Change = rate minus the previous year's rate (missing when that year is missing)",
+    ]
+    return panel, growth_sources + unemployment_sources, steps
+
+
+BUILDERS = {
+    "gdp": lambda: build_world_bank("gdp", countries_only=True),
+    "gdp_growth": lambda: build_world_bank("gdp_growth", countries_only=False),
+    "gdp_per_capita": lambda: build_world_bank("gdp_per_capita", countries_only=True),
+    "unemployment": build_unemployment,
+    "country_metadata": build_country_metadata,
+    "growth_unemployment": build_growth_unemployment,
+}
+if POPULATION is not None:
+    BUILDERS["population"] = lambda: build_world_bank("population", countries_only=True)
+
+
+def _to_parquet_bytes(frame):
+    # Schema metadata (library versions) is stripped so identical data gives identical bytes
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(frame, preserve_index=False).replace_schema_metadata(None)
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def build(names=None):
+    # Write one content-addressed artifact per dataset plus a manifest with its lineage
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = {"artifacts": {}}
+    if MANIFEST_PATH.exists():
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+
+    for name in names or BUILDERS:
+        frame, sources, steps = BUILDERS[name]()
+        data = _to_parquet_bytes(frame)
+        digest = _sha256(data)
+        file_name = f"{name}-{digest[:12]}.parquet"
+        previous = manifest["artifacts"].get(name)
+        if previous and previous["file"] != file_name:
+            (BUILD_DIR / previous["file"]).unlink(missing_ok=True)
+        (BUILD_DIR / file_name).write_bytes(data)
+        manifest["artifacts"][name] = {
+            "file": file_name,
+            "sha256": digest,
+            "rows": len(frame),
+            "columns": len(frame.columns),
+            "sources": sources,
+            "steps": steps,
+        }
+        print(f"{name}: {file_name} ({len(frame)} rows, {len(data):,} bytes)")
+
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the canonical dataset artifacts from Datasets/raw.")
+    parser.add_argument("datasets", nargs="*", help=f"datasets to rebuild: {', '.join(BUILDERS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = set(args.datasets) - set(BUILDERS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+    build(args.datasets or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+def cumulative_log_growth(values):
+    # Running log output level implied by growth rates in percent: column j holds the
+    # level at the end of year j relative to the start of the panel. Missing years add
+    # zero growth; their running count is kept so windows spanning a gap can be rejected.
+    log_growth = np.nan_to_num(np.log1p(values / 100.0), nan=0.0)
+    return {
+        "levels": np.cumsum(log_growth, axis=1),
+        "missing": np.cumsum(np.isnan(values), axis=1),
+    }
+
+
+def log_levels(values):
+    # Log of a level series (e.g. GDP in USD); non-positive or missing values become NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        levels = np.where(values > 0, np.log(values), np.nan)
+    return {"levels": levels, "missing": np.zeros(values.shape, dtype=int)}
+
+
+def cagr(cumulative, start_idx, end_idx, span):
+    # Compound annual and cumulative growth (%) of every country between two year columns.
+    # Each is a single subtraction on the precomputed cumulative log arrays.
+    log_change = cumulative["levels"][:, end_idx] - cumulative["levels"][:, start_idx]
+    gaps = cumulative["missing"][:, end_idx] - cumulative["missing"][:, start_idx]
+    log_change = np.where(gaps > 0, np.nan, log_change)
+    return np.expm1(log_change / span) * 100, np.expm1(log_change) * 100
+
+
+def cagr_table(names, codes, years, cumulative, start_year, end_year):
+    # Ranked CAGR table for one start/end pair
+    years = np.asarray(years)
+    start_idx = int(np.searchsorted(years, start_year))
+    end_idx = int(np.searchsorted(years, end_year))
+    annual, total = cagr(cumulative, start_idx, end_idx, end_year - start_year)
+    table = pd.DataFrame({
+        "Country": names,
+        "Country Code": codes,
+        "CAGR (%)": annual,
+        "Cumulative Growth (%)": total,
+    }).dropna()
+    table = table.sort_values("CAGR (%)", ascending=False).reset_index(drop=True)
+    table.insert(0, "Rank", np.arange(1, len(table) + 1))
+    return table
@@ -0,0 +1,158 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# Figure attributes that hold coordinates or values, as opposed to labels or text
+FIGURE_DATA_KEYS = ("x", "y", "z", "lat", "lon", "values", "base", "width")
+
+
+def _as_float32(original, tolerance, abs_tolerance=None):
+    # float32 copy of a float64 array, or None when the round trip would exceed `tolerance`
+    # relative error or, when given, `abs_tolerance` absolute error
+    as32 = original.astype(np.float32)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        absolute = np.abs(as32.astype(float) - original)
+        error = absolute / np.abs(original)
+    if np.nanmax(np.where(original != 0, error, 0.0), initial=0.0) > tolerance:
+        return None
+    if abs_tolerance is not None and np.nanmax(absolute, initial=0.0) > abs_tolerance:
+        return None
+    return as32
+
+
+def compact_frame(frame, tolerance=1e-6, abs_tolerance=1e-3):
+    # Smaller dtypes for a loaded dataset: float64 -> float32 when the round trip stays
+    # within `tolerance` relative and `abs_tolerance` absolute error, integers downcast, and
+    # repeated text labels (at most one distinct value per two rows) as categoricals.
+    # float32 always holds 24 bits, so the relative check alone passes any float column;
+    # the absolute one keeps level series (GDP in USD, population) in float64 and lets
+    # rates and percentages go to float32. NaN stays the missing-value marker.
+    compact = {}
+    for col, values in frame.items():
+        if pd.api.types.is_float_dtype(values):
+            as32 = _as_float32(values.to_numpy(dtype=float), tolerance, abs_tolerance)
+            if as32 is not None:
+                values = pd.Series(as32, index=frame.index, name=col)
+        elif pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            if values.nunique() * 2 <= len(values):
+                values = values.astype("category")
+        compact[col] = values
+    return pd.DataFrame(compact, index=frame.index)
+
+
+def compact_array(values, tolerance=1e-6):
+    # Smallest typed array holding one figure data array, or None when it is not numeric.
+    # Numeric text such as year labels ("1990") becomes numbers; Plotly sends typed arrays
+    # as base64 binary instead of JSON number text.
+    values = np.asarray(values)
+    if values.dtype.kind in "OUS":
+        try:
+            values = values.astype(float)
+        except (TypeError, ValueError):
+            return None
+    if values.dtype.kind == "f":
+        if not values.size or not np.isfinite(values).all() or (values != np.round(values)).any():
+            as32 = _as_float32(values.astype(float), tolerance)
+            return values if as32 is None else as32
+    elif values.dtype.kind not in "iu" or not values.size:
+        return None
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values
+
+
+def _fold_constant_customdata(props):
+    # px repeats hover columns such as the country name on every point of a trace; when a
+    # column is the same text throughout, write it into the hover template once instead
+    customdata = props.get("customdata")
+    template = props.get("hovertemplate")
+    if customdata is None or not isinstance(template, str):
+        return
+    customdata = np.asarray(customdata, dtype=object)
+    if customdata.ndim != 2 or not len(customdata):
+        return
+    first = customdata[0]
+    if not all(isinstance(value, str) for value in first) or not (customdata == first).all():
+        return
+    for j, value in enumerate(first):
+        template = template.replace(f"%{{customdata[{j}]}}", value)
+    if "customdata" not in template:
+        props["hovertemplate"] = template
+        del props["customdata"]
+
+
+def compact_figure(fig, tolerance=1e-6):
+    # Copy of a Plotly figure with a smaller wire payload: coordinate arrays as compact typed
+    # arrays and constant per-trace hover text folded into templates. The figure passed in is
+    # left untouched, since it may be a cached object shared by every session. Works on the
+    # raw trace dicts (fig._data); going through the validated property API costs more than
+    # the serialization it saves on charts with hundreds of traces.
+    import plotly.graph_objects as go
+
+    traces = []
+    for props in fig._data:
+        props = dict(props)
+        for key in FIGURE_DATA_KEYS:
+            values = props.get(key)
+            if values is not None and not np.isscalar(values):
+                compact = compact_array(values, tolerance)
+                if compact is not None:
+                    props[key] = compact
+        marker = props.get("marker")
+        if isinstance(marker, dict):
+            marker = props["marker"] = dict(marker)
+            for key in ("size", "color"):
+                values = marker.get(key)
+                if values is not None and not np.isscalar(values):
+                    compact = compact_array(values, tolerance)
+                    if compact is not None:
+                        marker[key] = compact
+        _fold_constant_customdata(props)
+        traces.append(props)
+    compact = go.Figure({"data": traces, "layout": fig._layout}, _validate=False)
+    compact._compact = True
+    return compact
+
+
+def deep_size(obj, _seen=None):
+    # Approximate bytes held by an object, following containers and counting
+    # pandas/NumPy buffers once even when several objects share them
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        base = obj if obj.base is None else obj.base
+        if id(base) in seen and base is not obj:
+            return 0
+        seen.add(id(base))
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_size(item, seen) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def process_rss():
+    # Resident memory of this process in bytes (peak RSS where /proc is unavailable)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def growth_contributions(levels, growth, years):
+    # Contribution of every economy to world GDP growth in every year, in percentage points:
+    # its share of the previous year's world GDP times its real growth that year, for all
+    # (country, year) cells in one pass over the GDP level and growth (%) matrices, whose rows
+    # are the same countries. Economies without a previous level or a growth rate that year
+    # are left out and the shares renormalized over the rest; coverage is the share of the
+    # previous year's world GDP that was counted.
+    previous = levels[:, :-1]
+    current_growth = growth[:, 1:]
+    with np.errstate(invalid="ignore"):
+        counted = (previous > 0) & ~np.isnan(current_growth)
+    counted_levels = np.where(counted, previous, 0.0)
+    counted_total = counted_levels.sum(axis=0)
+    world_total = np.nansum(np.where(previous > 0, previous, 0.0), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = counted_levels / counted_total
+        coverage = counted_total / world_total
+    contributions = weights * np.where(counted, current_growth, 0.0)
+    return {
+        "years": np.asarray(years)[1:],
+        "contributions": contributions,
+        "world": np.where(counted_total > 0, contributions.sum(axis=0), np.nan),
+        "coverage": coverage,
+    }
+
+
+def top_contributors(panel, n, start_idx=0, end_idx=None):
+    # Rows of the n economies with the largest absolute contributions summed over the year
+    # columns start_idx:end_idx, and the remaining economies' contributions summed per year
+    window = panel["contributions"][:, start_idx:end_idx]
+    top = np.argsort(-np.abs(window).sum(axis=1), kind="stable")[:n]
+    return top, window.sum(axis=0) - window[top].sum(axis=0)
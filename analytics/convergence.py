@@ -0,0 +1,79 @@
+import numpy as np
+
+
+def log_income(values):
+    # Log of income per capita; zero or missing values (filled gaps) are dropped
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(values > 0, np.log(values), np.nan)
+
+
+def sigma_convergence(log_values):
+    # Cross-sectional dispersion of log income for each year
+    return np.nanstd(log_values, axis=0, ddof=1)
+
+
+def beta_convergence(log_values, years):
+    # Cross-country regression of annualised growth on initial log income for every
+    # (start, end) window at once. All the per-window sums come from a handful of matrix
+    # products over the validity mask, so entry [s, e] of each result is the fit for the
+    # window years[s] -> years[e] and no window is refitted separately.
+    valid = ~np.isnan(log_values)
+    v = valid.astype(float)
+    x = np.where(valid, log_values, 0.0)
+
+    n = v.T @ v                    # countries observed in both years
+    sx = x.T @ v                   # sum of start-year log income
+    sxx = (x ** 2).T @ v           # sum of squared start-year log income
+    sxe = x.T @ x                  # sum of start * end log income
+    se = sx.T                      # sum of end-year log income
+    see = sxx.T                    # sum of squared end-year log income
+
+    dt = (years[None, :] - years[:, None]).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # growth g = (x_end - x_start) / dt
+        sg = (se - sx) / dt
+        sxg = (sxe - sxx) / dt
+        sgg = (see - 2 * sxe + sxx) / dt ** 2
+
+        var_x = n * sxx - sx ** 2
+        cov_xg = n * sxg - sx * sg
+        var_g = n * sgg - sg ** 2
+        beta = cov_xg / var_x
+        intercept = (sg - beta * sx) / n
+        r_squared = cov_xg ** 2 / (var_x * var_g)
+        # Implied speed of convergence and half-life, defined only for beta < 0
+        speed = -np.log1p(beta * dt) / dt
+        half_life = np.where(speed > 0, np.log(2) / speed, np.nan)
+
+    invalid = (dt <= 0) | (n < 3)
+    for result in (beta, intercept, r_squared, speed, half_life):
+        result[invalid] = np.nan
+
+    return {
+        "beta": beta,
+        "intercept": intercept,
+        "r_squared": r_squared,
+        "speed": speed,
+        "half_life": half_life,
+        "n": n.astype(int),
+    }
+
+
+def convergence_panel(values, years):
+    # Sigma and beta convergence for the whole panel, built once and then indexed by window
+    log_values = log_income(values)
+    results = beta_convergence(log_values, years)
+    results["sigma"] = sigma_convergence(log_values)
+    results["years"] = years
+    results["log_values"] = log_values
+    return results
+
+
+def window_growth(panel, start_year, end_year):
+    # Initial log income and annualised growth per country for one window (a slice, no refit)
+    years = panel["years"]
+    s = int(np.searchsorted(years, start_year))
+    e = int(np.searchsorted(years, end_year))
+    initial = panel["log_values"][:, s]
+    growth = (panel["log_values"][:, e] - initial) / (years[e] - years[s])
+    return initial, growth, s, e
@@ -0,0 +1,61 @@
+import numpy as np
+from scipy.cluster.hierarchy import leaves_list, linkage, optimal_leaf_ordering
+from scipy.spatial.distance import squareform
+
+MIN_PERIODS = 10
+
+
+def standardize(values):
+    # Each row centred on its own mean and scaled to unit variance over the years it is
+    # observed; gaps become 0, so they add nothing to a product with another row
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=1, keepdims=True) / count
+        centred = np.where(observed, values - mean, 0.0)
+        std = np.sqrt((centred ** 2).sum(axis=1, keepdims=True) / (count - 1))
+        z = np.where(std > 0, centred / std, 0.0)
+    return z, observed
+
+
+def correlation_matrix(values, min_periods=MIN_PERIODS):
+    # Pearson correlation of every pair of rows (countries) of a country x year panel over the
+    # years both are observed, from matrix products instead of one fit per pair. The main
+    # product is the standardized panel with itself; the products with the observation mask
+    # correct each pair for the years only one of the two rows has (all zero without gaps).
+    # Pairs observed together in fewer than `min_periods` years are NaN.
+    z, observed = standardize(values)
+    v = observed.astype(float)
+    n = v @ v.T                    # years both rows are observed
+    szz = z @ z.T                  # sum of z_i * z_j over those years
+    sz = z @ v.T                   # sum of z_i over the years row j is observed
+    szsq = (z ** 2) @ v.T          # sum of z_i ** 2 over the same years
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = szz - sz * sz.T / n
+        var = szsq - sz ** 2 / n
+        corr = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+    corr[n < min_periods] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+    return corr, n
+
+
+def cluster_order(corr):
+    # Row order that puts countries with similar growth cycles next to each other:
+    # average-linkage clustering on 1 - correlation (unknown pairs count as unrelated)
+    if len(corr) < 3:
+        return np.arange(len(corr))
+    distance = 1.0 - np.nan_to_num(corr, nan=0.0)
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0.0)
+    condensed = squareform(np.clip(distance, 0.0, 2.0), checks=False)
+    return leaves_list(optimal_leaf_ordering(linkage(condensed, "average"), condensed))
+
+
+def strongest_pairs(corr, n=10):
+    # Row/column indices of the n most positively and the n most negatively correlated pairs
+    rows, cols = np.triu_indices(len(corr), k=1)
+    values = corr[rows, cols]
+    known = ~np.isnan(values)
+    rows, cols, values = rows[known], cols[known], values[known]
+    order = np.argsort(values)
+    return (rows[order[::-1][:n]], cols[order[::-1][:n]]), (rows[order[:n]], cols[order[:n]])
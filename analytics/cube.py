@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from analytics.datasets import DATASETS, load_manifest, read_dataset
+from analytics.panel import year_columns
+
+LEVELS = ["Country", "Region", "Income Group", "World"]
+
+# How each indicator rolls up: GDP is additive and the rates are GDP-weighted averages
+MEASURES = {
+    "GDP": {"dataset": "gdp", "aggregation": "sum"},
+    "GDP Growth": {"dataset": "gdp_growth", "aggregation": "weighted", "weight": "gdp"},
+    "Unemployment Rate": {"dataset": "unemployment", "aggregation": "weighted", "weight": "gdp"},
+}
+
+# GDP per capita rolls up population-weighted (total GDP over total population of the group).
+# Population is an optional build input, so it is only a measure once that artifact exists.
+PER_CAPITA = {"GDP per Capita": {"dataset": "gdp_per_capita", "aggregation": "weighted", "weight": "population"}}
+
+
+def available_measures(manifest=None):
+    manifest = manifest or load_manifest()
+    if "population" in manifest["artifacts"]:
+        return {**MEASURES, **PER_CAPITA}
+    return MEASURES
+
+
+def load_country_metadata():
+    # Region and income group of every economy; aggregates such as "World" or
+    # "High income" are not part of the metadata artifact
+    return read_dataset("country_metadata")
+
+
+def _load_wide(dataset):
+    # Dataset as a wide (ISO3 code x year) frame
+    spec = DATASETS[dataset]
+    data = read_dataset(dataset)
+    if spec["layout"] == "long":
+        wide = data.pivot_table(index=spec["code_col"], columns=spec["year_col"], values=spec["value_col"])
+    else:
+        cols = year_columns(data)
+        wide = data.set_index(spec["code_col"])[cols]
+        wide.columns = wide.columns.astype(int)
+    return wide[~wide.index.duplicated()]
+
+
+def _aggregate(membership, values, weights=None):
+    # Sum (or weighted mean when weights are given) of each group for every year,
+    # as one matrix product over the one-hot membership matrix
+    valid = ~np.isnan(values)
+    if weights is None:
+        totals = membership @ np.where(valid, values, 0.0)
+        observed = membership @ valid
+        return np.where(observed > 0, totals, np.nan)
+    usable = valid & ~np.isnan(weights)
+    w = np.where(usable, weights, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (membership @ (w * np.where(usable, values, 0.0))) / (membership @ w)
+
+
+def build_cube(measures=None):
+    # Roll every measure up the country -> region / income group -> world hierarchy for
+    # all years at once. Queries afterwards are row/column lookups into the stored matrices.
+    metadata = load_country_metadata()
+    codes = metadata["Country Code"].to_numpy()
+    specs = available_measures()
+    measures = measures or list(specs)
+    frames = {name: _load_wide(specs[name]["dataset"]) for name in set(measures) | {"GDP"}}
+    all_years = np.concatenate([frame.columns.to_numpy(dtype=int) for frame in frames.values()])
+    years = np.arange(all_years.min(), all_years.max() + 1)
+    matrices = {
+        name: frames[name].reindex(index=codes, columns=years).to_numpy(dtype=float)
+        for name in measures
+    }
+
+    # Weights; the latest known value carries forward into years it has not been published for
+    weight_frames = {"gdp": frames["GDP"]}
+    if "GDP per Capita" in measures:
+        weight_frames["population"] = _load_wide("population")
+    weights = {
+        name: frame.reindex(index=codes, columns=years).ffill(axis=1).to_numpy(dtype=float)
+        for name, frame in weight_frames.items()
+    }
+
+    levels = {"Country": {"members": codes, "names": metadata["Country"].to_numpy(), "parent": {}}}
+    for level, column in [("Region", "Region"), ("Income Group", "Income Group")]:
+        labels, group = np.unique(metadata[column].to_numpy(), return_inverse=True)
+        levels[level] = {"members": labels, "membership": np.eye(len(labels))[group].T}
+        levels["Country"]["parent"][level] = labels[group]
+    levels["World"] = {"members": np.array(["World"]), "membership": np.ones((1, len(codes)))}
+
+    cube = {"years": years, "levels": levels, "metadata": metadata, "values": {}}
+    for level, info in levels.items():
+        cube["values"][level] = {}
+        for name, values in matrices.items():
+            if level == "Country":
+                cube["values"][level][name] = values
+            elif specs[name]["aggregation"] == "sum":
+                cube["values"][level][name] = _aggregate(info["membership"], values)
+            else:
+                cube["values"][level][name] = _aggregate(info["membership"], values, weights[specs[name]["weight"]])
+    return cube
+
+
+def country_values(cube, dataset):
+    # Country x year matrix of any dataset on the cube's axes, for indicators that are not measures
+    codes = cube["levels"]["Country"]["members"]
+    return _load_wide(dataset).reindex(index=codes, columns=cube["years"]).to_numpy(dtype=float)
+
+
+def rollup(cube, level, measure, year=None):
+    # Values of every member of a level: one year as a Series, or all years as a frame
+    members = cube["levels"][level]["members"]
+    values = cube["values"][level][measure]
+    if year is None:
+        return pd.DataFrame(values, index=members, columns=cube["years"])
+    year_idx = np.flatnonzero(cube["years"] == year)
+    column = values[:, year_idx[0]] if len(year_idx) else np.full(len(members), np.nan)
+    return pd.Series(column, index=members, name=measure)
+
+
+def drilldown(cube, level, member, measure, year):
+    # Countries belonging to one region or income group in one year ("World" drills into every country)
+    country_level = cube["levels"]["Country"]
+    countries = pd.DataFrame({
+        "Country Code": country_level["members"],
+        "Country": country_level["names"],
+        measure: rollup(cube, "Country", measure, year).to_numpy(),
+    })
+    if level != "World":
+        countries = countries[country_level["parent"][level] == member]
+    return countries.dropna(subset=[measure])
+
+
+def parent_of(cube, level):
+    # ISO3 code -> region or income group label
+    return dict(zip(cube["levels"]["Country"]["members"], cube["levels"]["Country"]["parent"][level]))
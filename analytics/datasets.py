@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+DATA_DIR = Path(__file__).parent.parent / 'Datasets'
+RAW_DIR = DATA_DIR / 'raw'
+BUILD_DIR = DATA_DIR / 'build'
+MANIFEST_PATH = BUILD_DIR / 'manifest.json'
+
+# Layout of each canonical indicator artifact produced by `python -m analytics.build`.
+# "wide" artifacts have one row per economy and one column per year,
+# "long" artifacts have one row per (country, year) observation.
+DATASETS = {
+    "gdp": {"layout": "wide", "name_col": "Country Name", "code_col": "Country Code"},
+    "gdp_growth": {"layout": "wide", "name_col": "Country Name", "code_col": "Country Code"},
+    "gdp_per_capita": {"layout": "wide", "name_col": "Country Name", "code_col": "Country Code"},
+    # Optional: only built when its World Bank download is in Datasets/raw (per-capita roll-ups)
+    "population": {"layout": "wide", "name_col": "Country Name", "code_col": "Country Code"},
+    "unemployment": {
+        "layout": "long", "name_col": "Entity", "code_col": "Code", "year_col": "Year",
+        "value_col": "Unemployment rate - Percent of total labor force - Observations",
+    },
+    "country_metadata": {"layout": "table", "name_col": "Country", "code_col": "Country Code"},
+    # GDP growth and unemployment joined by ISO3 code and year (Okun's law page)
+    "growth_unemployment": {"layout": "long", "name_col": "Country", "code_col": "Country Code", "year_col": "Year"},
+}
+
+
+def load_manifest():
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def artifact_hash(name, manifest=None):
+    # Content hash of the current artifact; changes whenever the built data changes
+    manifest = manifest or load_manifest()
+    return manifest["artifacts"][name]["sha256"]
+
+
+def artifact_path(name, manifest=None):
+    manifest = manifest or load_manifest()
+    return BUILD_DIR / manifest["artifacts"][name]["file"]
+
+
+def read_dataset(name):
+    # Canonical artifact of one indicator as a DataFrame
+    return pd.read_parquet(artifact_path(name))
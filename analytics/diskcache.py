@@ -0,0 +1,181 @@
+import argparse
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Derived results (statistics, rank indexes, figures) pickled into one SQLite file, so a
+# restarted or newly started worker comes back warm. SQLite's WAL mode and locking make the
+# file safe to share between worker processes; DISK_CACHE_DIR / DISK_CACHE_MAX_MB override
+# where it lives and how large it may grow before the least recently used entries go.
+ROOT = Path(__file__).parent.parent
+CACHE_DIR = Path(os.environ.get("DISK_CACHE_DIR") or ROOT / ".cache")
+CACHE_PATH = CACHE_DIR / "derived.sqlite"
+MAX_BYTES = int(float(os.environ.get("DISK_CACHE_MAX_MB", 512)) * 2**20)
+BUSY_TIMEOUT = 10.0
+
+_local = threading.local()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('writes', 0), ('evictions', 0), ('errors', 0);
+"""
+
+
+def _connection():
+    # One connection per thread and cache file (sqlite3 connections must stay on their thread)
+    connections = _local.__dict__.setdefault("connections", {})
+    connection = connections.get(CACHE_PATH)
+    if connection is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(CACHE_PATH, timeout=BUSY_TIMEOUT, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        connections[CACHE_PATH] = connection
+    return connection
+
+
+def _plain(part):
+    # NumPy scalars as Python values, so 2020 and np.int64(2020) give the same key
+    return part.item() if hasattr(part, "item") and getattr(part, "ndim", None) == 0 else part
+
+
+@functools.lru_cache(maxsize=1)
+def code_version():
+    # Digest of the app's Python sources: a deploy that changes how a result is computed
+    # must not be served results of the old code, while a plain restart stays warm
+    digest = hashlib.sha256()
+    for path in sorted(ROOT.glob("*.py")) + sorted(ROOT.glob("*/*.py")):
+        digest.update(path.relative_to(ROOT).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def cache_key(fn, key):
+    # Stable text key from the code version, the producing function and the caller's key
+    # (which carries the dataset hash), plus its digest as the primary key
+    label = repr((code_version(), fn.__module__, fn.__qualname__) + tuple(_plain(part) for part in key))
+    return hashlib.sha256(label.encode()).hexdigest(), label
+
+
+def _count(connection, name, amount=1):
+    connection.execute("UPDATE stats SET value = value + ? WHERE name = ?", (amount, name))
+
+
+def cache_get(fn, key):
+    # (True, value) for a stored result, (False, None) otherwise; a cache that cannot be read
+    # counts as a miss, never as a failure of the page
+    digest, _ = cache_key(fn, key)
+    try:
+        connection = _connection()
+        row = connection.execute("SELECT value FROM entries WHERE key = ?", (digest,)).fetchone()
+        if row is None:
+            _count(connection, "misses")
+            return False, None
+        connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), digest))
+        _count(connection, "hits")
+        return True, pickle.loads(row[0])
+    except Exception:
+        _record_error()
+        return False, None
+
+
+def cache_put(fn, key, value):
+    # Store a result, then evict least recently used entries until the file fits MAX_BYTES.
+    # Results that cannot be pickled (or do not fit at all) are simply not persisted.
+    digest, label = cache_key(fn, key)
+    try:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    if len(blob) > MAX_BYTES:
+        return False
+    try:
+        connection = _connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, label, blob, len(blob), now, now),
+            )
+            _count(connection, "writes")
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > MAX_BYTES:
+                evicted = 0
+                for old_key, size in connection.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                    if total <= MAX_BYTES:
+                        break
+                    connection.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                    total -= size
+                    evicted += 1
+                _count(connection, "evictions", evicted)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return True
+    except (sqlite3.Error, OSError):
+        _record_error()
+        return False
+
+
+def _record_error():
+    try:
+        _count(_connection(), "errors")
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def cache_stats():
+    # Totals across every process and restart since the cache file was created
+    try:
+        connection = _connection()
+        stats = dict(connection.execute("SELECT name, value FROM stats").fetchall())
+        stats["entries"], stats["bytes"] = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else float("nan")
+    stats["max_bytes"] = MAX_BYTES
+    stats["path"] = str(CACHE_PATH)
+    return stats
+
+
+def clear_cache():
+    connection = _connection()
+    connection.execute("DELETE FROM entries")
+    connection.execute("UPDATE stats SET value = 0")
+    connection.execute("VACUUM")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or clear the disk cache of derived results.")
+    parser.add_argument("--clear", action="store_true", help="delete every entry and reset the counters")
+    args = parser.parse_args(argv)
+    if args.clear:
+        clear_cache()
+    stats = cache_stats()
+    if stats is None:
+        parser.exit(1, f"Cannot open {CACHE_PATH}\n")
+    print(f"{stats['path']}: {stats['entries']:,} entries, {stats['bytes'] / 2**20:,.1f} of {stats['max_bytes'] / 2**20:,.0f} MB")
+    print(f"hits {stats['hits']:,}, misses {stats['misses']:,}, writes {stats['writes']:,}, "
+          f"evictions {stats['evictions']:,}, errors {stats['errors']:,}, hit rate {stats['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
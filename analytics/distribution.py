@@ -0,0 +1,22 @@
+import numpy as np
+
+# Percentiles of the cross-country distribution drawn as bands: the 90% and 50% ranges and
+# the median
+PERCENTILES = (5, 25, 50, 75, 95)
+# Years observed for fewer countries than this have no bands
+MIN_COUNTRIES = 3
+
+
+def percentile_bands(values, years, min_countries=MIN_COUNTRIES):
+    # Percentiles across countries for every year of a (country x year) matrix, all bands
+    # from one nanpercentile call over the matrix. Missing values are left out of each year;
+    # years with fewer than min_countries values are dropped.
+    counts = (~np.isnan(values)).sum(axis=0)
+    keep = counts >= max(min_countries, 1)
+    bands = np.nanpercentile(values[:, keep], PERCENTILES, axis=0) if keep.any() else np.empty((len(PERCENTILES), 0))
+    return {
+        "years": np.asarray(years)[keep],
+        "counts": counts[keep],
+        "percentiles": PERCENTILES,
+        "bands": bands,
+    }
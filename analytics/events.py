@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from analytics.cagr import cumulative_log_growth
+
+
+def _log_levels(values):
+    # Cumulative log output level with a leading zero column, so levels[:, j] is the
+    # level *before* year j and levels[:, j + 1] the level after it
+    levels = cumulative_log_growth(values)["levels"]
+    return np.hstack([np.zeros((values.shape[0], 1)), levels])
+
+
+def detect_recessions(names, codes, years, values):
+    # Every run of consecutive negative growth years, found for all countries in one pass
+    n_countries, n_years = values.shape
+    negative = np.zeros((n_countries, n_years + 2), dtype=np.int8)
+    negative[:, 1:-1] = values < 0
+    edges = np.diff(negative, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    ends = ends - 1
+
+    levels = _log_levels(values)
+    cols = np.arange(n_years)
+    in_run = (cols >= starts[:, None]) & (cols <= ends[:, None])
+    worst_year = np.where(in_run, values[rows], np.inf).min(axis=1)
+
+    # Depth: total output lost between the pre-recession peak and the trough
+    peak = levels[rows, starts]
+    trough = levels[rows, ends + 1]
+    depth = np.expm1(trough - peak) * 100
+
+    # Recovery: first year after the trough where output is back at the pre-recession peak
+    recovered = (levels[rows, 1:] >= peak[:, None] - 1e-12) & (cols > ends[:, None])
+    has_recovered = recovered.any(axis=1)
+    first_recovered = recovered.argmax(axis=1)
+    recovery_year = np.where(has_recovered, years[first_recovered], np.nan)
+
+    recessions = pd.DataFrame({
+        "Country Name": names[rows],
+        "Country Code": codes[rows],
+        "Start Year": years[starts],
+        "End Year": years[ends],
+        "Duration (Years)": ends - starts + 1,
+        "Worst Growth (%)": worst_year,
+        "Depth (%)": depth,
+        "Recovery Year": recovery_year,
+        "Recovery Time (Years)": recovery_year - years[ends],
+    })
+    return recessions, in_run
+
+
+def detect_structural_breaks(names, codes, years, values, min_segment=8, threshold=3.0):
+    # Largest shift in mean growth per country, scanned over every split point at once.
+    # Segment sums come from cumulative sums, so each split is O(1) instead of a refit.
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    count = np.cumsum(valid, axis=1)
+    total = np.cumsum(x, axis=1)
+    total_sq = np.cumsum(x ** 2, axis=1)
+
+    # Split k puts years[:k + 1] in the first regime and years[k + 1:] in the second
+    n1, s1, q1 = count[:, :-1], total[:, :-1], total_sq[:, :-1]
+    n2 = count[:, -1:] - n1
+    s2 = total[:, -1:] - s1
+    q2 = total_sq[:, -1:] - q1
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean1, mean2 = s1 / n1, s2 / n2
+        within = (q1 - s1 * mean1) + (q2 - s2 * mean2)
+        pooled_var = within / (n1 + n2 - 2)
+        stat = np.abs(mean2 - mean1) / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+    stat[(n1 < min_segment) | (n2 < min_segment) | ~np.isfinite(stat)] = -np.inf
+
+    best = stat.argmax(axis=1)
+    rows = np.arange(values.shape[0])
+    best_stat = stat[rows, best]
+    flagged = best_stat >= threshold
+
+    return pd.DataFrame({
+        "Country Name": names[flagged],
+        "Country Code": codes[flagged],
+        "Break Year": years[best[flagged] + 1],
+        "Mean Growth Before (%)": mean1[rows, best][flagged],
+        "Mean Growth After (%)": mean2[rows, best][flagged],
+        "Break Statistic": best_stat[flagged],
+    }).reset_index(drop=True)
+
+
+def build_event_index(names, codes, years, values):
+    # Precompute recession episodes, structural breaks and a year -> active episodes lookup
+    recessions, in_run = detect_recessions(names, codes, years, values)
+    breaks = detect_structural_breaks(names, codes, years, values)
+    by_year = {int(year): np.flatnonzero(in_run[:, j]) for j, year in enumerate(years)}
+    return {"recessions": recessions, "breaks": breaks, "by_year": by_year}
+
+
+def episodes_in_year(index, year):
+    # Recession episodes that include the given year ("who contracted in 2009")
+    ids = index["by_year"].get(int(year), np.array([], dtype=int))
+    return index["recessions"].iloc[ids]
+
+
+def country_events(index, country):
+    # Recession episodes and structural breaks for a single country
+    recessions = index["recessions"]
+    breaks = index["breaks"]
+    return (
+        recessions[recessions["Country Name"] == country],
+        breaks[breaks["Country Name"] == country],
+    )
@@ -0,0 +1,152 @@
+import argparse
+import sys
+
+import numpy as np
+
+from analytics.datasets import DATASETS, artifact_path
+from analytics.panel import year_columns
+
+CHUNK_ROWS = 50_000
+
+FORMATS = {
+    "CSV": {"extension": "csv", "mime": "text/csv"},
+    "Parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"},
+    "Arrow": {"extension": "arrows", "mime": "application/vnd.apache.arrow.stream"},
+}
+
+
+def iter_slices(frame, rows=None, columns=None, chunk_rows=CHUNK_ROWS):
+    # Yield the selected rows/columns of an in-memory frame chunk by chunk, so the
+    # filtered slice is never materialised as a whole. `rows` is a boolean mask or
+    # an array of row positions; `columns` a list of column names.
+    if rows is None:
+        positions = np.arange(len(frame))
+    else:
+        rows = np.asarray(rows)
+        positions = np.flatnonzero(rows) if rows.dtype == bool else rows
+    col_idx = slice(None) if columns is None else frame.columns.get_indexer(columns)
+    for start in range(0, max(len(positions), 1), chunk_rows):
+        yield frame.iloc[positions[start:start + chunk_rows], col_idx]
+
+
+def iter_file_slices(name, countries=None, years=None, chunk_rows=CHUNK_ROWS):
+    # Yield filtered chunks straight from a dataset artifact, one record batch at a time,
+    # without loading it whole. `countries` is a collection of ISO3 codes, `years` an
+    # inclusive (start, end) pair.
+    import pyarrow.parquet as pq
+
+    spec = DATASETS[name]
+    emitted = False
+    with pq.ParquetFile(artifact_path(name)) as reader:
+        for batch in reader.iter_batches(batch_size=chunk_rows):
+            chunk = batch.to_pandas()
+            if countries:
+                chunk = chunk[chunk[spec["code_col"]].isin(countries)]
+            if years and spec["layout"] == "long":
+                chunk = chunk[chunk[spec["year_col"]].between(*years)]
+            elif years:
+                keep = [col for col in year_columns(chunk) if years[0] <= int(col) <= years[1]]
+                labels = [col for col in chunk.columns if col not in year_columns(chunk)]
+                chunk = chunk[labels + keep]
+            if len(chunk) or not emitted:
+                emitted = True
+                yield chunk
+
+
+class _ByteSink:
+    # Minimal writable file that hands out what has been written since the last drain
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def _stream_arrow_tables(chunks, open_writer):
+    import pyarrow as pa
+
+    sink = _ByteSink()
+    writer = schema = None
+    for chunk in chunks:
+        if writer is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            schema = table.schema
+            writer = open_writer(sink, schema)
+        else:
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_parquet(chunks):
+    # One Parquet row group per chunk
+    import pyarrow.parquet as pq
+    return _stream_arrow_tables(chunks, lambda sink, schema: pq.ParquetWriter(sink, schema))
+
+
+def stream_arrow(chunks):
+    # Arrow IPC stream format, one record batch per chunk
+    import pyarrow as pa
+    return _stream_arrow_tables(chunks, lambda sink, schema: pa.ipc.new_stream(sink, schema))
+
+
+def stream(chunks, fmt):
+    # Encode an iterator of DataFrame chunks as an iterator of bytes in the given format
+    writers = {"CSV": stream_csv, "Parquet": stream_parquet, "Arrow": stream_arrow}
+    return writers[fmt](chunks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk extract of a dataset slice.")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("-f", "--format", choices=sorted(FORMATS), default="CSV")
+    parser.add_argument("-c", "--countries", help="comma-separated ISO3 codes, e.g. USA,CHN")
+    parser.add_argument("-y", "--years", help="inclusive year range, e.g. 2000-2020")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    countries = set(args.countries.split(",")) if args.countries else None
+    years = tuple(int(year) for year in args.years.split("-")) if args.years else None
+    chunks = iter_file_slices(args.dataset, countries, years, args.chunk_rows)
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for data in stream(chunks, args.format):
+            out.write(data)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import functools
+import pickle
+
+import plotly.express as px
+
+from analytics.compact import compact_figure
+
+# Figures of the multi-chart views, as plain functions of one shared data slice so they can be
+# built side by side in worker processes (see components.charts.build_figures). Each does its
+# own dataframe work from the slice.
+
+
+@functools.lru_cache(maxsize=2)
+def _frame(payload):
+    # The slice is pickled once per batch; a worker unpickles it once for all its figures
+    return pickle.loads(payload)
+
+
+def build_figure(builder, payload, kwargs):
+    # Worker entry point: one figure from the pickled slice, compacted and returned as a plain
+    # dict, which pickles back cheaply and is wrapped again without re-validation
+    return compact_figure(builder(_frame(payload), **kwargs)).to_dict()
+
+
+# Multi-country comparison of the GDP page; data is the long (Country, Year, GDP) slice of the
+# selected countries
+def comparison_line(data):
+    return px.line(data, x="Year", y="GDP", color="Country", title="GDP Comparison Across Selected Countries")
+
+
+def comparison_bar(data, year):
+    latest = data[data["Year"] == year]
+    return px.bar(latest, x="Country", y="GDP", color="Country", title=f"GDP in {year}")
+
+
+def comparison_scatter(data, year):
+    latest = data[data["Year"] == year]
+    return px.scatter(latest, x="Country", y="GDP", size="GDP", color="Country", hover_name="Country", title=f"GDP Scatter Plot for {year}")
+
+
+def comparison_pie(data, year, hole=None):
+    latest = data[data["Year"] == year]
+    title = f"GDP Distribution Among Selected Countries in {year}" if hole is None else \
+        f"GDP Distribution Among Selected Countries (Donut Chart) in {year}"
+    return px.pie(latest, names="Country", values="GDP", hole=hole, title=title)
+
+
+# Graphical analysis of the GDP per Capita page; data is the wide (Country, 1990..2023) panel
+# of all countries, year the selected year as a column name
+def _year_data(data, year, countries):
+    if "All" not in countries:
+        data = data[data["Country"].isin(countries)]
+    return data[["Country", year]].dropna()
+
+
+def per_capita_trends(data, year):
+    year_columns = [column for column in data.columns if column != "Country"]
+    long = data.melt(id_vars=["Country"], value_vars=year_columns, var_name="Year", value_name="GDP per Capita")
+    return px.line(long, x="Year", y="GDP per Capita", color="Country",
+                   title=f"GDP per Capita Trends Over Time for All Countries ({year})",
+                   labels={"GDP per Capita": "GDP per Capita (USD)", "Year": "Year"})
+
+
+def per_capita_histogram(data, year, countries):
+    return px.histogram(_year_data(data, year, countries), x=year, nbins=20, title=f"GDP per Capita Distribution ({year})")
+
+
+def per_capita_top10(data, year, countries):
+    top_10 = _year_data(data, year, countries).sort_values(by=year, ascending=False).head(10)
+    return px.bar(top_10, x="Country", y=year, title=f"Top 10 Countries by GDP per Capita ({year})")
+
+
+def per_capita_pie(data, year, countries):
+    return px.pie(_year_data(data, year, countries), names="Country", values=year, title=f"GDP Distribution by Country in {year}")
+
+
+def per_capita_scatter(data, year, countries):
+    return px.scatter(_year_data(data, year, countries), x="Country", y=year, title=f"Country vs GDP per Capita ({year})")
+
+
+def per_capita_median_comparison(data, year, countries, world_median=None):
+    # Selected countries next to the world median of all countries, taken from the column
+    # unless the page passes one in (e.g. from its quantile sketches)
+    comparison = _year_data(data, year, countries).rename(columns={year: "GDP per Capita"})
+    comparison["World Median"] = data[year].median() if world_median is None else world_median
+    comparison = comparison.melt(id_vars=["Country"], value_vars=["GDP per Capita", "World Median"],
+                                 var_name="Metric", value_name="Value")
+    return px.bar(comparison, x="Country", y="Value", color="Metric",
+                  title=f"Comparison of Selected Countries' GDP per Capita with World Median ({year})")
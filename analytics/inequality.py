@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def _top_share(cumulative, totals, counts, k):
+    # Share of each year's total held by its k largest values
+    below = np.clip(counts - k, 0, None)
+    rows = np.clip(below - 1, 0, None)[None, :]
+    held_below = np.where(below > 0, np.take_along_axis(cumulative, rows, axis=0)[0], 0.0)
+    return (totals - held_below) / totals
+
+
+def inequality_panel(values, years):
+    # Lorenz curves, Gini coefficients and top shares across countries for every year,
+    # from one sort and one cumulative sum over the whole (country x year) matrix.
+    # Zero or missing values (gap fills in the cleaned files) are left out of each year.
+    values = np.where(values > 0, values, np.nan)
+    ordered = np.sort(values, axis=0)             # ascending, missing values sorted last
+    counts = (~np.isnan(ordered)).sum(axis=0)
+    filled = np.nan_to_num(ordered, nan=0.0)
+    cumulative = np.cumsum(filled, axis=0)
+    totals = cumulative[-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lorenz = cumulative / totals
+
+        # Gini = 2 * sum(i * x_i) / (n * sum(x)) - (n + 1) / n, with x sorted ascending
+        position = np.arange(1, values.shape[0] + 1)[:, None]
+        gini = 2 * (position * filled).sum(axis=0) / (counts * totals) - (counts + 1) / counts
+        top_decile = _top_share(cumulative, totals, counts, np.ceil(0.1 * counts).astype(int))
+        top_10_countries = _top_share(cumulative, totals, counts, np.minimum(10, counts))
+
+    empty = counts < 2
+    for result in (gini, top_decile, top_10_countries):
+        result[empty] = np.nan
+
+    return {
+        "years": years,
+        "counts": counts,
+        "totals": totals,
+        "lorenz": lorenz,
+        "gini": gini,
+        "top_decile_share": top_decile,
+        "top_10_share": top_10_countries,
+    }
+
+
+def lorenz_curve(panel, year):
+    # Population share and cumulative value share of one year's Lorenz curve
+    j = int(np.searchsorted(panel["years"], year))
+    n = int(panel["counts"][j])
+    population = np.arange(n + 1) / max(n, 1)
+    share = np.concatenate([[0.0], panel["lorenz"][:n, j]])
+    return population, share
@@ -0,0 +1,90 @@
+import io
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import ListedColormap, Normalize
+from matplotlib.figure import Figure
+from matplotlib.ticker import EngFormatter
+from PIL import Image
+from plotly.colors import sample_colorscale, unlabel_rgb
+
+from analytics.datasets import DATA_DIR
+
+# Country polygons bundled with the app (Natural Earth 1:110m, public domain), projected to
+# Equal Earth, simplified and quantized by `python -m tools.world_shapes`, so a map is drawn
+# on the server without any geometry going to the browser
+SHAPES_PATH = DATA_DIR / "geo" / "countries_110m.npz"
+SHAPES_SCALE = 10_000  # stored coordinate = projected coordinate x SHAPES_SCALE, as int16
+IMAGE_FORMATS = {"webp": "image/webp", "png": "image/png"}
+WIDTH, HEIGHT, DPI = 10.0, 5.6, 100
+MISSING_COLOR = "#d9d9d9"
+
+
+def equal_earth(lon, lat):
+    # Equal Earth projection (Šavrič, Patterson & Jenny 2018) of degrees, on the unit sphere
+    a1, a2, a3, a4 = 1.340264, -0.081106, 0.000893, 0.003796
+    theta = np.arcsin(np.sqrt(3) / 2 * np.sin(np.radians(lat)))
+    t2, t6 = theta ** 2, theta ** 6
+    x = 2 * np.sqrt(3) * np.radians(lon) * np.cos(theta) / (3 * (9 * a4 * t6 * t2 + 7 * a3 * t6 + 3 * a2 * t2 + a1))
+    y = theta * (a1 + a2 * t2 + t6 * (a3 + a4 * t2))
+    return x, y
+
+
+@lru_cache(maxsize=1)
+def load_shapes():
+    # Rings of every country as float arrays, and the country each ring belongs to
+    with np.load(SHAPES_PATH) as shapes:
+        points = shapes["points"].astype(float) / SHAPES_SCALE
+        offsets = shapes["ring_offsets"]
+        return {
+            "codes": shapes["codes"],
+            "ring_country": shapes["ring_country"].astype(int),
+            "rings": [points[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)],
+        }
+
+
+def _colormap(colorscale):
+    # Plotly color scale by name as a matplotlib colormap, so images match the interactive maps
+    colors = [np.array(unlabel_rgb(color)) / 255 for color in sample_colorscale(colorscale, np.linspace(0, 1, 256))]
+    cmap = ListedColormap(colors)
+    cmap.set_bad(MISSING_COLOR)
+    return cmap
+
+
+def render_map(codes, values, title, colorscale, label, image_format="webp"):
+    # Choropleth of values by ISO3 code as a compressed image, reduced to a 256-color palette
+    # and stored as lossless WebP or PNG. Countries without a value are drawn in gray.
+    shapes = load_shapes()
+    by_code = dict(zip(codes, np.asarray(values, dtype=float)))
+    country_values = np.array([by_code.get(code, np.nan) for code in shapes["codes"]])
+    ring_values = np.ma.masked_invalid(country_values[shapes["ring_country"]])
+    finite = country_values[np.isfinite(country_values)]
+
+    fig = Figure(figsize=(WIDTH, HEIGHT), dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes((0.01, 0.2, 0.98, 0.72))
+    polygons = PolyCollection(
+        shapes["rings"], array=ring_values, cmap=_colormap(colorscale),
+        norm=Normalize(*(finite.min(), finite.max()) if len(finite) else (0, 1)),
+        edgecolors="white", linewidths=0.3,
+    )
+    ax.add_collection(polygons)
+    ax.set_xlim(-2.75, 2.75)
+    ax.set_ylim(-1.35, 1.35)
+    ax.set_aspect("equal")
+    ax.axis("off")
+    ax.set_title(title, fontsize=13)
+    colorbar = fig.colorbar(polygons, cax=fig.add_axes((0.25, 0.12, 0.5, 0.03)), orientation="horizontal",
+                            format=EngFormatter(sep=""))
+    colorbar.set_label(label)
+    fig.canvas.draw()
+
+    image = Image.fromarray(np.asarray(fig.canvas.buffer_rgba())).convert("RGB").quantize(256)
+    buffer = io.BytesIO()
+    if image_format == "png":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.save(buffer, "WEBP", lossless=True, method=6)
+    return buffer.getvalue()
@@ -0,0 +1,184 @@
+import hashlib
+
+import numpy as np
+
+from analytics.correlation import correlation_matrix
+
+# Monte Carlo projection of GDP levels. Each country's yearly log growth is drawn from a
+# normal distribution fitted to its history (or set by the user); shocks can be correlated
+# across countries like their historical growth. Paths are simulated in chunks that each
+# reduce to counts (histograms of log GDP, rank counts, pair orderings), so chunks run on
+# separate processes and merge by addition, and no chunk holds more than its own paths.
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+CHUNK_PATHS = 1000
+MIN_YEARS = 10
+# Histogram of log GDP per country and year: BINS bins spanning SPREAD standard deviations
+# either side of the expected path
+BINS = 512
+SPREAD = 8.0
+# Pair orderings ("chance India passes Japan") are tracked among the largest economies
+PAIR_COUNTRIES = 40
+
+
+def _correlation_factor(log_growth):
+    # Matrix F with F @ F.T the historical correlation of growth, repaired to a valid
+    # correlation matrix: pairs without enough common years count as uncorrelated and
+    # negative eigenvalues (pairwise-complete estimates need not be consistent) are clipped
+    corr, _ = correlation_matrix(log_growth)
+    corr = np.nan_to_num(corr, nan=0.0)
+    corr = (corr + corr.T) / 2
+    np.fill_diagonal(corr, 1.0)
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    factor = eigenvectors * np.sqrt(np.clip(eigenvalues, 1e-6, None))
+    return factor / np.sqrt((factor ** 2).sum(axis=1, keepdims=True))
+
+
+def fit_growth(growth, years, window, min_years=MIN_YEARS):
+    # Mean and standard deviation of every country's yearly log growth over the window's
+    # years (growth in percent, countries x years); NaN with fewer than min_years observed
+    in_window = (years >= window[0]) & (years <= window[1])
+    with np.errstate(invalid="ignore"):
+        log_growth = np.log1p(growth[:, in_window] / 100.0)
+    observed = (~np.isnan(log_growth)).sum(axis=1)
+    enough = observed >= max(min_years, 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = np.where(enough, np.nanmean(np.where(enough[:, None], log_growth, 0.0), axis=1), np.nan)
+        sigma = np.where(enough, np.nanstd(np.where(enough[:, None], log_growth, 0.0), axis=1, ddof=1), np.nan)
+    return log_growth, mu, sigma
+
+
+def growth_percent(mu, sigma):
+    # Log-growth parameters as a growth rate and volatility in percent, the inverse of the
+    # conversion scenario_model applies to user assumptions
+    return np.expm1(mu) * 100, sigma * np.exp(mu) * 100
+
+
+def scenario_model(codes, names, base_levels, growth, years, window, horizon,
+                   overrides=None, correlated=True, min_years=MIN_YEARS):
+    # Inputs of a simulation: base-year GDP levels and the growth matrix (percent, countries
+    # x years) of the same countries. Growth parameters are fitted over the window's years;
+    # overrides maps country code -> (mean growth %, volatility %) for user assumptions.
+    # Countries without a base level or with fewer than min_years of growth are left out.
+    log_growth, mu, sigma = fit_growth(growth, years, window, min_years)
+    with np.errstate(invalid="ignore"):
+        keep = ~np.isnan(mu) & (base_levels > 0)
+    codes, names, log_growth, mu, sigma = codes[keep], names[keep], log_growth[keep], mu[keep], sigma[keep]
+    for code, (mean, volatility) in (overrides or {}).items():
+        rows = np.flatnonzero(codes == code)
+        # A growth rate of g% with volatility v% is log growth log(1 + g) with spread v / (1 + g)
+        mu[rows] = np.log1p(mean / 100.0)
+        sigma[rows] = volatility / 100.0 / (1 + mean / 100.0)
+    log_base = np.log(base_levels[keep])
+    return {
+        "codes": codes,
+        "names": names,
+        "log_base": log_base,
+        "mu": mu,
+        "sigma": sigma,
+        "factor": _correlation_factor(log_growth) if correlated else None,
+        "horizon": int(horizon),
+        "pairs": np.argsort(-log_base)[:PAIR_COUNTRIES],
+    }
+
+
+def _bin_edges(model):
+    # Lower edge and width of the histogram of every (year, country)
+    steps = np.arange(1, model["horizon"] + 1)[:, None]
+    centre = model["log_base"] + model["mu"] * steps
+    half = np.maximum(SPREAD * model["sigma"] * np.sqrt(steps), 1e-6)
+    return centre - half, 2 * half / BINS
+
+
+def simulate_chunk(model, n_paths, seed):
+    # Counts from n_paths simulated paths of every country: histogram of log GDP per year and
+    # country, how often each country holds each rank, and for the largest economies how
+    # often one is ahead of another in a year and has been ahead at some point by then
+    rng = np.random.default_rng(seed)
+    horizon, countries = model["horizon"], len(model["mu"])
+    shocks = rng.standard_normal((n_paths, horizon, countries), dtype=np.float32)
+    if model["factor"] is not None:
+        shocks = shocks @ model["factor"].T.astype(np.float32)
+    steps = model["mu"].astype(np.float32) + model["sigma"].astype(np.float32) * shocks
+    log_levels = model["log_base"].astype(np.float32) + np.cumsum(steps, axis=1)
+
+    low, width = _bin_edges(model)
+    bins = np.clip(((log_levels - low) / width).astype(np.int64), 0, BINS - 1)
+    cells = np.arange(horizon * countries).reshape(horizon, countries)
+    histogram = np.bincount((cells * BINS + bins).ravel(), minlength=horizon * countries * BINS)
+
+    # order[..., r] is the country at rank r, so one sort gives every (country, rank) pair
+    order = np.argsort(-log_levels, axis=2)
+    rank_counts = np.bincount(
+        ((np.arange(horizon)[:, None] * countries + order) * countries + np.arange(countries)).ravel(),
+        minlength=horizon * countries * countries,
+    )
+
+    top = log_levels[:, :, model["pairs"]]
+    pairs = len(model["pairs"])
+    ahead = top[:, :, :, None] > top[:, :, None, :]
+    # First year each country of a pair is ahead of the other (horizon when it never is);
+    # counted per year and summed up, that is how often it has been ahead by each year
+    first = np.where(ahead.any(axis=1), ahead.argmax(axis=1), horizon)
+    first_counts = np.bincount(
+        (first * pairs * pairs + np.arange(pairs * pairs).reshape(pairs, pairs)).ravel(),
+        minlength=(horizon + 1) * pairs * pairs,
+    )
+    return {
+        "n": n_paths,
+        "histogram": histogram.reshape(horizon, countries, BINS).astype(np.int32),
+        "ranks": rank_counts.reshape(horizon, countries, countries).astype(np.int32),
+        "ahead": ahead.sum(axis=0, dtype=np.int32),
+        "passed": np.cumsum(first_counts.reshape(horizon + 1, pairs, pairs)[:horizon], axis=0).astype(np.int32),
+    }
+
+
+def scenario_chunks(model, n_paths, seed=0):
+    # Arguments of simulate_chunk for every chunk; each chunk has its own seed, so a scenario
+    # gives the same result however its chunks are spread over workers
+    sizes = [CHUNK_PATHS] * (n_paths // CHUNK_PATHS) + ([n_paths % CHUNK_PATHS] if n_paths % CHUNK_PATHS else [])
+    return [(model, size, (seed, i)) for i, size in enumerate(sizes)]
+
+
+def _histogram_quantiles(histogram, low, width, qs):
+    # Quantiles from binned counts, interpolated linearly within the bin they fall in
+    cumulative = np.cumsum(histogram, axis=-1)
+    total = cumulative[..., -1:]
+    quantiles = []
+    for q in qs:
+        target = q * total
+        idx = np.minimum((cumulative < target).sum(axis=-1, keepdims=True), BINS - 1)
+        before = np.take_along_axis(cumulative, idx, axis=-1) - np.take_along_axis(histogram, idx, axis=-1)
+        inside = np.take_along_axis(histogram, idx, axis=-1)
+        fraction = np.where(inside > 0, (target - before) / np.maximum(inside, 1), 0.5)
+        quantiles.append(low + (idx[..., 0] + fraction[..., 0]) * width)
+    return np.stack(quantiles)
+
+
+def scenario_summary(model, chunks, base_year):
+    # Merged chunk counts as what the page shows: GDP quantiles per year and country (the fan),
+    # the share of paths in which each country holds each rank, and pair orderings
+    n = sum(chunk["n"] for chunk in chunks)
+    histogram = sum(chunk["histogram"] for chunk in chunks)
+    low, width = _bin_edges(model)
+    fan = np.exp(_histogram_quantiles(histogram, low, width, QUANTILES))
+    growth, volatility = growth_percent(model["mu"], model["sigma"])
+    return {
+        "codes": model["codes"],
+        "names": model["names"],
+        "base_year": int(base_year),
+        "years": base_year + np.arange(1, model["horizon"] + 1),
+        "base_levels": np.exp(model["log_base"]),
+        "fan": fan,
+        "rank_share": (sum(chunk["ranks"] for chunk in chunks) / n).astype(np.float32),
+        "pairs": model["pairs"],
+        "ahead": sum(chunk["ahead"] for chunk in chunks) / n,
+        "passed": sum(chunk["passed"] for chunk in chunks) / n,
+        "growth": growth,
+        "volatility": volatility,
+        "n_paths": n,
+    }
+
+
+def scenario_hash(params):
+    # Short stable digest of a scenario's parameters, for cache keys and display
+    return hashlib.sha256(repr(sorted(params.items())).encode()).hexdigest()[:12]
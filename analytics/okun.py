@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+MIN_OBSERVATIONS = 8
+
+
+def okun_matrices(panel):
+    # Country x year matrices of GDP growth and the change in unemployment from the joined
+    # (Country Code, Year) panel
+    growth = panel.pivot(index="Country Code", columns="Year", values="GDP Growth")
+    change = panel.pivot(index="Country Code", columns="Year", values="Unemployment Change").reindex_like(growth)
+    names = panel.drop_duplicates("Country Code").set_index("Country Code")["Country"].reindex(growth.index)
+    return names.index.to_numpy(), names.to_numpy(), growth.columns.to_numpy(), growth.to_numpy(dtype=float), change.to_numpy(dtype=float)
+
+
+def okun_sums(growth, change):
+    # Running sums over the years of what a least-squares fit of change on growth needs,
+    # counting only the years both are observed. The sums of any window are then a
+    # subtraction of two columns, so moving the window refits nothing.
+    both = ~np.isnan(growth) & ~np.isnan(change)
+    g = np.where(both, growth, 0.0)
+    d = np.where(both, change, 0.0)
+    sums = {"n": both, "g": g, "d": d, "gg": g * g, "gd": g * d, "dd": d * d}
+    return {key: np.cumsum(value, axis=1, dtype=float) for key, value in sums.items()}
+
+
+def pooled_sums(sums):
+    # Running sums of all countries together, for one fit over every country-year
+    return {key: value.sum(axis=0, keepdims=True) for key, value in sums.items()}
+
+
+def _window(sums, start_idx, end_idx):
+    # Sums over the year columns start_idx..end_idx (inclusive) for every country
+    return {
+        key: value[:, end_idx] - (value[:, start_idx - 1] if start_idx > 0 else 0.0)
+        for key, value in sums.items()
+    }
+
+
+def okun_fit(sums, start_idx, end_idx, min_observations=MIN_OBSERVATIONS):
+    # Okun's law, change in unemployment = intercept + coefficient * growth, fitted for every
+    # country at once by ordinary least squares over one window. The threshold is the growth
+    # rate at which unemployment holds steady (-intercept / coefficient).
+    w = _window(sums, start_idx, end_idx)
+    n = w["n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_g = n * w["gg"] - w["g"] ** 2
+        var_d = n * w["dd"] - w["d"] ** 2
+        cov = n * w["gd"] - w["g"] * w["d"]
+        coefficient = cov / var_g
+        intercept = (w["d"] - coefficient * w["g"]) / n
+        r_squared = cov ** 2 / (var_g * var_d)
+        # Standard error of the coefficient from the residual variance
+        residual = (var_d - coefficient * cov) / n
+        std_error = np.sqrt(residual / (n - 2) / (var_g / n))
+        threshold = np.where(coefficient < 0, -intercept / coefficient, np.nan)
+
+    invalid = (n < min_observations) | ~(var_g > 0)
+    results = {
+        "coefficient": coefficient,
+        "intercept": intercept,
+        "r_squared": r_squared,
+        "std_error": std_error,
+        "threshold": threshold,
+    }
+    for result in results.values():
+        result[invalid] = np.nan
+    results["n"] = n.astype(int)
+    return results
+
+
+def okun_table(codes, names, fit):
+    return pd.DataFrame({
+        "Country Code": codes,
+        "Country": names,
+        "Okun Coefficient": fit["coefficient"],
+        "Std. Error": fit["std_error"],
+        "Intercept": fit["intercept"],
+        "Threshold Growth (%)": fit["threshold"],
+        "R²": fit["r_squared"],
+        "Years": fit["n"],
+    }).dropna(subset=["Okun Coefficient"])
@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+
+def year_columns(df):
+    # Year columns are the ones whose header is a four-digit number ("1960", "2023", ...)
+    return [col for col in df.columns if str(col).strip().isdigit()]
+
+
+def to_matrix(df, name_col, code_col):
+    # Split a wide country x year frame into label arrays and a float value matrix
+    cols = year_columns(df)
+    names = df[name_col].astype(str).to_numpy()
+    codes = df[code_col].astype(str).to_numpy()
+    years = np.array([int(col) for col in cols])
+    values = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return names, codes, years, values
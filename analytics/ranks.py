@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+
+def rank_matrix(values):
+    # Rank of every country in every year (1 = highest value), from one argsort over the
+    # country axis of the whole country x year matrix. Missing values get no rank.
+    filled = np.where(np.isnan(values), -np.inf, values)
+    order = np.argsort(-filled, axis=0, kind="stable")
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, np.arange(1, values.shape[0] + 1, dtype=float)[:, None], axis=0)
+    ranks[np.isnan(values)] = np.nan
+    return {"order": order, "ranks": ranks, "counts": (~np.isnan(values)).sum(axis=0)}
+
+
+def top_bottom(index, year_idx, n=10):
+    # Row positions of the top and bottom n countries in one year (lookups, no sort)
+    order = index["order"][:, year_idx]
+    count = index["counts"][year_idx]
+    return order[:min(n, count)], order[max(count - n, 0):count][::-1]
+
+
+def rank_movers(index, names, start_idx, end_idx):
+    # Rank change between two years for every country ranked in both (positive = climbed)
+    ranks = index["ranks"]
+    movers = pd.DataFrame({
+        "Country": names,
+        "Start Rank": ranks[:, start_idx],
+        "End Rank": ranks[:, end_idx],
+    }).dropna()
+    movers["Rank Change"] = movers["Start Rank"] - movers["End Rank"]
+    movers = movers.astype({"Start Rank": int, "End Rank": int, "Rank Change": int})
+    return movers.sort_values("Rank Change", ascending=False).reset_index(drop=True)
+
+
+def rank_history(index, names, years, rows):
+    # Long-format rank series of the given rows, ready for a bump chart
+    ranks = index["ranks"][rows]
+    return pd.DataFrame({
+        "Country": np.repeat(names[rows], len(years)),
+        "Year": np.tile(years, len(rows)),
+        "Rank": ranks.ravel(),
+    }).dropna()
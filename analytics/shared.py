@@ -0,0 +1,171 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.compact import compact_frame
+from analytics.cube import build_cube
+from analytics.datasets import DATA_DIR, load_manifest, read_dataset
+
+# Published datasets live on tmpfs (POSIX shared memory) where there is one, so every worker
+# process maps the same physical pages; DATA_PLANE_DIR overrides the location.
+PLANE_DIR = Path(os.environ.get("DATA_PLANE_DIR") or (
+    "/dev/shm/gdp-dashboard" if os.path.isdir("/dev/shm") else DATA_DIR / "plane"
+))
+VERSIONS_DIR = PLANE_DIR / "versions"
+CURRENT = PLANE_DIR / "current"
+KEEP_VERSIONS = 2
+
+# Layout of a published version:
+#   versions/<version>/plane.json    artifact hashes and how each object is laid out
+#   versions/<version>/<dataset>/    one .npy file per numeric column or category code array
+#   versions/<version>/cube/         the rolled-up matrices of analytics.cube
+# A version is written under a temporary name and renamed into place, and "current" is a
+# symlink replaced in one step, so readers always see a complete version.
+
+
+def _write(obj, directory, files):
+    # Numeric arrays go to .npy files that readers map; labels are small and go into the JSON
+    if isinstance(obj, dict):
+        return {"dict": {key: _write(value, directory, files) for key, value in obj.items()}}
+    if isinstance(obj, pd.DataFrame):
+        return {"frame": [{"name": col, "values": _write(values, directory, files)} for col, values in obj.items()]}
+    if isinstance(obj, pd.Series):
+        if isinstance(obj.dtype, pd.CategoricalDtype):
+            return {
+                "categorical": _write(obj.cat.codes.to_numpy(), directory, files),
+                "categories": obj.cat.categories.tolist(),
+            }
+        if obj.dtype.kind in "biuf":
+            return _write(obj.to_numpy(), directory, files)
+        return {"labels": obj.tolist()}
+    if obj.dtype.kind in "biuf":
+        name = f"{len(files)}.npy"
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / name, obj, allow_pickle=False)
+        files.append(name)
+        return {"array": name}
+    return {"labels": obj.tolist(), "dtype": obj.dtype.str if obj.dtype.kind == "U" else "object"}
+
+
+def _read(spec, directory):
+    # Inverse of _write; arrays come back as read-only memory maps, no bytes are copied
+    if "dict" in spec:
+        return {key: _read(value, directory) for key, value in spec["dict"].items()}
+    if "frame" in spec:
+        return pd.DataFrame({col["name"]: _read(col["values"], directory) for col in spec["frame"]}, copy=False)
+    if "categorical" in spec:
+        return pd.Categorical.from_codes(_read(spec["categorical"], directory), spec["categories"])
+    if "array" in spec:
+        return np.load(directory / spec["array"], mmap_mode="r").view(np.ndarray)
+    return np.array(spec["labels"], dtype=spec.get("dtype", "object"))
+
+
+def _version_id(artifacts):
+    return hashlib.sha256(json.dumps(artifacts, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def current_version():
+    # Version the "current" link points at, or None when no data plane has been published
+    try:
+        return Path(os.readlink(CURRENT)).name
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def plane_index(version):
+    # A published version never changes, so its index is read once per process
+    return json.loads((VERSIONS_DIR / version / "plane.json").read_text())
+
+
+def attach_dataset(version, name):
+    return _read(plane_index(version)["datasets"][name], VERSIONS_DIR / version / name)
+
+
+def attach_cube(version):
+    return _read(plane_index(version)["cube"], VERSIONS_DIR / version / "cube")
+
+
+def _swap_current(version):
+    link = PLANE_DIR / f".current.{os.getpid()}"
+    link.unlink(missing_ok=True)
+    os.symlink(Path("versions") / version, link)
+    os.replace(link, CURRENT)
+
+
+def _prune(keep):
+    # Drop old versions; workers still mapping their files keep them until they unmap,
+    # since an unlinked file lives on while it is mapped
+    versions = sorted(
+        (path for path in VERSIONS_DIR.iterdir() if not path.name.startswith(".")),
+        key=lambda path: path.stat().st_mtime, reverse=True,
+    )
+    for path in [path for path in versions if path.name != keep][KEEP_VERSIONS - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def publish(manifest=None):
+    # Write every dataset and the cube of the current build as a new version and make it current.
+    # Datasets unchanged since the previous version are hard-linked, so they share its pages.
+    manifest = manifest or load_manifest()
+    artifacts = {name: info["sha256"] for name, info in sorted(manifest["artifacts"].items())}
+    version = _version_id(artifacts)
+    target = VERSIONS_DIR / version
+    if not target.exists():
+        previous = current_version()
+        previous = plane_index(previous) if previous and (VERSIONS_DIR / previous).exists() else None
+        staging = VERSIONS_DIR / f".{version}.{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        index = {"version": version, "artifacts": artifacts, "datasets": {}, "published": time.time()}
+        for name, sha256 in artifacts.items():
+            if previous and previous["artifacts"].get(name) == sha256:
+                shutil.copytree(VERSIONS_DIR / previous["version"] / name, staging / name, copy_function=os.link)
+                index["datasets"][name] = previous["datasets"][name]
+            else:
+                index["datasets"][name] = _write(compact_frame(read_dataset(name)), staging / name, [])
+        index["cube"] = _write(build_cube(), staging / "cube", [])
+        (staging / "plane.json").write_text(json.dumps(index))
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another publisher renamed the same version into place first
+            shutil.rmtree(staging, ignore_errors=True)
+    _swap_current(version)
+    _prune(version)
+    return version
+
+
+def plane_size(version):
+    return sum(path.stat().st_size for path in (VERSIONS_DIR / version).rglob("*") if path.is_file())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Publish the built datasets to shared memory for every dashboard worker to map."
+    )
+    parser.add_argument("-w", "--watch", type=float, metavar="SECONDS",
+                        help="keep running and publish a new version whenever the build manifest changes")
+    args = parser.parse_args(argv)
+
+    published = None
+    while True:
+        manifest = load_manifest()
+        if manifest != published:
+            version = publish(manifest)
+            published = manifest
+            print(f"Published version {version} ({plane_size(version) / 2**20:,.1f} MB) to {PLANE_DIR}", flush=True)
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import numpy as np
+
+# KLL quantile sketch (Karnin, Lang & Liberty 2016). Level h holds items that each stand for
+# 2**h of the original values; a full level is sorted and every other item is promoted to the
+# level above, so the sketch keeps O(k log(n / k)) items whatever the number of values.
+# Sketches of disjoint parts of the data merge into a sketch of their union.
+K = 200
+CAPACITY_DECAY = 2 / 3
+CONFIDENCE = 0.99
+
+
+def _capacity(k, height, level):
+    # Lower levels hold geometrically fewer items than the top one
+    return max(2, int(np.ceil(k * CAPACITY_DECAY ** (height - level - 1))))
+
+
+def _compress(sketch, rng):
+    levels, k = sketch["levels"], sketch["k"]
+    while sum(len(items) for items in levels) > sum(_capacity(k, len(levels), h) for h in range(len(levels))):
+        h = next(h for h, items in enumerate(levels) if len(items) >= _capacity(k, len(levels), h))
+        items = np.sort(levels[h])
+        # An odd item out stays on its level; of each remaining sorted pair one item is
+        # promoted at random (the same side for every pair), so ranks stay unbiased
+        keep = items[:len(items) % 2]
+        pairs = items[len(items) % 2:]
+        promoted = pairs[rng.integers(2)::2]
+        if h + 1 == len(levels):
+            levels.append(promoted)
+        else:
+            levels[h + 1] = np.concatenate([levels[h + 1], promoted])
+        levels[h] = keep
+        # Each compaction moves the rank of any value by at most one item of this level
+        weight = 2.0 ** h
+        sketch["error"] += weight
+        sketch["error_sq"] += weight ** 2
+    return sketch
+
+
+def kll_sketch(values, k=K, seed=0):
+    # Sketch of the non-missing values of an array
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    sketch = {"k": k, "n": len(values), "levels": [values.copy()], "error": 0.0, "error_sq": 0.0}
+    return _compress(sketch, np.random.default_rng(seed))
+
+
+def merge_sketches(sketches, seed=0):
+    # Sketch of the union of the data behind several sketches
+    sketches = list(sketches)
+    k = max((sketch["k"] for sketch in sketches), default=K)
+    height = max((len(sketch["levels"]) for sketch in sketches), default=1)
+    levels = [
+        np.concatenate([sketch["levels"][h] for sketch in sketches if h < len(sketch["levels"])] or [np.empty(0)])
+        for h in range(height)
+    ]
+    merged = {
+        "k": k,
+        "n": sum(sketch["n"] for sketch in sketches),
+        "levels": levels,
+        "error": sum(sketch["error"] for sketch in sketches),
+        "error_sq": sum(sketch["error_sq"] for sketch in sketches),
+    }
+    return _compress(merged, np.random.default_rng(seed))
+
+
+def rank_error(sketch, confidence=CONFIDENCE):
+    # Bound on the error of any quantile's rank, as a fraction of the values, that holds with
+    # the given probability (Hoeffding over the random promotions), capped by the worst case.
+    # Zero while the sketch still holds every value.
+    if not sketch["n"]:
+        return np.nan
+    probable = np.sqrt(2 * np.log(2 / (1 - confidence)) * sketch["error_sq"])
+    return min(probable, sketch["error"]) / sketch["n"]
+
+
+def sketch_quantiles(sketch, qs):
+    # Quantiles from the weighted items, interpolated linearly between ranks like
+    # numpy/pandas' default, so a sketch that still holds every value gives exact results
+    qs = np.atleast_1d(np.asarray(qs, dtype=float))
+    if not sketch["n"]:
+        return np.full(len(qs), np.nan)
+    items = np.concatenate(sketch["levels"])
+    weights = np.concatenate([np.full(len(items_h), 2.0 ** h) for h, items_h in enumerate(sketch["levels"])])
+    order = np.argsort(items, kind="stable")
+    items, weights = items[order], weights[order]
+    # Each item sits at the middle of the block of ranks it stands for
+    positions = np.cumsum(weights) - (weights + 1) / 2
+    return np.interp(np.clip(qs, 0, 1) * (sketch["n"] - 1), positions, items)
+
+
+def quantile_bounds(sketch, qs, confidence=CONFIDENCE):
+    # Estimate of each quantile with the values at the ends of its rank error interval
+    qs = np.atleast_1d(np.asarray(qs, dtype=float))
+    error = rank_error(sketch, confidence)
+    return (
+        sketch_quantiles(sketch, qs - error),
+        sketch_quantiles(sketch, qs),
+        sketch_quantiles(sketch, qs + error),
+    )
+
+
+def sketch_index(values, years, groups, k=K):
+    # One sketch per (year, group) of a country x year matrix, with `groups` the group label
+    # of each country (e.g. its region). Quantiles of any set of years and groups then come
+    # from merging their sketches instead of rescanning the values.
+    labels = np.unique(groups)
+    sketches = {
+        (int(year), label): kll_sketch(values[groups == label, j], k)
+        for j, year in enumerate(years)
+        for label in labels
+    }
+    return {"years": np.asarray(years), "groups": labels, "sketches": sketches}
+
+
+def union_sketch(index, years=None, groups=None):
+    years = index["years"] if years is None else years
+    groups = index["groups"] if groups is None else groups
+    return merge_sketches(index["sketches"][(int(year), label)] for year in years for label in groups)
+
+
+def quartile_summary(sketch, confidence=CONFIDENCE):
+    # Quartiles of a sketch with their error intervals, for display next to exact results
+    low, (q1, median, q3), high = quantile_bounds(sketch, [0.25, 0.5, 0.75], confidence)
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "low": low,
+        "high": high,
+        "rank_error": rank_error(sketch, confidence),
+        "n": sketch["n"],
+    }
@@ -1,4 +1,8 @@
 import streamlit as st
+from components.controls import batch_toggle
+from components.mapimage import low_bandwidth_toggle
+from components.memory import memory_report
+from components.prefetch import disk_cache_report, prefetch_report
 
 GDP = st.Page(
     "pages/gdp_visualization.py", title="GDP Visualization", icon=":material/insert_chart_outlined:"
@@ -12,9 +16,22 @@ GDP_Growth = st.Page(
 Unemployment = st.Page(
     "pages/unemployement_rate_visualization.py", title="Unemployment Rate", icon=":material/insert_chart_outlined:"
 )
+Okun = st.Page(
+    "pages/okun_law.py", title="Okun's Law", icon=":material/insert_chart_outlined:"
+)
+Scenarios = st.Page(
+    "pages/gdp_scenarios.py", title="GDP Scenarios", icon=":material/insert_chart_outlined:"
+)
 pg = st.navigation(
     {
         "Visualization":[GDP,GDP_Per_Capita,GDP_Growth,Unemployment],
+        "Cross-Indicator":[Okun],
+        "Projections":[Scenarios],
     }
 )
+batch_toggle()
+low_bandwidth_toggle()
 pg.run()
+memory_report()
+prefetch_report()
+disk_cache_report()
@@ -0,0 +1 @@
+# Reusable Streamlit widgets shared by the dashboard pages.
@@ -0,0 +1,50 @@
+import plotly.express as px
+import streamlit as st
+
+from analytics.cagr import cagr_table
+from components.charts import plotly_chart
+from components.download import export_data
+from components.view_state import url_state
+
+
+def cagr_calculator(names, codes, years, cumulative, indicator, key):
+    # Compound growth between any two years for every country; moving the range slider
+    # only subtracts two columns of the cached cumulative log arrays. The range is kept in
+    # the URL as {key}_cagr_range.
+    first_year, last_year = int(years[0]), int(years[-1])
+    url_state(f"{key}_cagr_range", (max(last_year - 20, first_year), last_year), range(first_year, last_year + 1))
+    start_year, end_year = st.slider(
+        "Select Year Range",
+        min_value=first_year,
+        max_value=last_year,
+        key=f"{key}_cagr_range",
+    )
+    if start_year == end_year:
+        st.warning("Please select a range spanning at least two years.")
+        return
+
+    table = cagr_table(names, codes, years, cumulative, start_year, end_year)
+
+    fig_map = px.choropleth(
+        table,
+        locations="Country Code",
+        color="CAGR (%)",
+        hover_name="Country",
+        hover_data={"Cumulative Growth (%)": ":.1f", "CAGR (%)": ":.2f"},
+        color_continuous_scale="RdYlGn",
+        color_continuous_midpoint=0,
+        title=f"{indicator} CAGR {start_year}-{end_year}",
+    )
+    plotly_chart(fig_map)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write(f"**Highest {indicator} CAGR ({start_year}-{end_year})**")
+        st.dataframe(table.head(10), hide_index=True)
+    with col2:
+        st.write(f"**Lowest {indicator} CAGR ({start_year}-{end_year})**")
+        st.dataframe(table.tail(10).iloc[::-1], hide_index=True)
+
+    with st.expander("Full CAGR Ranking"):
+        st.dataframe(table, hide_index=True)
+    export_data(table, f"{key}_cagr_{start_year}_{end_year}")
@@ -0,0 +1,44 @@
+import pickle
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+from analytics.compact import compact_figure
+from analytics.figures import build_figure
+from components.controls import checkpoint
+from components.workers import run_tasks
+
+# orjson encodes the figure dict several times faster than the standard json module
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+
+
+def plotly_chart(fig, **kwargs):
+    # st.plotly_chart with a compact payload: coordinate arrays go out as base64 typed
+    # arrays (float32/int16 where lossless) and constant hover columns are folded away.
+    # Figures the cached builders already compacted go out as they are; anything else is
+    # compacted as a copy, so the caller's figure is never modified.
+    # A run that is already stale stops before compacting and serializing.
+    checkpoint()
+    if not getattr(fig, "_compact", False):
+        fig = compact_figure(fig)
+    return st.plotly_chart(fig, **kwargs)
+
+
+def build_figures(jobs, data):
+    # Figures of a multi-chart view built side by side on the worker pool. jobs maps
+    # name -> (builder, kwargs) with builder a function of analytics.figures taking the shared
+    # slice `data` first; the result maps the same names to figures, in the same order, so the
+    # page lays them out as before. The slice is pickled once for the whole batch.
+    checkpoint()
+    payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    figures = run_tasks(build_figure, [(builder, payload, kwargs) for builder, kwargs in jobs.values()])
+    figures = {name: go.Figure(figure, _validate=False) for name, figure in zip(jobs, figures)}
+    # The workers compacted them already, so plotly_chart sends them as they are
+    for fig in figures.values():
+        fig._compact = True
+    return figures
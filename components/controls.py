@@ -0,0 +1,38 @@
+import contextlib
+
+import streamlit as st
+
+BATCH_KEY = "batch_controls"
+
+
+def batch_toggle():
+    # Sidebar switch for the batched control panel, rendered by app.py before the page so it
+    # holds across pages
+    return st.sidebar.toggle(
+        "Apply filter changes together",
+        key=BATCH_KEY,
+        help="Filter controls only take effect when Apply is pressed, so dragging a slider "
+             "through several values reruns the page once instead of once per value.",
+    )
+
+
+@contextlib.contextmanager
+def control_panel(key, container=None):
+    # Container for a group of filter controls: the container itself (the sidebar by default)
+    # in live mode, a form in batched mode, whose widgets rerun the page only on Apply.
+    # Used as `with control_panel("key") as controls: controls.slider(...)`.
+    container = st.sidebar if container is None else container
+    if not st.session_state.get(BATCH_KEY, False):
+        yield container
+        return
+    form = container.form(f"{key}_controls", border=False)
+    with form:
+        yield form
+        form.form_submit_button("Apply", type="primary")
+
+
+def checkpoint():
+    # Explicit yield point before expensive work. Streamlit abandons a run at its next yield
+    # point when a newer widget change is already waiting, and session state access is one,
+    # so a run whose inputs are stale stops here instead of building figures nobody sees.
+    st.session_state.get(BATCH_KEY)
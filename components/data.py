@@ -0,0 +1,72 @@
+import streamlit as st
+
+from analytics.compact import compact_frame
+from analytics.cube import build_cube
+from analytics.datasets import artifact_hash, load_manifest, read_dataset
+from analytics.shared import attach_cube, attach_dataset, current_version, plane_index
+
+
+# Shared across pages and sessions: st.cache_resource hands every session the same
+# object instead of a per-call copy, so callers must treat these results as read-only.
+# Entries are keyed by artifact hash, so a rebuilt dataset is picked up without a restart.
+@st.cache_resource
+def _read_artifact(name, sha256):
+    return compact_frame(read_dataset(name))
+
+
+# Zero-copy views of the data plane published by `python -m analytics.shared`, so worker
+# processes share one copy of the data. Entries are keyed by plane version; an old version
+# drops out of the cache once a few newer ones have been attached.
+@st.cache_resource(max_entries=16)
+def _attach_artifact(version, name):
+    return attach_dataset(version, name)
+
+
+@st.cache_resource(max_entries=4)
+def _attach_cube(version):
+    return attach_cube(version)
+
+
+def plane_version(artifacts):
+    # Current data plane version when it holds exactly these artifact hashes; None means the
+    # plane is not running or lags behind the build, and the process reads the files itself
+    version = current_version()
+    try:
+        if version is not None and all(plane_index(version)["artifacts"].get(name) == sha256 for name, sha256 in artifacts.items()):
+            return version
+    except OSError:
+        pass
+    return None
+
+
+def load_dataset(name):
+    sha256 = artifact_hash(name)
+    version = plane_version({name: sha256})
+    if version is not None:
+        try:
+            return _attach_artifact(version, name)
+        except OSError:
+            # Version pruned between the lookup and the attach
+            pass
+    return _read_artifact(name, sha256)
+
+
+def load_metadata():
+    return load_dataset("country_metadata")
+
+
+@st.cache_resource
+def _build_cube(versions):
+    return build_cube()
+
+
+def load_cube():
+    artifacts = {name: info["sha256"] for name, info in load_manifest()["artifacts"].items()}
+    version = plane_version(artifacts)
+    if version is not None:
+        try:
+            return _attach_cube(version)
+        except OSError:
+            pass
+    return _build_cube(tuple(sorted(artifacts.items())))
+
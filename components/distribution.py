@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from components.charts import plotly_chart
+
+
+def distribution_view(bands, overlays, indicator, y_title, log_y=False, value_format=",.2f"):
+    # Cross-country distribution over time: the 90% and 50% ranges and the median of every
+    # year as bands, read from a precomputed percentile_bands result, with the selected
+    # countries drawn over them. overlays maps country -> (years, values).
+    years = bands["years"]
+    if len(years) == 0:
+        st.info("Too few countries have data for this selection to show their distribution.")
+        return None
+    p5, p25, p50, p75, p95 = bands["bands"]
+    fig = go.Figure()
+    for low, high, name, opacity in ((p5, p95, "5th-95th percentile", 0.15), (p25, p75, "25th-75th percentile", 0.3)):
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([years, years[::-1]]), y=np.concatenate([high, low[::-1]]),
+            fill="toself", fillcolor="steelblue", opacity=opacity, line={"width": 0},
+            name=name, hoverinfo="skip",
+        ))
+    fig.add_trace(go.Scatter(
+        x=years, y=p50, mode="lines", name="Median", line={"color": "steelblue", "width": 2},
+        customdata=np.stack([p5, p25, p75, p95, bands["counts"]], axis=1),
+        hovertemplate=(
+            f"%{{x}} median: %{{y:{value_format}}}<br>50% range: %{{customdata[1]:{value_format}}} to "
+            f"%{{customdata[2]:{value_format}}}<br>90% range: %{{customdata[0]:{value_format}}} to "
+            f"%{{customdata[3]:{value_format}}}<br>%{{customdata[4]}} countries<extra></extra>"
+        ),
+    ))
+    colors = px.colors.qualitative.Plotly
+    for k, (country, (country_years, values)) in enumerate(overlays.items()):
+        fig.add_trace(go.Scatter(
+            x=country_years, y=values, mode="lines", name=country,
+            line={"color": colors[k % len(colors)]},
+            hovertemplate=f"{country}<br>%{{x}}: %{{y:{value_format}}}<extra></extra>",
+        ))
+    fig.update_layout(
+        title=f"Distribution of {indicator} Across Countries, {int(years[0])}-{int(years[-1])}",
+        xaxis_title="Year", yaxis_title=y_title, yaxis_type="log" if log_y else "linear",
+    )
+    plotly_chart(fig)
+
+    table = pd.DataFrame({"Year": years, "Countries": bands["counts"]})
+    for percentile, band in zip(bands["percentiles"], bands["bands"]):
+        table[f"P{percentile}"] = band
+    return table
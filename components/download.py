@@ -0,0 +1,35 @@
+import tempfile
+
+import streamlit as st
+
+from analytics.export import FORMATS, iter_slices, stream
+
+
+def _spool(chunks):
+    # Encoded chunks written one at a time to an unnamed temporary file, handed to Streamlit
+    # as the file object instead of one joined bytes string. Unbuffered, since the download
+    # button only reads raw files (io.RawIOBase); a raw write may be partial, hence the loop.
+    spool = tempfile.TemporaryFile(buffering=0)
+    for chunk in chunks:
+        view = memoryview(chunk)
+        while view:
+            view = view[spool.write(view):]
+    spool.seek(0)
+    return spool
+
+
+def export_data(frame, name, rows=None, columns=None, key=None):
+    # Download control for the slice a chart shows. The file is only encoded when the
+    # button is clicked, chunk by chunk from `frame` rather than from a filtered copy, and
+    # spooled to disk rather than collected in memory.
+    key = key or name
+    with st.popover("Export data"):
+        fmt = st.radio("Format", list(FORMATS), horizontal=True, key=f"{key}_export_format")
+        st.download_button(
+            f"Download {fmt}",
+            data=lambda: _spool(stream(iter_slices(frame, rows, columns), fmt)),
+            file_name=f"{name}.{FORMATS[fmt]['extension']}",
+            mime=FORMATS[fmt]["mime"],
+            key=f"{key}_export_button",
+            on_click="ignore",
+        )
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from analytics.inequality import lorenz_curve
+from components.charts import plotly_chart
+from components.view_state import url_state
+
+
+def inequality_view(panel, selected_year, indicator, key):
+    # Gini, top shares and Lorenz curves, all read from the precomputed per-year panel
+    years = [int(year) for year, count in zip(panel["years"], panel["counts"]) if count > 1]
+    j = int(np.searchsorted(panel["years"], selected_year))
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric(f"Gini ({selected_year})", f"{panel['gini'][j]:.3f}")
+    col2.metric("Top 10% of Countries' Share", f"{panel['top_decile_share'][j]:.1%}")
+    col3.metric("Top 10 Countries' Share", f"{panel['top_10_share'][j]:.1%}")
+
+    # Lorenz curves for the selected year and any comparison years, kept in the URL as
+    # {key}_lorenz_years
+    compare_options = [year for year in years if year != selected_year]
+    url_state(f"{key}_lorenz_years", [], compare_options)
+    compare_years = st.multiselect(
+        "Compare Lorenz Curves with Years",
+        options=compare_options,
+        key=f"{key}_lorenz_years",
+    )
+    fig_lorenz = go.Figure()
+    fig_lorenz.add_trace(go.Scatter(x=[0, 1], y=[0, 1], mode="lines", name="Perfect Equality", line=dict(dash="dash", color="gray")))
+    for year in [selected_year] + sorted(compare_years):
+        population, share = lorenz_curve(panel, year)
+        fig_lorenz.add_trace(go.Scatter(x=population, y=share, mode="lines", name=str(year)))
+    fig_lorenz.update_layout(
+        title=f"Lorenz Curve of {indicator} Across Countries",
+        xaxis_title="Cumulative Share of Countries",
+        yaxis_title=f"Cumulative Share of {indicator}",
+    )
+    plotly_chart(fig_lorenz)
+
+    # Gini and top shares over time
+    trend = pd.DataFrame({
+        "Year": panel["years"],
+        "Gini": panel["gini"],
+        "Top 10% Share": panel["top_decile_share"],
+        "Top 10 Countries' Share": panel["top_10_share"],
+    }).dropna()
+    fig_trend = px.line(trend, x="Year", y=["Gini", "Top 10% Share", "Top 10 Countries' Share"],
+                        title=f"Inequality of {indicator} Across Countries Over Time",
+                        labels={"value": "Value", "variable": "Measure"})
+    fig_trend.add_vline(x=selected_year, line_dash="dot", line_color="gray")
+    plotly_chart(fig_trend)
+    return trend
@@ -0,0 +1,47 @@
+import base64
+import os
+
+import streamlit as st
+
+from analytics.mapimage import IMAGE_FORMATS, render_map
+from components.prefetch import fetch
+
+LOW_BANDWIDTH_KEY = "low_bandwidth"
+# PNG goes out through Streamlit's media endpoint byte for byte and is cached by the browser;
+# st.image would re-encode WebP, so WebP is inlined into the page instead
+IMAGE_FORMAT = os.environ.get("MAP_IMAGE_FORMAT", "png")
+
+
+def low_bandwidth_toggle():
+    # Sidebar switch for server-rendered map images, rendered by app.py before the page so it
+    # holds across pages
+    return st.sidebar.toggle(
+        "Low-bandwidth maps",
+        key=LOW_BANDWIDTH_KEY,
+        help="Draw the world maps on the server as compressed images of a few tens of kilobytes, "
+             "instead of sending the country shapes and data to the browser.",
+    )
+
+
+def low_bandwidth():
+    return st.session_state.get(LOW_BANDWIDTH_KEY, False)
+
+
+def map_image_task(scope, codes, values, title, colorscale, label):
+    # Prefetch store key and task of one map image. scope names the map and what it shows
+    # (indicator, data version, filter, year); the color scale and format complete the key.
+    return ("map_image",) + tuple(scope) + (colorscale, IMAGE_FORMAT), (
+        render_map, codes, values, title, colorscale, label, IMAGE_FORMAT,
+    )
+
+
+def map_image(scope, codes, values, title, colorscale, label):
+    # Choropleth as a server-rendered image, kept per map, year and color scale for all sessions
+    key, (fn, *args) = map_image_task(scope, codes, values, title, colorscale, label)
+    image = fetch(key, fn, *args)
+    if IMAGE_FORMAT == "png":
+        st.image(image, output_format="PNG", width="stretch")
+    else:
+        encoded = base64.b64encode(image).decode("ascii")
+        st.html(f'<img src="data:{IMAGE_FORMATS[IMAGE_FORMAT]};base64,{encoded}" alt="{title}" style="width: 100%">')
+    st.caption(f"Low-bandwidth map ({len(image) / 1024:,.0f} KB). Switch it off in the sidebar for the interactive map.")
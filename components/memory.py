@@ -0,0 +1,25 @@
+import streamlit as st
+
+from analytics.compact import deep_size, process_rss
+from analytics.datasets import load_manifest
+from analytics.shared import PLANE_DIR, current_version
+from components.data import load_cube, load_dataset
+
+
+def _megabytes(size):
+    return f"{size / 2**20:,.2f} MB"
+
+
+def memory_report():
+    # Process-wide memory versus what this browser session holds on its own
+    with st.sidebar.expander("Memory Usage"):
+        shared = sum(deep_size(load_dataset(name)) for name in load_manifest()["artifacts"]) + deep_size(load_cube())
+        session = deep_size({key: st.session_state[key] for key in st.session_state})
+        st.write(f"**Process RSS:** {_megabytes(process_rss())}")
+        st.write(f"**Shared datasets (all sessions):** {_megabytes(shared)}")
+        st.write(f"**This session's state:** {_megabytes(session)}")
+        version = current_version()
+        if version is None:
+            st.write("**Data plane:** not published, datasets are read by this process")
+        else:
+            st.write(f"**Data plane:** version `{version}`, mapped from `{PLANE_DIR}` and shared by all workers")
@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+from analytics.diskcache import cache_get, cache_put, cache_stats
+from components.controls import checkpoint
+
+MAX_WORKERS = 2
+MAX_RESULTS = 256
+
+
+# One bounded pool and result store per server process, shared by every session.
+# Results are futures keyed by the caller, so a view that is still being prefetched
+# waits for the running job instead of starting a second one.
+@st.cache_resource
+def _prefetcher():
+    return {
+        "pool": ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="prefetch"),
+        "lock": threading.Lock(),
+        "futures": OrderedDict(),
+        "stats": {"hits": 0, "misses": 0, "scheduled": 0, "cancelled": 0},
+    }
+
+
+def _store(prefetcher, key, future):
+    futures = prefetcher["futures"]
+    futures[key] = future
+    futures.move_to_end(key)
+    # Evict the oldest finished results once the store is full; pending jobs are kept
+    for old_key in [k for k, f in futures.items() if f.done()][:max(len(futures) - MAX_RESULTS, 0)]:
+        del futures[old_key]
+
+
+def _compute(key, fn, args):
+    # Result from the disk cache when an earlier run of any worker stored it, otherwise
+    # computed and written there so the next restart comes back warm
+    found, value = cache_get(fn, key)
+    if not found:
+        value = fn(*args)
+        cache_put(fn, key, value)
+    return value
+
+
+def prefetch(tasks):
+    # Schedule the likely next views in the background. tasks maps key -> (fn, *args); jobs
+    # this session queued on an earlier rerun that are no longer wanted are cancelled first.
+    prefetcher = _prefetcher()
+    pending = st.session_state.setdefault("_prefetch_pending", set())
+    with prefetcher["lock"]:
+        futures = prefetcher["futures"]
+        for key in pending - set(tasks):
+            future = futures.get(key)
+            if future is not None and future.cancel():
+                del futures[key]
+                prefetcher["stats"]["cancelled"] += 1
+        pending.clear()
+        for key, (fn, *args) in tasks.items():
+            if key in futures:
+                futures.move_to_end(key)
+                continue
+            _store(prefetcher, key, prefetcher["pool"].submit(_compute, key, fn, args))
+            prefetcher["stats"]["scheduled"] += 1
+            pending.add(key)
+
+
+def cancel_prefetch():
+    # Drop every job this session queued that has not started yet
+    prefetch({})
+
+
+def fetch(key, fn, *args):
+    # Result for key: taken from the prefetch store when it is ready or being computed
+    # (a hit), otherwise read from the disk cache or computed now, and stored so the next
+    # session asking for it hits.
+    # A job that has not started yet is taken over here rather than waited for.
+    prefetcher = _prefetcher()
+    with prefetcher["lock"]:
+        future = prefetcher["futures"].get(key)
+        if future is not None and (future.done() or future.running()) and not future.cancelled():
+            prefetcher["futures"].move_to_end(key)
+            prefetcher["stats"]["hits"] += 1
+        else:
+            if future is not None:
+                future.cancel()
+            future = None
+            prefetcher["stats"]["misses"] += 1
+    if future is not None:
+        return future.result()
+
+    # Nothing stored for key: stop here if this run is already stale rather than compute it
+    checkpoint()
+    future = Future()
+    future.set_result(_compute(key, fn, args))
+    with prefetcher["lock"]:
+        _store(prefetcher, key, future)
+    return future.result()
+
+
+def prefetch_stats():
+    prefetcher = _prefetcher()
+    with prefetcher["lock"]:
+        stats = dict(prefetcher["stats"])
+        stats["stored"] = len(prefetcher["futures"])
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else float("nan")
+    return stats
+
+
+def prefetch_report():
+    # Sidebar summary of how often a view was ready before it was asked for
+    stats = prefetch_stats()
+    with st.sidebar.expander("Prefetch"):
+        st.write(f"**Hit rate:** {stats['hit_rate']:.0%}" if stats["hits"] + stats["misses"] else "**Hit rate:** n/a")
+        st.write(f"**Hits / misses:** {stats['hits']:,} / {stats['misses']:,}")
+        st.write(f"**Scheduled / cancelled:** {stats['scheduled']:,} / {stats['cancelled']:,}")
+
+
+def disk_cache_report():
+    # Sidebar summary of the disk cache shared by every worker process and restart
+    stats = cache_stats()
+    with st.sidebar.expander("Disk Cache"):
+        if stats is None:
+            st.write("**Disk cache:** unavailable")
+            return
+        st.write(f"**Hit rate:** {stats['hit_rate']:.0%}" if stats["hits"] + stats["misses"] else "**Hit rate:** n/a")
+        st.write(f"**Hits / misses:** {stats['hits']:,} / {stats['misses']:,}")
+        st.write(f"**Entries:** {stats['entries']:,} ({stats['bytes'] / 2**20:,.1f} of {stats['max_bytes'] / 2**20:,.0f} MB)")
+        st.write(f"**Evictions:** {stats['evictions']:,}")
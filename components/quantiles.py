@@ -0,0 +1,30 @@
+import streamlit as st
+
+from analytics.sketch import K
+from components.view_state import url_state
+
+# Panels with at least this many values open in approximate mode; smaller ones stay exact
+SKETCH_MIN_VALUES = 100_000
+
+
+def approximate_mode(n_values):
+    # Sidebar switch between exact quantiles over full columns and merged quantile sketches
+    url_state("approx", n_values >= SKETCH_MIN_VALUES, [True, False])
+    return st.sidebar.toggle(
+        "Approximate quantiles",
+        key="approx",
+        help="Medians and quartiles from quantile sketches kept per year and region, merged for "
+             "the selection. Faster on large panels, within the error bounds shown.",
+    )
+
+
+def approximation_note(summary):
+    # Error bounds of sketch quartiles under the figures they belong to
+    if summary["rank_error"] == 0:
+        st.caption(f"Approximate mode: the sketches still hold all {summary['n']:,} values, so these quartiles are exact.")
+        return
+    st.caption(
+        f"Approximate mode (KLL sketches, k={K}, merged over {summary['n']:,} values): each quartile is within "
+        f"±{summary['rank_error']:.2%} of its rank with 99% confidence, e.g. the median lies between "
+        f"{summary['low'][1]:,.2f} and {summary['high'][1]:,.2f}."
+    )
@@ -0,0 +1,62 @@
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from analytics.ranks import rank_history, rank_movers, top_bottom
+from components.charts import plotly_chart
+from components.view_state import url_state
+
+
+def bump_chart(names, years, rank_index, selected_year, indicator, key):
+    # Rank of the selected countries over a year range, read from the stored rank matrix.
+    # The selections are kept in the URL as {key}_bump_countries and {key}_bump_years.
+    year_idx = int(np.searchsorted(years, selected_year))
+    top_rows, _ = top_bottom(rank_index, year_idx)
+    first_year, last_year = int(years[0]), int(years[-1])
+    url_state(f"{key}_bump_countries", list(names[top_rows]), list(names))
+    url_state(f"{key}_bump_years", (first_year, last_year), range(first_year, last_year + 1))
+    countries = st.multiselect(
+        "Select Countries for Bump Chart",
+        options=list(names),
+        key=f"{key}_bump_countries",
+    )
+    year_range = st.slider(
+        "Select Year Range for Bump Chart",
+        min_value=first_year,
+        max_value=last_year,
+        key=f"{key}_bump_years",
+    )
+    rows = np.flatnonzero(np.isin(names, countries))
+    history = rank_history(rank_index, names, years, rows)
+    history = history[history["Year"].between(*year_range)]
+
+    fig = px.line(history, x="Year", y="Rank", color="Country", markers=True,
+                  title=f"{indicator} Rank Over Time")
+    fig.update_yaxes(autorange="reversed")
+    plotly_chart(fig)
+
+
+def rank_movers_table(names, years, rank_index, indicator, key, n=10):
+    # Biggest climbers and fallers between two years, kept in the URL as {key}_movers_start
+    # and {key}_movers_end
+    col1, col2 = st.columns(2)
+    year_options = [int(year) for year in years]
+    url_state(f"{key}_movers_start", year_options[max(len(year_options) - 11, 0)], year_options)
+    url_state(f"{key}_movers_end", year_options[-1], year_options)
+    with col1:
+        start_year = st.selectbox("Year A", year_options, key=f"{key}_movers_start")
+    with col2:
+        end_year = st.selectbox("Year B", year_options, key=f"{key}_movers_end")
+
+    movers = rank_movers(rank_index, names, year_options.index(start_year), year_options.index(end_year))
+    climbers = movers.head(n)
+    fallers = movers.tail(n).iloc[::-1]
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write(f"**Biggest Climbers in {indicator} Rank ({start_year} → {end_year})**")
+        st.dataframe(climbers, hide_index=True)
+    with col2:
+        st.write(f"**Biggest Fallers in {indicator} Rank ({start_year} → {end_year})**")
+        st.dataframe(fallers, hide_index=True)
+    return movers
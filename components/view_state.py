@@ -0,0 +1,79 @@
+import streamlit as st
+
+from components.prefetch import fetch
+
+
+def _parse(raw, like):
+    # Query params are text; read one back as the type of the widget's default
+    if isinstance(like, bool):
+        return raw.lower() == "true"
+    if isinstance(like, int):
+        return int(raw)
+    if isinstance(like, float):
+        return float(raw)
+    return raw
+
+
+def _valid(value, options):
+    if value is None or options is None:
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(item in options for item in value)
+    return value in options
+
+
+def url_state(key, default, options=None):
+    # Seed st.session_state[key] from the URL on the session's first run (the default when the
+    # link has no or an invalid value). Create the widget with key=key and no default of its own.
+    # A value left by another page's widget of the same key is kept only if it fits this one.
+    if key in st.session_state and _valid(st.session_state[key], options):
+        return st.session_state[key]
+    value = default
+    try:
+        if isinstance(default, (list, tuple)):
+            # An empty default gives no type to parse by; the options do
+            like = default[0] if len(default) else next(iter(options or []), "")
+            raw = st.query_params.get_all(key)
+            if raw:
+                value = type(default)(_parse(item, like) for item in raw)
+                if options is not None:
+                    value = type(default)(item for item in value if item in options)
+                # A tuple is a range with both ends given, a list any number of choices
+                if isinstance(default, tuple) and len(value) != len(default):
+                    value = default
+        elif key in st.query_params:
+            value = _parse(st.query_params[key], default)
+            if options is not None and value not in options:
+                value = default
+    except ValueError:
+        value = default
+    st.session_state[key] = value
+    return value
+
+
+def canonical_state(keys):
+    # The view state as a sorted, hashable tuple: equal views give equal keys
+    state = []
+    for key in sorted(keys):
+        value = st.session_state.get(key)
+        if isinstance(value, (list, tuple)):
+            value = tuple(str(item) for item in value)
+        elif value is not None:
+            value = str(value)
+        state.append((key, value))
+    return tuple(state)
+
+
+def share_view(keys):
+    # Mirror the current view state into the URL, so copying the address shares this view.
+    # Only the given keys are written; parameters of views that are not open are dropped.
+    params = {key: list(value) if isinstance(value, tuple) else value for key, value in canonical_state(keys) if value not in (None, "")}
+    current = {key: st.query_params.get_all(key) for key in st.query_params}
+    if current != {key: value if isinstance(value, list) else [value] for key, value in params.items()}:
+        st.query_params.from_dict(params)
+
+
+def view_result(scope, keys, fn, *args):
+    # Result of fn for the current view state, from the server-side store shared by all
+    # sessions; a shared link lands on the entry its sender already computed
+    return fetch(scope + canonical_state(keys), fn, *args)
@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+
+from components.controls import checkpoint
+
+# Worker processes for CPU-bound work of a run (figure building, scenario simulation), which
+# is pure Python or NumPy under the GIL, so threads would take turns. WORKER_PROCESSES
+# overrides (FIGURE_WORKERS, its earlier name, is still read); with a single core everything
+# runs in the script thread.
+WORKER_PROCESSES = int(
+    os.environ.get("WORKER_PROCESSES") or os.environ.get("FIGURE_WORKERS") or min(4, os.cpu_count() or 1)
+)
+# How often a run waiting on the workers checks whether its inputs went stale
+CHECK_INTERVAL = 0.05
+
+
+@st.cache_resource
+def worker_pool():
+    # Shared by all sessions. Spawned rather than forked, as the server process runs threads.
+    return ProcessPoolExecutor(WORKER_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+
+def run_tasks(fn, tasks):
+    # fn(*task) for every task, results in task order. fn must be importable (a module-level
+    # function of analytics). A run whose inputs go stale meanwhile stops, and tasks not
+    # started yet are cancelled.
+    if WORKER_PROCESSES < 2 or len(tasks) < 2:
+        results = []
+        for task in tasks:
+            checkpoint()
+            results.append(fn(*task))
+        return results
+    try:
+        pool = worker_pool()
+        futures = [pool.submit(fn, *task) for task in tasks]
+        try:
+            pending = set(futures)
+            while pending:
+                checkpoint()
+                _, pending = wait(pending, timeout=CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+        finally:
+            for future in futures:
+                future.cancel()
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): start a fresh pool next time, run here now
+        worker_pool.clear()
+        return [fn(*task) for task in tasks]
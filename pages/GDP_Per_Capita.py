@@ -2,26 +2,40 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
-from pathlib import Path
-
-# File path for your dataset
-file_path = Path(__file__).parent.parent / 'Datasets' / 'New folder' / 'Cleaned_GDP_Per_Capita.csv'
+import plotly.graph_objects as go
+from analytics.panel import to_matrix
+from analytics.convergence import convergence_panel, window_growth
+from analytics.datasets import artifact_hash
+from analytics.distribution import percentile_bands
+from analytics.figures import (
+    per_capita_histogram, per_capita_median_comparison, per_capita_pie, per_capita_scatter, per_capita_top10,
+    per_capita_trends,
+)
+from analytics.inequality import inequality_panel
+from analytics.sketch import quartile_summary, sketch_index, sketch_quantiles, union_sketch
+from components.charts import build_figures, plotly_chart
+from components.controls import control_panel
+from components.data import load_dataset, load_metadata
+from components.distribution import distribution_view
+from components.download import export_data
+from components.inequality import inequality_view
+from components.prefetch import fetch, prefetch
+from components.quantiles import approximate_mode, approximation_note
+from components.view_state import share_view, url_state, view_result
 
 # Load the dataset
 @st.cache_data(ttl=60)  # Updated caching method
 def load_data():
     try:
-        # Check if the file exists at the specified path
-        if not file_path.exists():
-            raise FileNotFoundError(f"Dataset file not found at: {file_path}")
-        raw_data = pd.read_csv(file_path)
+        # Canonical GDP per capita (PPP) artifact built by `python -m analytics.build`
+        raw_data = load_dataset("gdp_per_capita")
         return raw_data
     except Exception as e:
         st.error(f"Error loading data: {e}")
         st.stop()
 
-# Data cleaning and processing
-@st.cache_data(ttl=60)  # Updated caching method
+# Data cleaning and processing; the cleaned panel is shared read-only by all sessions
+@st.cache_resource(ttl=60)
 def clean_data():
     raw_data = load_data()
 
@@ -31,21 +45,21 @@ def clean_data():
     # Step 1: Remove columns with all missing values
     cleaned_data = raw_data.dropna(axis=1, how='all')
 
-    # Step 2: Retain only relevant columns (Country Name, Country Code, Indicator Name, Indicator Code, and years 1990-2023)
-    columns_to_keep = ['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code'] + \
+    # Step 2: Retain only relevant columns (Country Name, Country Code, and years 1990-2023)
+    columns_to_keep = ['Country Name', 'Country Code'] + \
                       [str(year) for year in range(1990, 2024)]
     cleaned_data = cleaned_data[columns_to_keep]
 
     # Step 3: Strip whitespace from column names and text fields
     cleaned_data.columns = cleaned_data.columns.str.strip()
-    for col in ['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code']:
+    for col in ['Country Name', 'Country Code']:
         cleaned_data[col] = cleaned_data[col].str.strip()
 
     # Step 4: Interpolate missing values for year columns using linear interpolation
-    cleaned_data[cleaned_data.columns[4:]] = cleaned_data[cleaned_data.columns[4:]].interpolate(axis=1, method='linear')
+    cleaned_data[cleaned_data.columns[2:]] = cleaned_data[cleaned_data.columns[2:]].interpolate(axis=1, method='linear')
 
     # Step 5: Fill any remaining gaps in numeric fields with 0
-    cleaned_data[cleaned_data.columns[4:]] = cleaned_data[cleaned_data.columns[4:]].fillna(0)
+    cleaned_data[cleaned_data.columns[2:]] = cleaned_data[cleaned_data.columns[2:]].fillna(0)
 
     # Step 6: Rename columns for easier use in analysis
     cleaned_data = cleaned_data.rename(columns={'Country Name': 'Country', 'Country Code': 'ISO_Code'})
@@ -55,24 +69,69 @@ def clean_data():
 
     return cleaned_data
 
+# Sigma/beta convergence for every window, computed once for the panel
+@st.cache_resource(ttl=60)
+def load_convergence():
+    _, _, years, values = to_matrix(clean_data(), 'Country', 'ISO_Code')
+    return convergence_panel(values, years)
+
+# Lorenz curves, Gini and top shares for every year, cached per dataset version
+@st.cache_resource(ttl=60)
+def load_inequality():
+    _, _, years, values = to_matrix(clean_data(), 'Country', 'ISO_Code')
+    return inequality_panel(values, years)
+
+# Quantile sketches of the panel per (year, region), so quartiles of any set of years and
+# regions are a merge of sketches rather than a scan of the columns
+@st.cache_resource(ttl=60)
+def load_sketches():
+    _, codes, years, values = to_matrix(clean_data(), 'Country', 'ISO_Code')
+    regions = load_metadata().set_index('Country Code')['Region']
+    return sketch_index(values, years, pd.Series(codes).map(regions).astype(object).fillna("Other").to_numpy())
+
+# Percentile bands of GDP per capita across economies for every year. Aggregates such as
+# "World" are left out, and so are the zeros the cleaning step fills gaps with.
+def load_distribution():
+    _, codes, years, values = to_matrix(clean_data(), 'Country', 'ISO_Code')
+    values = np.where(values > 0, values, np.nan)
+    return percentile_bands(values[np.isin(codes, load_metadata()['Country Code'])], years)
+
+# Panels behind the sidebar buttons, read through the prefetch store so the next button's
+# panel can be built in the background while the current view is on screen
+DERIVED = {"convergence": (load_convergence,), "inequality": (load_inequality,), "sketches": (load_sketches,)}
+data_version = artifact_hash("gdp_per_capita")
+
+def derived(name):
+    return fetch(("gdp_per_capita", name, data_version), *DERIVED[name])
+
 # Load the cleaned data
 cleaned_data = clean_data()
 
-# Sidebar Widgets (Year & Country Filters)
-if 'selected_year' not in st.session_state:
-    st.session_state.selected_year = 2023
-if 'selected_countries' not in st.session_state:
-    st.session_state.selected_countries = ["All"]
-
+# Sidebar Widgets (Year & Country Filters), seeded from the URL so views can be linked to
 years = [str(year) for year in range(1990, 2024)]
-st.session_state.selected_year = st.sidebar.slider("Select Year", 1990, 2023, st.session_state.selected_year)
+url_state("year", 2023, range(1990, 2024))
 available_countries = sorted(cleaned_data['Country'].dropna().unique())
-st.session_state.selected_countries = st.sidebar.multiselect("Select Countries", options=["All"] + available_countries, default=st.session_state.selected_countries)
+url_state("countries", ["All"], ["All"] + available_countries)
+with control_panel("filters") as controls:
+    st.session_state.selected_year = controls.slider("Select Year", 1990, 2023, key="year")
+    st.session_state.selected_countries = controls.multiselect("Select Countries", options=["All"] + available_countries, key="countries")
 
-# Filter data based on selected countries
-filtered_data = cleaned_data.copy()
+# Exact quantiles by default; sketches for large panels or when switched on
+approximate = approximate_mode(cleaned_data[years].size)
+
+# Filter data based on selected countries (the shared panel itself when "All" is selected, no copy)
+filtered_data = cleaned_data
 if "All" not in st.session_state.selected_countries:
-    filtered_data = filtered_data[filtered_data['Country'].isin(st.session_state.selected_countries)]
+    filtered_data = cleaned_data[cleaned_data['Country'].isin(st.session_state.selected_countries)]
+
+# Export the current country selection straight from the cleaned panel
+with st.sidebar:
+    export_data(
+        cleaned_data,
+        "gdp_per_capita",
+        rows=None if "All" in st.session_state.selected_countries
+        else cleaned_data['Country'].isin(st.session_state.selected_countries),
+    )
 
 # Convert selected year to string for column access
 selected_year_str = str(st.session_state.selected_year)
@@ -82,32 +141,85 @@ if selected_year_str not in cleaned_data.columns:
     st.error(f"Data for the year {st.session_state.selected_year} is not available in the dataset.")
     st.stop()
 
-# Calculate World Median for the selected year
-world_median_gdp = cleaned_data[selected_year_str].median()
+QUARTILES = [0.25, 0.5, 0.75]
+
+# Quartiles of every given year across all economies, one row per year: merged sketches in
+# approximate mode, otherwise one quantile pass over the columns
+def year_quartiles(year_columns):
+    if approximate:
+        sketches = derived("sketches")
+        return pd.DataFrame(
+            [sketch_quantiles(union_sketch(sketches, years=[int(year)]), QUARTILES) for year in year_columns],
+            index=year_columns, columns=QUARTILES,
+        )
+    return cleaned_data[year_columns].quantile(QUARTILES).T
+
+def world_median(year):
+    return year_quartiles([str(year)])[0.5].iloc[0]
 
 # Sidebar Buttons
 show_gdp_info = st.sidebar.button("GDP per Capita")
 graphical_analysis_button = st.sidebar.button("Graphical Analysis")
 statistical_analysis_button = st.sidebar.button("Statistical Analysis")
 measures_of_tendency_button = st.sidebar.button("Measures of Tendency")
+convergence_button = st.sidebar.button("Convergence Analysis")
+inequality_button = st.sidebar.button("Inequality Analysis")
+
+# Buttons only stay True for one rerun, so remember which view is open to keep it on
+# screen while its own widgets are being used; the URL's "view" parameter opens one directly
+VIEWS = {
+    "gdp_info": show_gdp_info,
+    "graphical": graphical_analysis_button,
+    "statistical": statistical_analysis_button,
+    "tendency": measures_of_tendency_button,
+    "convergence": convergence_button,
+    "inequality": inequality_button,
+}
+url_state("active_view", None, VIEWS)
+# URL query parameters of each view besides the shared ones, so a copied link reopens it
+VIEW_PARAMS = {"convergence": ["window"], "inequality": ["gdp_per_capita_lorenz_years"]}
+for view, clicked in VIEWS.items():
+    if clicked:
+        st.session_state.active_view = view
+show_gdp_info = st.session_state.active_view == "gdp_info"
+graphical_analysis_button = st.session_state.active_view == "graphical"
+statistical_analysis_button = st.session_state.active_view == "statistical"
+measures_of_tendency_button = st.session_state.active_view == "tendency"
 
 # Statistical Analysis: Measures of Central Tendency & Dispersion
 if statistical_analysis_button:
     st.title(f"Statistical Analysis of GDP per Capita for year {st.session_state.selected_year}")
     
-    # Extract the relevant data for the selected year
-    selected_year_data = cleaned_data[selected_year_str].dropna()
-
-    # Measures of Central Tendency
-    mean_value = selected_year_data.mean()
-    median_value = selected_year_data.median()
-    mode_value = selected_year_data.mode()[0]  # Taking the first mode value
-
-    # Measures of Dispersion
-    range_value = selected_year_data.max() - selected_year_data.min()
-    variance_value = selected_year_data.var()
-    std_deviation_value = selected_year_data.std()
-    iqr_value = selected_year_data.quantile(0.75) - selected_year_data.quantile(0.25)
+    # Measures for the selected year, computed once per year and shared by every link to it.
+    # In approximate mode the median and IQR come from the sketches, so the column is not
+    # sorted for them.
+    def year_statistics(year, approximate):
+        selected_year_data = cleaned_data[year].dropna()
+        median, iqr = None, None
+        if not approximate:
+            q1, median, q3 = selected_year_data.quantile(QUARTILES)
+            iqr = q3 - q1
+        return (
+            # Measures of Central Tendency
+            selected_year_data.mean(),
+            median,
+            selected_year_data.mode()[0],  # Taking the first mode value
+            # Measures of Dispersion
+            selected_year_data.max() - selected_year_data.min(),
+            selected_year_data.var(),
+            selected_year_data.std(),
+            iqr,
+        )
+
+    (mean_value, median_value, mode_value,
+     range_value, variance_value, std_deviation_value, iqr_value) = view_result(
+        ("gdp_per_capita", data_version, "year_statistics"), ["year", "approx"], year_statistics,
+        selected_year_str, approximate,
+    )
+    if approximate:
+        sketches = derived("sketches")
+        summary = quartile_summary(union_sketch(sketches, years=[st.session_state.selected_year]))
+        median_value, iqr_value = summary["median"], summary["q3"] - summary["q1"]
 
     st.subheader("Measures of Central Tendency")
     st.write(f"**Mean**: {mean_value:,.2f}")
@@ -119,6 +231,28 @@ if statistical_analysis_button:
     st.write(f"**Variance**: {variance_value:,.2f}")
     st.write(f"**Standard Deviation**: {std_deviation_value:,.2f}")
     st.write(f"**Interquartile Range (IQR)**: {iqr_value:,.2f}")
+    if approximate:
+        approximation_note(summary)
+
+        # Any union of regions and years is a merge of their sketches
+        st.subheader("Quartiles by Region")
+        selections = [(region, [st.session_state.selected_year], [region]) for region in sketches["groups"]]
+        selections += [
+            ("All regions", [st.session_state.selected_year], None),
+            ("All regions, 1990-2023", None, None),
+        ]
+        region_rows = []
+        for label, sketch_years, groups in selections:
+            region_summary = quartile_summary(union_sketch(sketches, years=sketch_years, groups=groups))
+            region_rows.append({
+                "Selection": label,
+                "Q1": region_summary["q1"],
+                "Median": region_summary["median"],
+                "Q3": region_summary["q3"],
+                "Values": region_summary["n"],
+                "Rank Error (±)": f"{region_summary['rank_error']:.2%}",
+            })
+        st.dataframe(pd.DataFrame(region_rows), hide_index=True)
     st.title("Time Series Statistical Analysis of GDP per Capita")
 
     # Time series analysis for three periods
@@ -133,15 +267,16 @@ if statistical_analysis_button:
         st.subheader(f"Time Series Analysis of GDP per Capita for Years {period_start} to {period_end}")
 
         # Measures of Central Tendency (Mean, Median, Mode)
+        quartiles = year_quartiles(list(period_data.columns))
         mean_value = period_data.mean().mean()  # Mean across all countries and years
-        median_value = period_data.median().median()  # Median across all countries and years
+        median_value = quartiles[0.5].median()  # Median across all countries and years
         mode_value = period_data.mode().iloc[0].mean()  # Taking the first mode across all countries and years
 
         # Measures of Dispersion (Range, Variance, Standard Deviation, IQR)
         range_value = period_data.max().max() - period_data.min().min()  # Range across all countries and years
         variance_value = period_data.var().mean()  # Variance across all countries and years
         std_deviation_value = period_data.std().mean()  # Standard deviation across all countries and years
-        iqr_value = period_data.quantile(0.75).mean() - period_data.quantile(0.25).mean()  # IQR across all countries and years
+        iqr_value = quartiles[0.75].mean() - quartiles[0.25].mean()  # IQR across all countries and years
 
         # Display Measures of Central Tendency
         st.write(f"**Mean GDP per Capita**: {mean_value:,.2f}")
@@ -157,87 +292,64 @@ if statistical_analysis_button:
         # Add space between periods for readability
         st.markdown("---")
 
-# Measures of Tendency (Skewness & Kurtosis)
-# Measures of Tendency (Skewness & Kurtosis) with Line Graph
-# Measures of Tendency (Skewness & Kurtosis) with Line Graph
-# Measures of Tendency (Skewness & Kurtosis) with Line Graph
+# Graphical Analysis
 if graphical_analysis_button:
     st.title("Graphical Analysis of GDP per Capita")
-    
+    selected_countries = st.session_state.selected_countries
+    all_selected = "All" in selected_countries
+
+    # The charts below are independent, so they are built side by side from one slice of the
+    # panel and laid out in order afterwards
+    year_args = {"year": selected_year_str, "countries": selected_countries}
+    jobs = {}
+    if all_selected:
+        jobs["trends"] = (per_capita_trends, {"year": selected_year_str})
+    jobs["histogram"] = (per_capita_histogram, year_args)
+    if all_selected:
+        jobs["top10"] = (per_capita_top10, year_args)
+    jobs["pie"] = (per_capita_pie, year_args)
+    jobs["scatter"] = (per_capita_scatter, year_args)
+    if not all_selected:
+        world_median_gdp = world_median(selected_year_str)
+        jobs["median_comparison"] = (per_capita_median_comparison, dict(year_args, world_median=world_median_gdp))
+    figures = build_figures(jobs, cleaned_data[['Country'] + years])
+
     # Extract the relevant data based on whether "All" or specific countries are selected
-    if "All" in st.session_state.selected_countries:
-        year_data = cleaned_data[['Country', str(st.session_state.selected_year)]].dropna()
+    if all_selected:
+        year_data = cleaned_data[['Country', selected_year_str]].dropna()
         # Show the full dataset if 'All' is selected
         st.write("### Showing Data for All Countries")
-        
+
         # **Line Chart for All Countries**
         st.subheader(f"GDP per Capita Trends Over Time for All Countries")
-        all_countries_data = cleaned_data[['Country'] + [str(year) for year in range(1990, 2024)]]
-        all_countries_data = all_countries_data.melt(id_vars=["Country"], 
-                                                     value_vars=[str(year) for year in range(1990, 2024)], 
-                                                     var_name="Year", 
-                                                     value_name="GDP per Capita")
-        
-        fig_line_all = px.line(all_countries_data, x="Year", y="GDP per Capita", color="Country",
-                               title=f"GDP per Capita Trends Over Time for All Countries ({st.session_state.selected_year})",
-                               labels={"GDP per Capita": "GDP per Capita (USD)", "Year": "Year"})
-        st.plotly_chart(fig_line_all)
+        plotly_chart(figures["trends"])
 
     else:
-        year_data = cleaned_data[cleaned_data['Country'].isin(st.session_state.selected_countries)]
-        year_data = year_data[['Country', str(st.session_state.selected_year)]].dropna()
-        st.write(f"### Showing Data for Selected Countries: {', '.join(st.session_state.selected_countries)}")
+        year_data = cleaned_data[cleaned_data['Country'].isin(selected_countries)]
+        year_data = year_data[['Country', selected_year_str]].dropna()
+        st.write(f"### Showing Data for Selected Countries: {', '.join(selected_countries)}")
 
     # Histogram of GDP per Capita for the selected year
     st.subheader(f"Histogram of GDP per Capita for {st.session_state.selected_year}")
-    fig_hist = px.histogram(year_data, x=str(st.session_state.selected_year), nbins=20, title=f"GDP per Capita Distribution ({st.session_state.selected_year})")
-    st.plotly_chart(fig_hist)
-
-    # Line Chart for GDP per Capita Trends Over Time (for selected countries)
-    # st.subheader(f"GDP per Capita Trends Over Time for Selected Countries")
-    selected_countries_data = cleaned_data[cleaned_data['Country'].isin(st.session_state.selected_countries)]
-
-    # Reshaping the data for line chart
-    line_chart_data = selected_countries_data.melt(id_vars=["Country"], 
-                                                   value_vars=[str(year) for year in range(1990, 2024)], 
-                                                   var_name="Year", 
-                                                   value_name="GDP per Capita")
-
-    # Filter data for the selected countries and the year range
-    # line_chart_data = line_chart_data[line_chart_data['Country'].isin(st.session_state.selected_countries)]
-
-    # Plotting the Line Chart (for selected countries)
-    # fig_line = px.line(line_chart_data, x="Year", y="GDP per Capita", color="Country",
-                    #    title=f"GDP per Capita Trends Over Time for Selected Countries",
-                    #    labels={"GDP per Capita": "GDP per Capita (USD)", "Year": "Year"})
-    # st.plotly_chart(fig_line)
+    plotly_chart(figures["histogram"])
 
     # **Bar Graph**: Top 10 Countries by GDP per Capita (only if "All" countries are selected)
-    if "All" in st.session_state.selected_countries:
-        top_10_gdp = year_data.sort_values(by=str(st.session_state.selected_year), ascending=False).head(10)
+    if all_selected:
         st.subheader(f"Top 10 Countries by GDP per Capita in {st.session_state.selected_year}")
-        fig_bar = px.bar(top_10_gdp, x='Country', y=str(st.session_state.selected_year), title=f"Top 10 Countries by GDP per Capita ({st.session_state.selected_year})")
-        st.plotly_chart(fig_bar)
+        plotly_chart(figures["top10"])
 
     # Pie Chart: GDP Distribution among Countries
     st.subheader(f"Pie Chart of GDP Distribution in {st.session_state.selected_year}")
-    fig_pie = px.pie(year_data, names='Country', values=str(st.session_state.selected_year), title=f"GDP Distribution by Country in {st.session_state.selected_year}")
-    st.plotly_chart(fig_pie)
-
-    # Box Plot: GDP per Capita Distribution
-    st.subheader(f"Box Plot of GDP per Capita for {st.session_state.selected_year}")
-    fig_box = px.box(year_data, y=str(st.session_state.selected_year), title=f"Box Plot of GDP per Capita ({st.session_state.selected_year})")
-    st.plotly_chart(fig_box)
+    plotly_chart(figures["pie"])
 
     # Scatter Plot: Country vs GDP per Capita
     st.subheader(f"Scatter Plot of Country vs GDP per Capita in {st.session_state.selected_year}")
-    fig_scatter = px.scatter(year_data, x='Country', y=str(st.session_state.selected_year), title=f"Country vs GDP per Capita ({st.session_state.selected_year})")
-    st.plotly_chart(fig_scatter)
+    plotly_chart(figures["scatter"])
 
     # Display the GDP per Capita insights and analysis for the selected year
     st.subheader(f"GDP per Capita Insights for {st.session_state.selected_year}")
     year_filtered_data = (
-        year_data.rename(columns={str(st.session_state.selected_year): 'GDP per Capita'})
+        year_data.rename(columns={selected_year_str: 'GDP per Capita'})
         .dropna(subset=['GDP per Capita'])
     )
 
@@ -246,46 +358,26 @@ if graphical_analysis_button:
     st.write(f"### Average GDP per Capita in {st.session_state.selected_year}: ${average_gdp:,.2f}")
 
     # Display world median GDP per Capita (only for specific countries)
-    if "All" not in st.session_state.selected_countries:
-        world_median_gdp = cleaned_data[str(st.session_state.selected_year)].median()
+    if not all_selected:
         st.write(f"### World Median GDP per Capita for {st.session_state.selected_year}: ${world_median_gdp:,.2f}")
 
         # Visualize comparison between selected countries and world median
-        comparison_data = year_filtered_data[['Country', 'GDP per Capita']].copy()
-        comparison_data['World Median'] = world_median_gdp
-        comparison_data = comparison_data.melt(id_vars=["Country"], value_vars=["GDP per Capita", "World Median"], 
-                                               var_name="Metric", value_name="Value")
-
-        fig_comparison = px.bar(comparison_data, x='Country', y='Value', color='Metric', 
-                                title=f"Comparison of Selected Countries' GDP per Capita with World Median ({st.session_state.selected_year})")
-        st.plotly_chart(fig_comparison)
+        plotly_chart(figures["median_comparison"])
 
     # **Time Series Graphical Analysis - Additional Section**
-        st.title("Time Series Analysis of GDP per Capita")
-
-    # Time series analysis for three periods
-    periods = [(1990, 2000), (2001, 2010), (2011, 2023)]
-
-    for period_start, period_end in periods:
-        # Extract the relevant data for the period (years in the given range)
-        period_years = [str(year) for year in range(period_start, period_end + 1)]
-        period_data = cleaned_data[period_years].dropna(axis=1, how='all')  # Drop any columns that are fully NaN
-    
-        # Calculate the mean GDP per capita across all countries for each year in the period
-        mean_gdp_per_year = period_data.mean(axis=0)  # Get the mean GDP for each year across all countries
-     
-        # Convert the Series to a DataFrame for plotting
-        mean_gdp_df = mean_gdp_per_year.reset_index()
-        mean_gdp_df.columns = ['Year', 'Mean GDP per Capita']  # Rename columns
-    
-        # **Line Chart for Time Series Trends in the Given Period**
-        st.subheader(f"GDP per Capita Trends for {period_start} to {period_end}")
-    
-        # Plot the mean GDP per capita for the given period
-        fig_line_period = px.line(mean_gdp_df, x="Year", y="Mean GDP per Capita", 
-                                title=f"Mean GDP per Capita for {period_start} to {period_end}",
-                                labels={"Year": "Year", "Mean GDP per Capita": "GDP per Capita (USD)"})
-        st.plotly_chart(fig_line_period)
+    st.title("Time Series Analysis of GDP per Capita")
+
+    # Percentile bands of all economies for every year, with the selected countries drawn over them
+    st.subheader("Distribution of GDP per Capita Across Countries Over Time")
+    bands = fetch(("gdp_per_capita", "distribution", data_version), load_distribution)
+    overlay_data = filtered_data.set_index('Country')[years]
+    overlays = {} if all_selected else {
+        country: (np.array(years, dtype=int), row.where(row > 0).to_numpy(dtype=float))
+        for country, row in overlay_data.iterrows()
+    }
+    table = distribution_view(bands, overlays, "GDP per Capita", "GDP per Capita (PPP, log scale)", log_y=True, value_format="$,.0f")
+    if table is not None:
+        export_data(table, "gdp_per_capita_distribution")
 
 if show_gdp_info:
     st.title("What is GDP per Capita?")
@@ -339,36 +431,27 @@ if measures_of_tendency_button:
     else:
         selected_countries_data = cleaned_data[cleaned_data['Country'].isin(st.session_state.selected_countries)]
 
-    # Calculate Skewness and Kurtosis over time (for each year)
-    skewness_values = []
-    kurtosis_values = []
+    # Skewness (Karl Pearson's method) and kurtosis over time, one reduction per measure over
+    # all year columns. Sketches cover regions, so they stand in for the exact medians only
+    # for all countries.
     years = [str(year) for year in range(1990, 2024)]
-    
-    for year in years:
-        year_data = selected_countries_data[year].dropna()
-
-        # **Skewness**: Karl Pearson's Method
-        mean_value = year_data.mean()
-        median_value = year_data.median()
-        std_deviation_value = year_data.std()
-        skewness_karl_pearson = 3 * (mean_value - median_value) / std_deviation_value
-        skewness_values.append(skewness_karl_pearson)
-        
-        # **Skewness**: Bowley's Method (using Quartiles)
-        Q1 = year_data.quantile(0.25)
-        Q2 = year_data.median()
-        Q3 = year_data.quantile(0.75)
-        skewness_bowley = (Q3 + Q1 - 2 * Q2) / (Q3 - Q1)
-        kurtosis_value = year_data.kurtosis()  # Pearson’s method
-
-        # Store the results for plotting
-        kurtosis_values.append(kurtosis_value)
+    year_columns = selected_countries_data[years]
+    mean_values = year_columns.mean()
+    std_deviation_values = year_columns.std()
+    kurtosis_values = year_columns.kurtosis()  # Pearson’s method
+    use_sketches = approximate and "All" in st.session_state.selected_countries
+    if use_sketches:
+        sketches = derived("sketches")
+        median_values = year_quartiles(years)[0.5]
+    else:
+        median_values = year_columns.median()
+    skewness_values = 3 * (mean_values - median_values) / std_deviation_values
 
     # Create a DataFrame for plotting skewness and kurtosis over time
     tendency_data = pd.DataFrame({
         'Year': years,
-        'Skewness (Karl Pearson)': skewness_values,
-        'Kurtosis': kurtosis_values
+        'Skewness (Karl Pearson)': skewness_values.to_numpy(),
+        'Kurtosis': kurtosis_values.to_numpy()
     })
     
     # Line Chart for Skewness and Kurtosis over Time
@@ -376,33 +459,33 @@ if measures_of_tendency_button:
                            title="Skewness and Kurtosis over Time",
                            labels={"Year": "Year", "value": "Value", "variable": "Measure"})
     
-    st.plotly_chart(fig_tendency)
-
-    # Display the skewness and kurtosis values for the selected year
-    selected_year_data = selected_countries_data[selected_year_str].dropna()
+    plotly_chart(fig_tendency)
 
+    # Display the skewness and kurtosis values for the selected year, read from the series above
     # **Skewness**: Karl Pearson's Method for the selected year
-    mean_value = selected_year_data.mean()
-    median_value = selected_year_data.median()
-    std_deviation_value = selected_year_data.std()
-
-    skewness_karl_pearson = 3 * (mean_value - median_value) / std_deviation_value
+    skewness_karl_pearson = skewness_values[selected_year_str]
     st.subheader("Skewness (Karl Pearson's Method)")
     st.write(f"Skewness (Karl Pearson's Method) = 3 * (Mean - Median) / Standard Deviation")
     st.write(f"Skewness: {skewness_karl_pearson:.2f}")
 
     # **Skewness**: Bowley's Method for the selected year
-    Q1 = selected_year_data.quantile(0.25)
-    Q2 = selected_year_data.median()
-    Q3 = selected_year_data.quantile(0.75)
+    tendency_summary = None
+    if use_sketches:
+        tendency_summary = quartile_summary(union_sketch(sketches, years=[st.session_state.selected_year]))
+        Q1, Q2, Q3 = tendency_summary["q1"], tendency_summary["median"], tendency_summary["q3"]
+    else:
+        Q1, Q3 = selected_countries_data[selected_year_str].quantile([0.25, 0.75])
+        Q2 = median_values[selected_year_str]
 
     skewness_bowley = (Q3 + Q1 - 2 * Q2) / (Q3 - Q1)
     st.subheader("Skewness (Bowley's Method)")
     st.write(f"Skewness (Bowley's Method) = (Q3 + Q1 - 2 * Q2) / (Q3 - Q1)")
     st.write(f"Skewness: {skewness_bowley:.2f}")
+    if tendency_summary is not None:
+        approximation_note(tendency_summary)
 
     # **Kurtosis**: Pearson’s method for the selected year
-    kurtosis_value = selected_year_data.kurtosis()
+    kurtosis_value = kurtosis_values[selected_year_str]
     st.subheader("Kurtosis")
     st.write(f"Kurtosis: {kurtosis_value:.2f}")
 
@@ -415,85 +498,86 @@ if measures_of_tendency_button:
     """)
 
 
-# else:
-#     # If the "GDP per Capita" button is not clicked, show the rest of the content
-#     # Insights and GDP per Capita Section
-#     st.title("GDP per Capita Analysis")
-
-#     # Insights based on selected year
-#     st.subheader(f"GDP per Capita Insights for {st.session_state.selected_year}")
-#     year_filtered_data = (
-#         filtered_data[['Country', 'ISO_Code', str(st.session_state.selected_year)]]
-#         .rename(columns={str(st.session_state.selected_year): 'GDP per Capita'})
-#         .dropna(subset=['ISO_Code', 'GDP per Capita'])
-#     )
-
-#     # Display top 10 countries with the highest GDP per capita only when "All" is selected
-#     if "All" in st.session_state.selected_countries:
-#         top_gdp = year_filtered_data.sort_values(by='GDP per Capita', ascending=False).head(10)
-#         st.write("### Top 10 Countries by GDP per Capita")
-#         st.write(top_gdp[['Country', 'GDP per Capita']])
-
-#     # Average GDP per Capita
-#     average_gdp = year_filtered_data['GDP per Capita'].mean()
-#     st.write(f"### Average GDP per Capita in {st.session_state.selected_year}: ${average_gdp:,.2f}")
-
-#     # World Median Comparison (Only when specific countries are selected)
-#     if "All" not in st.session_state.selected_countries:
-#         # Add world median as a comparison
-#         st.write(f"### World Median GDP per Capita for {st.session_state.selected_year}: ${world_median_gdp:,.2f}")
-
-#         # Visualize comparison between selected countries and world median
-#         comparison_data = year_filtered_data[['Country', 'GDP per Capita']].copy()
-#         comparison_data['World Median'] = world_median_gdp
-#         comparison_data = comparison_data.melt(id_vars=["Country"], value_vars=["GDP per Capita", "World Median"], 
-#                                                var_name="Metric", value_name="Value")
-
-#         fig_comparison = px.bar(comparison_data, x='Country', y='Value', color='Metric', 
-#                                 title=f"Comparison of Selected Countries' GDP per Capita with World Median ({st.session_state.selected_year})")
-#         st.plotly_chart(fig_comparison)
-
-#     # Visualization: Choropleth Map
-#     st.subheader(f"GDP per Capita Global Map ({st.session_state.selected_year})")
-#     fig_map = px.choropleth(
-#         year_filtered_data,
-#         locations="ISO_Code",
-#         color="GDP per Capita",
-#         hover_name="Country",
-#         title=f"Global GDP per Capita in {st.session_state.selected_year}",
-#         color_continuous_scale=px.colors.sequential.Plasma,
-#         labels={"GDP per Capita": "GDP per Capita (USD)"}
-#     )
-#     st.plotly_chart(fig_map)
-
-#     # Visualization: GDP Distribution (Histogram)
-#     st.subheader(f"GDP per Capita Distribution in {st.session_state.selected_year}")
-    
-#     # Dynamically adjust bins and range of histogram based on number of countries selected
-#     num_bins = 20 if len(st.session_state.selected_countries) < 10 else 10  # Adjust number of bins based on selection size
-#     fig_histogram = px.histogram(year_filtered_data, x="GDP per Capita", nbins=num_bins, title=f"GDP per Capita Distribution ({st.session_state.selected_year})")
-#     fig_histogram.update_layout(xaxis_title="GDP per Capita (USD)", yaxis_title="Frequency")
-#     st.plotly_chart(fig_histogram)
-
-#     # Line Chart: GDP per Capita trends over time for selected countries
-#     st.subheader(f"GDP per Capita Trends Over Time for Selected Countries")
-#     selected_countries_data = cleaned_data[cleaned_data['Country'].isin(st.session_state.selected_countries)]
-
-#     # Reshaping the data for line chart
-#     line_chart_data = selected_countries_data.melt(id_vars=["Country"], 
-#                                                    value_vars=[str(year) for year in range(1990, 2024)], 
-#                                                    var_name="Year", 
-#                                                    value_name="GDP per Capita")
-
-#     # Filter data for the selected countries and the year range
-#     line_chart_data = line_chart_data[line_chart_data['Country'].isin(st.session_state.selected_countries)]
-
-#     # Plotting the Line Chart
-#     fig_line = px.line(line_chart_data, x="Year", y="GDP per Capita", color="Country",
-#                        title=f"GDP per Capita Trends Over Time for Selected Countries",
-#                        labels={"GDP per Capita": "GDP per Capita (USD)", "Year": "Year"})
-#     st.plotly_chart(fig_line)
-
-#     # Footer
-#     st.markdown("**Data Source:** Provided CSV File")
+if st.session_state.get("active_view") == "convergence":
+    st.title("Convergence Analysis of GDP per Capita")
+    convergence = derived("convergence")
+    conv_years = [int(year) for year in convergence["years"]]
+
+    # Moving the window only indexes into the precomputed results
+    url_state("window", (conv_years[0], conv_years[-1]), conv_years)
+    start_year, end_year = st.select_slider(
+        "Select Convergence Window",
+        options=conv_years,
+        key="window"
+    )
+    if start_year == end_year:
+        st.warning("Please select a window spanning at least two years.")
+        st.stop()
+
+    initial, growth, s, e = window_growth(convergence, start_year, end_year)
+    beta = convergence["beta"][s, e]
+    intercept = convergence["intercept"][s, e]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Beta", f"{beta:.4f}")
+    col2.metric("R²", f"{convergence['r_squared'][s, e]:.2f}")
+    col3.metric("Half-life (Years)", f"{convergence['half_life'][s, e]:.0f}" if beta < 0 else "n/a")
+    col4.metric("Countries", f"{convergence['n'][s, e]}")
+
+    # Sigma convergence: dispersion of log income over time
+    st.subheader("Sigma Convergence")
+    sigma_df = pd.DataFrame({'Year': conv_years, 'Std. Dev. of Log GDP per Capita': convergence["sigma"]})
+    fig_sigma = px.line(sigma_df, x='Year', y='Std. Dev. of Log GDP per Capita',
+                        title="Cross-Country Dispersion of Log GDP per Capita")
+    fig_sigma.add_vrect(x0=start_year, x1=end_year, fillcolor="green", opacity=0.15, line_width=0)
+    plotly_chart(fig_sigma)
+
+    # Beta convergence: growth over the window against initial income
+    st.subheader(f"Beta Convergence ({start_year}-{end_year})")
+    beta_df = pd.DataFrame({
+        'Country': cleaned_data['Country'].to_numpy(),
+        'Log GDP per Capita': initial,
+        'Annual Growth': growth,
+    }).dropna()
+    fig_beta = px.scatter(beta_df, x='Log GDP per Capita', y='Annual Growth', hover_name='Country',
+                          title=f"Annual Growth {start_year}-{end_year} vs Initial Log GDP per Capita")
+    fit_x = np.array([beta_df['Log GDP per Capita'].min(), beta_df['Log GDP per Capita'].max()])
+    fig_beta.add_trace(go.Scatter(x=fit_x, y=intercept + beta * fit_x, mode='lines', name='Fitted Line'))
+    plotly_chart(fig_beta)
+    export_data(beta_df, f"beta_convergence_{start_year}_{end_year}")
+
+    # Beta for every start/end window
+    st.subheader("Beta Across All Windows")
+    fig_heat = px.imshow(convergence["beta"], x=conv_years, y=conv_years, origin='lower',
+                         color_continuous_scale='RdBu', color_continuous_midpoint=0,
+                         labels={'x': 'End Year', 'y': 'Start Year', 'color': 'Beta'},
+                         title="Beta Convergence Coefficient by Window")
+    plotly_chart(fig_heat)
+
+    st.write("""
+        - **Sigma convergence** holds when the dispersion of log income falls over time.
+        - **Beta convergence** holds when poorer countries grow faster than richer ones (negative beta). The half-life is the number of years needed to close half of the gap at the implied speed.
+    """)
+
+if st.session_state.get("active_view") == "inequality":
+    st.title("Inequality of GDP per Capita Across Countries")
+    trend = inequality_view(derived("inequality"), st.session_state.selected_year, "GDP per Capita", key="gdp_per_capita")
+    export_data(trend, "gdp_per_capita_inequality")
 
+    st.write("""
+        - The **Lorenz curve** shows the cumulative share of total GDP per capita held by the poorest x% of countries.
+        - The **Gini coefficient** ranges from 0 (all countries equally well off) to 1 (maximal concentration).
+        - Countries are counted equally, regardless of population, so this measures inequality *between* countries.
+    """)
+
+# Keep the address bar in step with the view, so the URL can be shared or bookmarked
+share_view(["active_view", "year", "countries", "approx"] + VIEW_PARAMS.get(st.session_state.active_view, []))
+
+# Use the idle time after this run to build the panel behind the next sidebar button
+if measures_of_tendency_button:
+    next_view = "convergence"
+elif st.session_state.get("active_view") == "convergence":
+    next_view = "inequality"
+else:
+    next_view = None
+prefetch({} if next_view is None else {("gdp_per_capita", next_view, data_version): DERIVED[next_view]})
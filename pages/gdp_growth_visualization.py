@@ -1,19 +1,150 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
-from pathlib import Path
+from analytics.panel import to_matrix, year_columns
+from analytics.events import build_event_index, episodes_in_year, country_events
+from analytics.ranks import rank_matrix, top_bottom
+from analytics.cagr import cumulative_log_growth
+from analytics.correlation import cluster_order, correlation_matrix, strongest_pairs
+from analytics.compact import compact_figure
+from analytics.datasets import artifact_hash
+from analytics.distribution import percentile_bands
+from components.cagr import cagr_calculator
+from components.charts import plotly_chart
+from components.controls import control_panel
+from components.data import load_dataset, load_metadata
+from components.distribution import distribution_view
+from components.download import export_data
+from components.mapimage import low_bandwidth, map_image, map_image_task
+from components.prefetch import fetch, prefetch
+from components.ranking import bump_chart, rank_movers_table
+from components.view_state import share_view, url_state, view_result
 
-file_path = Path(__file__).parent.parent / 'Datasets' / 'New_folder' / 'Cleaned_GDP_Growth.csv'
-gdp_data = pd.read_csv(file_path)
+gdp_data = load_dataset("gdp_growth")
+
+# Recession episodes and structural breaks for every country, computed once per dataset
+@st.cache_resource
+def load_event_index(data):
+    return build_event_index(*to_matrix(data, "Country Name", "Country Code"))
+
+# Rank of every country in every year, rebuilt only when the data changes
+@st.cache_resource
+def load_rank_index(data):
+    names, _, years, values = to_matrix(data, "Country Name", "Country Code")
+    return names, years, rank_matrix(values)
+
+# Cumulative log growth for every country, so compound growth between any two years is a subtraction
+@st.cache_resource
+def load_cumulative_growth(data):
+    names, codes, years, values = to_matrix(data, "Country Name", "Country Code")
+    return names, codes, years, cumulative_log_growth(values)
+
+data_version = artifact_hash("gdp_growth")
+
+# Derived data each view needs, read through the prefetch store so the next view's can be
+# built in the background while the current one is on screen
+DERIVED = {
+    "rank_index": (load_rank_index, gdp_data),
+    "cumulative": (load_cumulative_growth, gdp_data),
+}
+VIEW_NEEDS = {
+    "Top/Bottom Performers": ["rank_index"],
+    "CAGR Calculator": ["cumulative"],
+}
+
+def derived(name):
+    return fetch(("gdp_growth", name, data_version), *DERIVED[name])
+
+# Correlation of every pair of countries' growth over one window, built once per window.
+# Aggregates such as "World" are left out, and so are countries with too few years in it.
+country_codes = load_metadata()["Country Code"].to_numpy()
+growth_years = [int(year) for year in year_columns(gdp_data)]
+first_year, last_year = growth_years[0], growth_years[-1]
+CORRELATION_WINDOW = (max(first_year, 1993), last_year)
+
+def load_correlation(data, codes, start, end):
+    names, row_codes, years, values = to_matrix(data, "Country Name", "Country Code")
+    keep = np.isin(row_codes, codes)
+    window = (years >= start) & (years <= end)
+    corr, overlap = correlation_matrix(values[keep][:, window])
+    known = ~np.isnan(np.diag(corr))
+    corr = corr[known][:, known]
+    return {"names": names[keep][known], "corr": corr, "overlap": overlap[known][:, known], "cluster": cluster_order(corr)}
+
+def correlation_figure(correlation, clustered):
+    order = correlation["cluster"] if clustered else np.arange(len(correlation["names"]))
+    names = correlation["names"][order]
+    fig = go.Figure(go.Heatmap(
+        z=correlation["corr"][np.ix_(order, order)],
+        x=names,
+        y=names,
+        colorscale="RdBu",
+        zmin=-1,
+        zmax=1,
+        colorbar={"title": {"text": "Correlation"}},
+        hovertemplate="%{y} / %{x}<br>Correlation: %{z:.2f}<extra></extra>",
+    ))
+    fig.update_layout(
+        height=900,
+        xaxis={"showticklabels": False},
+        yaxis={"showticklabels": False, "autorange": "reversed"},
+        title="Pairwise Correlation of Annual GDP Growth",
+    )
+    return compact_figure(fig)
+
+# Percentile bands of growth across the economies of one region (all of them for "All"),
+# kept per region; aggregates such as "World" are not part of the distribution
+def load_distribution(data, region):
+    metadata = load_metadata()
+    codes = metadata["Country Code"] if region == "All" else metadata.loc[metadata["Region"] == region, "Country Code"]
+    _, row_codes, years, values = to_matrix(data, "Country Name", "Country Code")
+    return percentile_bands(values[np.isin(row_codes, codes)], years)
+
+# Choropleth of one year's growth; the neighbouring years are prefetched from Global Insights.
+# The cached figures are compacted once here rather than on every render.
+def growth_map_figure(year):
+    return compact_figure(px.choropleth(
+        gdp_data,
+        locations="Country Code",
+        color=str(year),
+        hover_name="Country Name",
+        color_continuous_scale="Viridis",
+        title=f"GDP Growth Distribution in {year}",
+    ))
+
+# The same map as a server-rendered image for the low-bandwidth mode: map_image arguments
+def growth_map_image(year):
+    return (
+        ("gdp_growth", data_version, year), gdp_data["Country Code"].to_numpy(), gdp_data[str(year)].to_numpy(),
+        f"GDP Growth Distribution in {year}", "Viridis", "GDP Growth (%)",
+    )
+
+event_index = load_event_index(gdp_data)
 
 st.title("Interactive GDP Growth Dashboard")
 st.title("Navigation")
-page = st.selectbox("Go to", ["Country Analysis", "Comparison", "Global Insights", "Top/Bottom Performers"])
+views = ["Country Analysis", "Comparison", "Distribution", "Correlation Matrix", "Global Insights", "Top/Bottom Performers", "Recession Events", "CAGR Calculator"]
+url_state("view", views[0], views)
+page = st.selectbox("Go to", views, key="view")
+
+# URL query parameters of each view besides "view", so a copied link reopens it
+VIEW_PARAMS = {
+    "Country Analysis": ["country"],
+    "Comparison": ["countries", "bar_year", "scatter_year"],
+    "Distribution": ["dist_region", "countries"],
+    "Correlation Matrix": ["corr_window", "corr_order"],
+    "Global Insights": ["year"],
+    "Top/Bottom Performers": ["top_year", "growth_bump_countries", "growth_bump_years", "growth_movers_start", "growth_movers_end"],
+    "Recession Events": ["recession_year"],
+    "CAGR Calculator": ["gdp_growth_cagr_range"],
+}
 
 if page == "Global Insights":
+    url_state("year", last_year, range(first_year, last_year + 1))
     selected_year = st.slider(
-        "Select Year", min_value=1960, max_value=2022, value=2022
+        "Select Year", min_value=first_year, max_value=last_year, key="year"
     )
     total_gdp_growth = gdp_data[str(selected_year)].sum()
     top_country = gdp_data.loc[gdp_data[str(selected_year)].idxmax(), "Country Name"]
@@ -23,16 +154,13 @@ if page == "Global Insights":
     st.write(f"**Total Global GDP Growth in {selected_year}:** {total_gdp_growth}%")
     st.write(f"**Top Country:** {top_country} with {top_country_gdp}% growth")
 
-    # Create a world map
-    fig_map = px.choropleth(
-        gdp_data,
-        locations="Country Code",
-        color=str(selected_year),
-        hover_name="Country Name",
-        color_continuous_scale="Viridis",
-        title=f"GDP Growth Distribution in {selected_year}",
-    )
-    st.plotly_chart(fig_map)
+    # Create a world map, or its image in low-bandwidth mode
+    if low_bandwidth():
+        map_image(*growth_map_image(selected_year))
+    else:
+        fig_map = fetch(("gdp_growth", "map", data_version, selected_year), growth_map_figure, selected_year)
+        plotly_chart(fig_map)
+    export_data(gdp_data, f"gdp_growth_{selected_year}", columns=["Country Name", "Country Code", str(selected_year)])
 
     world_data = gdp_data[gdp_data['Country Name'] == 'World']
     world_growth = world_data.iloc[0, 3:].values  # Get GDP growth values for years
@@ -45,16 +173,18 @@ if page == "Global Insights":
         labels={'x': 'Year', 'y': 'GDP Growth (%)'},
         title="Average Global GDP Growth (World)"
     )
-    st.plotly_chart(fig_avg_growth)
+    plotly_chart(fig_avg_growth)
 
 # Country Analysis
 elif page == "Country Analysis":
     st.subheader("Analyze GDP Growth for a Country")
-    country = st.selectbox("Select Country", gdp_data["Country Name"].unique())
+    url_state("country", gdp_data["Country Name"].iloc[0], gdp_data["Country Name"].unique())
+    country = st.selectbox("Select Country", gdp_data["Country Name"].unique(), key="country")
 
     # Filter data for the selected country
     country_data = gdp_data[gdp_data["Country Name"] == country]
-    years = gdp_data.columns[3:]  # Skip metadata columns
+    # Numeric years (skipping the metadata columns), so a one-year episode still has a width
+    years = [int(year) for year in gdp_data.columns[3:]]
     gdp_growth = country_data.iloc[0, 3:].values
 
     # Line chart for GDP growth over time
@@ -68,6 +198,26 @@ elif page == "Country Analysis":
         marker=dict(symbol='circle', size=6, color='red')
     ))
 
+    # Shade recession episodes and mark the structural break from the precomputed index
+    country_recessions, country_breaks = country_events(event_index, country)
+    for _, episode in country_recessions.iterrows():
+        fig.add_vrect(
+            x0=int(episode["Start Year"]) - 0.5,
+            x1=int(episode["End Year"]) + 0.5,
+            fillcolor="red",
+            opacity=0.2,
+            line_width=0,
+            annotation_text=f"{episode['Depth (%)']:.1f}%",
+            annotation_position="top left",
+        )
+    for _, brk in country_breaks.iterrows():
+        fig.add_vline(x=int(brk["Break Year"]), line_dash="dash", line_color="orange")
+        fig.add_annotation(
+            x=int(brk["Break Year"]), y=1, yref="paper", showarrow=False,
+            text=f"Break: {brk['Mean Growth Before (%)']:.1f}% → {brk['Mean Growth After (%)']:.1f}%",
+            font=dict(color="orange"),
+        )
+
     # Adding labels and title
     fig.update_layout(
         title=f"GDP Growth Over Time ({country})",
@@ -75,15 +225,21 @@ elif page == "Country Analysis":
         yaxis_title="GDP Growth (%)",
         template="plotly_dark"
     )
-    st.plotly_chart(fig)
+    plotly_chart(fig)
+    export_data(gdp_data, f"gdp_growth_{country}", rows=gdp_data["Country Name"] == country)
+
+    if not country_recessions.empty:
+        st.write(f"**Recession Episodes for {country}:**")
+        st.dataframe(country_recessions.drop(columns=["Country Name", "Country Code"]), hide_index=True)
 
 # Comparison
 elif page == "Comparison":
     st.subheader("Compare GDP Growth Between Countries")
     
     # Step 1: Select multiple countries for comparison
+    url_state("countries", [], gdp_data["Country Name"].unique())
     countries = st.multiselect(
-        "Select Countries for Comparison:", gdp_data["Country Name"].unique()
+        "Select Countries for Comparison:", gdp_data["Country Name"].unique(), key="countries"
     )
 
     if countries:
@@ -111,16 +267,19 @@ elif page == "Comparison":
             yaxis_title="GDP Growth (%)",
             template="plotly_dark",
         )
-        st.plotly_chart(fig_line)
+        plotly_chart(fig_line)
+        export_data(gdp_data, "gdp_growth_comparison", rows=gdp_data["Country Name"].isin(countries))
 
         # Step 3: Bar Chart with a year slider
         st.subheader("Bar Chart: GDP Growth for a Selected Year")
-        selected_year = st.slider(
-            "Select Year for Bar Chart:", 
-            min_value=int(years[0]), 
-            max_value=int(years[-1]), 
-            value=int(years[-1])
-        )
+        url_state("bar_year", int(years[-1]), range(int(years[0]), int(years[-1]) + 1))
+        with control_panel("bar_year", st) as controls:
+            selected_year = controls.slider(
+                "Select Year for Bar Chart:",
+                min_value=int(years[0]),
+                max_value=int(years[-1]),
+                key="bar_year"
+            )
         bar_data = gdp_data[gdp_data["Country Name"].isin(countries)][
             ["Country Name", str(selected_year)]
         ]
@@ -132,16 +291,18 @@ elif page == "Comparison":
             title=f"GDP Growth in {selected_year} (Bar Chart)",
             labels={str(selected_year): "GDP Growth (%)"},
         )
-        st.plotly_chart(fig_bar)
+        plotly_chart(fig_bar)
 
         # Step 4: Scatter Plot with a single year slider
         st.subheader("Scatter Plot: GDP Growth Comparison for a Selected Year")
-        scatter_year = st.slider(
-            "Select Year for Scatter Plot:", 
-            min_value=int(years[0]), 
-            max_value=int(years[-1]), 
-            value=int(years[-1])
-        )
+        url_state("scatter_year", int(years[-1]), range(int(years[0]), int(years[-1]) + 1))
+        with control_panel("scatter_year", st) as controls:
+            scatter_year = controls.slider(
+                "Select Year for Scatter Plot:",
+                min_value=int(years[0]),
+                max_value=int(years[-1]),
+                key="scatter_year"
+            )
 
         scatter_data = gdp_data[gdp_data["Country Name"].isin(countries)][
             ["Country Name", str(scatter_year)]
@@ -157,23 +318,99 @@ elif page == "Comparison":
             labels={str(scatter_year): f"GDP Growth in {scatter_year} (%)"},
         )
         fig_scatter.update_traces(textposition="top center")
-        st.plotly_chart(fig_scatter)
+        plotly_chart(fig_scatter)
+
+# Distribution of growth across countries over time
+elif page == "Distribution":
+    st.subheader("Distribution of GDP Growth Across Countries")
+    regions = sorted(load_metadata()["Region"].dropna().unique())
+    url_state("dist_region", "All", ["All"] + regions)
+    url_state("countries", [], gdp_data["Country Name"].unique())
+    col1, col2 = st.columns([1, 2])
+    region = col1.selectbox("Countries From", ["All"] + regions, key="dist_region")
+    countries = col2.multiselect("Highlight Countries", gdp_data["Country Name"].unique(), key="countries")
+    bands = fetch(("gdp_growth", "distribution", data_version, region), load_distribution, gdp_data, region)
+    names, _, years, values = to_matrix(gdp_data, "Country Name", "Country Code")
+    overlays = {country: (years, values[names == country][0]) for country in countries}
+    table = distribution_view(bands, overlays, "GDP Growth", "GDP Growth (%)", value_format=".2f")
+    if table is not None:
+        export_data(table, f"gdp_growth_distribution_{region}")
+    st.caption(
+        "Half of the economies grew within the darker band each year and nine in ten within the lighter one. "
+        "World-wide shocks show up as the whole distribution dipping at once."
+    )
+
+# Correlation Matrix
+elif page == "Correlation Matrix":
+    st.subheader("Which Economies Grow Together?")
+
+    url_state("corr_window", CORRELATION_WINDOW, range(first_year, last_year + 1))
+    start_year, end_year = st.slider(
+        "Select Window:",
+        min_value=first_year,
+        max_value=last_year,
+        key="corr_window"
+    )
+    url_state("corr_order", "Clustered", ["Clustered", "Alphabetical"])
+    ordering = st.radio("Order Countries", ["Clustered", "Alphabetical"], horizontal=True, key="corr_order")
+
+    correlation = fetch(
+        ("gdp_growth", "correlation", data_version, start_year, end_year),
+        load_correlation, gdp_data, country_codes, start_year, end_year,
+    )
+    if len(correlation["names"]) < 2:
+        st.warning("Please select a window spanning at least ten years.")
+    else:
+        fig_corr = fetch(
+            ("gdp_growth", "correlation_figure", data_version, start_year, end_year, ordering),
+            correlation_figure, correlation, ordering == "Clustered",
+        )
+        plotly_chart(fig_corr)
+        st.write(f"""
+        **{len(correlation["names"])} countries.** Each cell is the correlation of two countries' annual growth over the
+        years between {start_year} and {end_year} that both report (at least ten). Clustered ordering places countries with
+        similar growth cycles next to each other, so blocks along the diagonal are groups that rise and fall together.
+        """)
+
+        names, corr, overlap = correlation["names"], correlation["corr"], correlation["overlap"]
+        # Pairs that share only a few years are too noisy to rank; keep those covering most of the window
+        most, least = strongest_pairs(np.where(overlap >= 0.8 * (end_year - start_year + 1), corr, np.nan))
+        pair_tables = [
+            pd.DataFrame({
+                "Country": names[rows],
+                "Partner": names[cols],
+                "Correlation": corr[rows, cols],
+                "Years": overlap[rows, cols].astype(int),
+            })
+            for rows, cols in (most, least)
+        ]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Most synchronised pairs** (sharing at least 80% of the window):")
+            st.dataframe(pair_tables[0], hide_index=True)
+        with col2:
+            st.write("**Most opposed pairs** (sharing at least 80% of the window):")
+            st.dataframe(pair_tables[1], hide_index=True)
+        export_data(pd.DataFrame(corr, index=names, columns=names).reset_index(names="Country"), f"growth_correlation_{start_year}_{end_year}")
 
 # Top/Bottom Performers
 elif page == "Top/Bottom Performers":
     st.subheader("Top and Bottom 10 GDP Growth Performers")
 
     # Year slider to select the year for top/bottom performers
+    url_state("top_year", last_year, range(first_year, last_year + 1))
     selected_year = st.slider(
         "Select Year for Top/Bottom Performers:",
-        min_value=1960,
-        max_value=2022,
-        value=2022
+        min_value=first_year,
+        max_value=last_year,
+        key="top_year"
     )
 
-    # Sort countries based on the selected year's GDP growth
-    top_performers = gdp_data.sort_values(str(selected_year), ascending=False).head(10)
-    bottom_performers = gdp_data.sort_values(str(selected_year)).head(10)
+    # Top and bottom 10 are read from the precomputed rank order
+    rank_names, rank_years, rank_index = derived("rank_index")
+    top_rows, bottom_rows = top_bottom(rank_index, int(np.searchsorted(rank_years, selected_year)))
+    top_performers = gdp_data.iloc[top_rows]
+    bottom_performers = gdp_data.iloc[bottom_rows]
 
     # Display the Top 10 Performers
     st.write(f"**Top 10 Countries with Highest GDP Growth in {selected_year}:**")
@@ -210,4 +447,100 @@ elif page == "Top/Bottom Performers":
         template="plotly_dark"
     )
 
-    st.plotly_chart(fig_top_bottom)
\ No newline at end of file
+    plotly_chart(fig_top_bottom)
+    export_data(
+        gdp_data,
+        f"gdp_growth_top_bottom_{selected_year}",
+        rows=np.concatenate([top_rows, bottom_rows]),
+        columns=["Country Name", "Country Code", str(selected_year)],
+    )
+
+    # Bump Chart of ranks over time
+    st.subheader("GDP Growth Rank Over Time")
+    bump_chart(rank_names, rank_years, rank_index, selected_year, "GDP Growth", key="growth")
+
+    # Biggest rank movers between two years
+    st.subheader("Biggest Rank Movers")
+    movers = rank_movers_table(rank_names, rank_years, rank_index, "GDP Growth", key="growth")
+    export_data(movers, "gdp_growth_rank_movers")
+
+# Recession Events
+elif page == "Recession Events":
+    st.subheader("Who Contracted in a Given Year?")
+
+    event_years = sorted(event_index["by_year"])
+    url_state("recession_year", 2009, range(event_years[0], event_years[-1] + 1))
+    selected_year = st.slider(
+        "Select Year for Recession Events:",
+        min_value=event_years[0],
+        max_value=event_years[-1],
+        key="recession_year"
+    )
+
+    # Lookup into the precomputed index, no rescan of the growth panel; the sorted table is
+    # kept per year for every link to this view
+    contracted = view_result(
+        ("gdp_growth", data_version, "recessions"), ["recession_year"],
+        lambda: episodes_in_year(event_index, selected_year).sort_values("Depth (%)"),
+    )
+    st.write(f"**{len(contracted)} countries and regions were in a recession episode covering {selected_year}:**")
+    st.dataframe(contracted, hide_index=True)
+    export_data(contracted, f"recessions_{selected_year}")
+
+    fig_depth = px.bar(
+        contracted.head(30),
+        x="Country Name",
+        y="Depth (%)",
+        color="Duration (Years)",
+        title=f"Deepest Recession Episodes Active in {selected_year}",
+        labels={"Depth (%)": "Peak-to-Trough Output Loss (%)"},
+    )
+    plotly_chart(fig_depth)
+
+    # Number of economies in recession in each year
+    recession_counts = pd.DataFrame({
+        "Year": event_years,
+        "Economies in Recession": [len(event_index["by_year"][year]) for year in event_years],
+    })
+    fig_counts = px.line(
+        recession_counts,
+        x="Year",
+        y="Economies in Recession",
+        title="Number of Economies in Recession per Year",
+        template="plotly_dark",
+    )
+    plotly_chart(fig_counts)
+
+    st.subheader("Structural Breaks in Trend Growth")
+    st.dataframe(event_index["breaks"].sort_values("Break Statistic", ascending=False), hide_index=True)
+
+# CAGR Calculator
+elif page == "CAGR Calculator":
+    st.subheader("Compound Annual Growth Between Two Years")
+    cagr_names, cagr_codes, cagr_years, cumulative_growth = derived("cumulative")
+    cagr_calculator(cagr_names, cagr_codes, cagr_years, cumulative_growth, "Real GDP", key="gdp_growth")
+    st.write("""
+    **Note:** Rates are compounded from the annual real growth figures for the years after the start year up to the end year.
+    Countries with missing growth figures inside the range are left out.
+    """)
+
+
+# Use the idle time after this run to build what the next click most likely needs: the data
+# of the next entry in the menu and, on Global Insights, the maps of the neighbouring years
+next_view = views[(views.index(page) + 1) % len(views)]
+prefetch_tasks = {("gdp_growth", name, data_version): DERIVED[name] for name in VIEW_NEEDS.get(next_view, [])}
+if page == "Global Insights":
+    for year in (selected_year - 1, selected_year + 1):
+        if first_year <= year <= last_year:
+            if low_bandwidth():
+                key, task = map_image_task(*growth_map_image(year))
+                prefetch_tasks[key] = task
+            else:
+                prefetch_tasks[("gdp_growth", "map", data_version, year)] = (growth_map_figure, year)
+if next_view == "Correlation Matrix":
+    start_year, end_year = CORRELATION_WINDOW
+    prefetch_tasks[("gdp_growth", "correlation", data_version, start_year, end_year)] = (load_correlation, gdp_data, country_codes, start_year, end_year)
+prefetch(prefetch_tasks)
+
+# Keep the address bar in step with the view, so the URL can be shared or bookmarked
+share_view(["view"] + VIEW_PARAMS.get(page, []))
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from analytics.datasets import artifact_hash
+from analytics.montecarlo import (
+    QUANTILES, fit_growth, growth_percent, scenario_chunks, scenario_hash, scenario_model, scenario_summary, simulate_chunk,
+)
+from analytics.panel import to_matrix
+from components.charts import plotly_chart
+from components.data import load_dataset, load_metadata
+from components.download import export_data
+from components.prefetch import fetch
+from components.view_state import share_view, url_state
+from components.workers import run_tasks
+
+gdp = load_dataset("gdp")
+growth = load_dataset("gdp_growth")
+data_version = (artifact_hash("gdp"), artifact_hash("gdp_growth"))
+
+# GDP levels of individual economies with their growth history aligned row by row, built once
+# per dataset; the last year with GDP levels is the base the projections start from
+@st.cache_resource
+def load_inputs(gdp, growth):
+    gdp = gdp[gdp["Country Code"].isin(load_metadata()["Country Code"])]
+    names, codes, years, levels = to_matrix(gdp, "Country Name", "Country Code")
+    aligned = growth.set_index("Country Code").reindex(codes).reset_index()
+    _, _, growth_years, growth_values = to_matrix(aligned, "Country Name", "Country Code")
+    return {
+        "names": names,
+        "codes": codes,
+        "years": years,
+        "levels": levels,
+        "growth_years": growth_years,
+        "growth": growth_values,
+        "base_year": int(years[-1]),
+    }
+
+# One scenario: fit, simulate its chunks side by side on the worker pool and merge. Kept per
+# scenario hash for all sessions (and on disk), so a scenario seen before shows at once.
+def run_scenario(inputs, params):
+    model = scenario_model(
+        inputs["codes"], inputs["names"], inputs["levels"][:, -1], inputs["growth"], inputs["growth_years"],
+        params["history"], params["horizon"], dict(params["overrides"]), params["correlated"],
+    )
+    chunks = run_tasks(simulate_chunk, scenario_chunks(model, params["paths"]))
+    return scenario_summary(model, chunks, inputs["base_year"])
+
+inputs = load_inputs(gdp, growth)
+base_year = inputs["base_year"]
+first_growth_year = int(inputs["growth_years"][0])
+
+st.title("GDP Scenarios")
+st.markdown(
+    f"Monte Carlo projections of every economy's GDP from {base_year}. Each simulated path draws a year of growth "
+    "per country from its historical average and volatility (or your own assumptions), so the spread of outcomes "
+    "shows how uncertain the ranking of economies becomes over the years."
+)
+
+# Scenario settings apply together, since every change runs a new simulation
+with st.sidebar.form("scenario"):
+    st.header("Scenario")
+    url_state("horizon", 15, range(10, 31))
+    horizon = st.slider("Horizon (years)", 10, 30, key="horizon")
+    path_options = [10_000, 20_000, 50_000]
+    url_state("paths", path_options[0], path_options)
+    n_paths = st.select_slider("Simulated Paths", path_options, key="paths", format_func=lambda n: f"{n:,}")
+    url_state("history", (2000, base_year), range(first_growth_year, base_year + 1))
+    history = st.slider("Fit Growth Over", first_growth_year, base_year, key="history")
+    url_state("correlated", True, [True, False])
+    correlated = st.toggle(
+        "Correlated shocks", key="correlated",
+        help="Draw each year's shocks with the correlation countries' growth had over the same years, "
+             "so world recessions hit many economies at once.",
+    )
+    st.form_submit_button("Run Simulation", type="primary")
+
+# Growth assumptions: the fitted values, editable per country
+log_growth, mu, sigma = fit_growth(inputs["growth"], inputs["growth_years"], history)
+fitted_growth, fitted_volatility = growth_percent(mu, sigma)
+assumptions = pd.DataFrame({
+    "Country": inputs["names"],
+    "Country Code": inputs["codes"],
+    "Growth (%)": np.round(fitted_growth, 2),
+    "Volatility (%)": np.round(fitted_volatility, 2),
+})[inputs["levels"][:, -1] > 0].dropna()
+with st.expander("Growth Assumptions"):
+    st.caption(
+        f"Average yearly growth and its standard deviation over {history[0]}-{history[1]}. Edit a row to set "
+        "your own assumption for that country; the scenario reruns with it."
+    )
+    edited = st.data_editor(
+        assumptions,
+        key=f"assumptions_{history[0]}_{history[1]}",
+        hide_index=True,
+        disabled=["Country", "Country Code"],
+        column_config={
+            "Growth (%)": st.column_config.NumberColumn(min_value=-20.0, max_value=30.0, step=0.1, format="%.2f"),
+            "Volatility (%)": st.column_config.NumberColumn(min_value=0.0, max_value=30.0, step=0.1, format="%.2f"),
+        },
+    )
+changed = (edited["Growth (%)"] != assumptions["Growth (%)"]) | (edited["Volatility (%)"] != assumptions["Volatility (%)"])
+overrides = tuple(
+    (code, (float(g), float(v)))
+    for code, g, v in edited.loc[changed, ["Country Code", "Growth (%)", "Volatility (%)"]].itertuples(index=False)
+)
+
+params = {
+    "horizon": horizon,
+    "paths": n_paths,
+    "history": tuple(history),
+    "correlated": correlated,
+    "overrides": overrides,
+}
+scenario = scenario_hash(params)
+with st.spinner(f"Simulating {n_paths:,} paths of {len(assumptions)} economies..."):
+    result = fetch(("scenarios", *data_version, scenario), run_scenario, inputs, params)
+
+names = list(result["names"])
+years = result["years"]
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Simulated Paths", f"{result['n_paths']:,}")
+col2.metric("Economies", f"{len(names)}")
+col3.metric("Horizon", f"{base_year + 1}-{int(years[-1])}")
+col4.metric("Custom Assumptions", f"{len(overrides)}", help=f"Scenario {scenario}")
+
+# Fan chart: median path with the 50% and 90% ranges of the simulated GDP
+st.subheader("Projected GDP")
+largest = [names[i] for i in np.argsort(-result["base_levels"])[:5]]
+url_state("countries", largest, names)
+selected = st.multiselect("Select Countries", names, key="countries")
+if selected:
+    history_years = inputs["years"][-15:]
+    fig_fan = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for k, country in enumerate(selected):
+        i = names.index(country)
+        row = int(np.flatnonzero(inputs["names"] == country)[0])
+        color = colors[k % len(colors)]
+        x = np.concatenate([[base_year], years])
+        q = np.concatenate([np.full((len(QUANTILES), 1), result["base_levels"][i]), result["fan"][:, :, i]], axis=1) / 1e12
+        for low, high, opacity in ((0, 4, 0.12), (1, 3, 0.25)):
+            fig_fan.add_trace(go.Scatter(
+                x=np.concatenate([x, x[::-1]]), y=np.concatenate([q[high], q[low][::-1]]),
+                fill="toself", fillcolor=color, opacity=opacity, line={"width": 0},
+                hoverinfo="skip", showlegend=False, legendgroup=country,
+            ))
+        fig_fan.add_trace(go.Scatter(
+            x=history_years, y=inputs["levels"][row, -len(history_years):] / 1e12, mode="lines",
+            line={"color": color}, name=country, legendgroup=country,
+            hovertemplate=f"{country}<br>%{{x}}: $%{{y:.2f}}T<extra></extra>",
+        ))
+        fig_fan.add_trace(go.Scatter(
+            x=x, y=q[2], mode="lines", line={"color": color, "dash": "dash"}, showlegend=False,
+            legendgroup=country, customdata=np.stack([q[0], q[4]], axis=1),
+            hovertemplate=f"{country}<br>%{{x}} median: $%{{y:.2f}}T<br>90% range: $%{{customdata[0]:.2f}}T-$%{{customdata[1]:.2f}}T<extra></extra>",
+        ))
+    fig_fan.update_layout(
+        title=f"GDP Projections, {base_year}-{int(years[-1])} (median, 50% and 90% ranges)",
+        xaxis_title="Year", yaxis_title="GDP (trillion current USD, log scale)", yaxis_type="log",
+    )
+    plotly_chart(fig_fan)
+
+# Overtaking probabilities among the largest economies
+st.subheader("Who Overtakes Whom")
+pair_names = [names[i] for i in result["pairs"]]
+url_state("challenger", "India" if "India" in pair_names else pair_names[1], pair_names)
+url_state("leader", "Japan" if "Japan" in pair_names else pair_names[0], pair_names)
+# The year slider spans the longest horizon, so changing the horizon does not reset it
+url_state("by", base_year + 12, range(base_year + 1, base_year + 31))
+col1, col2, col3 = st.columns(3)
+challenger = col1.selectbox("Country", pair_names, key="challenger")
+leader = col2.selectbox("Passes", pair_names, key="leader")
+by_year = col3.slider("By", base_year + 1, base_year + 30, key="by")
+if by_year > years[-1]:
+    st.caption(f"{by_year} is beyond this scenario's horizon; showing {int(years[-1])}.")
+    by_year = int(years[-1])
+a, b = pair_names.index(challenger), pair_names.index(leader)
+t = int(np.searchsorted(years, by_year))
+if a == b:
+    st.info("Choose two different countries.")
+else:
+    ahead_now = result["base_levels"][result["pairs"][a]] > result["base_levels"][result["pairs"][b]]
+    if ahead_now:
+        st.metric(f"Chance {challenger} is still ahead of {leader} in {by_year}", f"{result['ahead'][t, a, b]:.0%}",
+                  help=f"{challenger}'s GDP was already larger in {base_year}.")
+    else:
+        st.metric(f"Chance {challenger} passes {leader} by {by_year}", f"{result['passed'][t, a, b]:.0%}")
+    overtaking = pd.DataFrame({
+        "Year": years,
+        f"Has passed {leader} by then": result["passed"][:, a, b],
+        f"Ahead of {leader} that year": result["ahead"][:, a, b],
+    })
+    fig_pass = px.line(
+        overtaking, x="Year", y=overtaking.columns[1:], markers=True,
+        title=f"{challenger} vs {leader}", labels={"value": "Share of simulated paths", "variable": ""},
+    )
+    fig_pass.update_yaxes(tickformat=".0%", range=[0, 1])
+    plotly_chart(fig_pass)
+
+# Rank outlook for the chosen year
+st.subheader(f"Rank Outlook for {by_year}")
+share = result["rank_share"][t]
+cumulative = np.cumsum(share, axis=1)
+ranks = pd.DataFrame({
+    "Country": names,
+    f"Rank in {base_year}": np.argsort(np.argsort(-result["base_levels"])) + 1,
+    "Median Rank": (cumulative < 0.5).sum(axis=1) + 1,
+    "Chance of Top 3": cumulative[:, 2],
+    "Chance of Top 10": cumulative[:, 9],
+    f"Median GDP {by_year} (USD bn)": result["fan"][2, t] / 1e9,
+    "Growth (%)": result["growth"],
+    "Volatility (%)": result["volatility"],
+}).sort_values(f"Median GDP {by_year} (USD bn)", ascending=False)
+st.dataframe(
+    ranks.head(25),
+    hide_index=True,
+    column_config={
+        "Chance of Top 3": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1),
+        "Chance of Top 10": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1),
+        f"Median GDP {by_year} (USD bn)": st.column_config.NumberColumn(format="%.0f"),
+        "Growth (%)": st.column_config.NumberColumn(format="%.2f"),
+        "Volatility (%)": st.column_config.NumberColumn(format="%.2f"),
+    },
+)
+export_data(ranks, f"gdp_scenario_{scenario}_{by_year}")
+st.caption(
+    "Growth is drawn independently from year to year, from a normal distribution of log growth. Scenarios with the same "
+    "settings give the same result and are computed once."
+)
+
+# Keep the address bar in step with the view, so the URL can be shared or bookmarked
+share_view(["horizon", "paths", "history", "correlated", "countries", "challenger", "leader", "by"])
@@ -2,13 +2,32 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 import scipy.stats as stats
-from pathlib import Path
-
-@st.cache_data
+from analytics.ranks import rank_matrix, top_bottom
+from analytics.cagr import log_levels
+from analytics.compact import compact_figure
+from analytics.cube import rollup, drilldown
+from analytics.contribution import growth_contributions, top_contributors
+from analytics.datasets import artifact_hash
+from analytics.distribution import percentile_bands
+from analytics.figures import comparison_bar, comparison_line, comparison_pie, comparison_scatter
+from analytics.inequality import inequality_panel
+from components.cagr import cagr_calculator
+from components.charts import build_figures, plotly_chart
+from components.controls import control_panel
+from components.data import load_cube, load_dataset, load_metadata
+from components.distribution import distribution_view
+from components.download import export_data
+from components.inequality import inequality_view
+from components.mapimage import low_bandwidth, map_image, map_image_task
+from components.prefetch import fetch, prefetch
+from components.ranking import bump_chart, rank_movers_table
+from components.view_state import share_view, url_state, view_result
+
+@st.cache_resource
 def load_data():
-    file_path = Path(__file__).parent.parent / 'Datasets' / 'New_folder' / 'GDP_1960_to_2022.csv'#'./Datasets/New_folder/GDP_1960_to_2022.csv'  # Adjust this path as needed
-    data = pd.read_csv(file_path)
+    data = load_dataset("gdp").rename(columns={"Country Name": "Country"})
     data_long = data.melt(
         id_vars=["Country", "Country Code"],
         var_name="Year",
@@ -17,24 +36,145 @@ def load_data():
     data_long["Year"] = pd.to_numeric(data_long["Year"], errors="coerce")
     data_long["GDP"] = pd.to_numeric(data_long["GDP"], errors="coerce")
 
-    exclude_list = [
-        "World", "High income", "Low income", "OECD members", "Post-demographic dividend",
-        "IDA & IBRD total", "IDA total", "IBRD only", "Middle income", "Upper middle income",
-        "Low & middle income", "East Asia & Pacific", "Late-demographic dividend", "Early default dividend"
-    ]
-    data_long = data_long[~data_long["Country"].isin(exclude_list)]
+    # Keep individual economies only; aggregates have no region in the World Bank metadata
+    data_long = data_long[data_long["Country Code"].isin(load_metadata()["Country Code"])]
     return data_long.dropna(subset=["GDP"])
 
+# Rank of every country in every year, rebuilt only when the data changes
+@st.cache_resource
+def load_rank_index(data):
+    wide = data.dropna(subset=["Year"]).pivot(index="Country", columns="Year", values="GDP")
+    values = wide.to_numpy(dtype=float)
+    return wide.index.to_numpy(), wide.columns.to_numpy(dtype=int), values, rank_matrix(values)
+
+# Cumulative log GDP for every country, so compound growth between any two years is a subtraction
+@st.cache_resource
+def load_cumulative_gdp(data):
+    wide = data.dropna(subset=["Year"]).pivot(index=["Country", "Country Code"], columns="Year", values="GDP")
+    return (
+        wide.index.get_level_values("Country").to_numpy(),
+        wide.index.get_level_values("Country Code").to_numpy(),
+        wide.columns.to_numpy(dtype=int),
+        log_levels(wide.to_numpy(dtype=float)),
+    )
+
+# Lorenz curves, Gini and top shares for every year, cached per dataset version
+@st.cache_resource
+def load_inequality(data):
+    _, years, values, _ = load_rank_index(data)
+    return inequality_panel(values, years)
+
+# Every economy's contribution to world GDP growth in every year, its share of world GDP
+# times its real growth, so attributing any year's growth is a column lookup
+@st.cache_resource
+def load_contributions(data, growth):
+    wide = data.dropna(subset=["Year"]).pivot(index=["Country", "Country Code"], columns="Year", values="GDP")
+    years = wide.columns.to_numpy(dtype=int)
+    growth = growth.set_index("Country Code").reindex(
+        index=wide.index.get_level_values("Country Code"), columns=[str(year) for year in years]
+    )
+    panel = growth_contributions(
+        wide.to_numpy(dtype=float), growth.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float), years
+    )
+    panel["names"] = wide.index.get_level_values("Country").to_numpy()
+    return panel
+
 gdp_data = load_data()
+data_version = artifact_hash("gdp")
+growth_version = artifact_hash("gdp_growth")
+
+# Derived data each view needs, read through the prefetch store so the next view's can be
+# built in the background while the current one is on screen
+DERIVED = {
+    "rank_index": (load_rank_index, gdp_data),
+    "cumulative": (load_cumulative_gdp, gdp_data),
+    "inequality": (load_inequality, gdp_data),
+    "contributions": (load_contributions, gdp_data, load_dataset("gdp_growth")),
+}
+VIEW_NEEDS = {
+    "Dashboard": ["rank_index", "inequality", "contributions"],
+    "Distribution": ["rank_index"],
+    "Top/Bottom Performers": ["rank_index"],
+    "CAGR Calculator": ["cumulative"],
+    "Inequality": ["inequality"],
+}
+
+def derived_key(name):
+    # Contributions also read the growth artifact, so its version is part of their key
+    return ("gdp", name, data_version) + ((growth_version,) if name == "contributions" else ())
+
+def derived(name):
+    return fetch(derived_key(name), *DERIVED[name])
+
+# Choropleth for one year and color scale; adjacent years are prefetched from the World Map view.
+# It is compacted here, once, before the result store shares it between sessions.
+def world_map_figure(year, color_scale):
+    year_data = gdp_data[gdp_data["Year"] == year]
+    return compact_figure(px.choropleth(
+        year_data,
+        locations="Country Code",
+        color="GDP",
+        hover_name="Country",
+        title=f"World GDP Distribution in {year}",
+        color_continuous_scale=color_scale,
+        labels={"GDP": "GDP (USD)"}
+    ))
+
+# The same map as a server-rendered image for the low-bandwidth mode: map_image arguments
+def world_map_image(year, color_scale):
+    year_data = gdp_data[gdp_data["Year"] == year]
+    return (
+        ("gdp", data_version, year), year_data["Country Code"].to_numpy(), year_data["GDP"].to_numpy(),
+        f"World GDP Distribution in {year}", color_scale, "GDP (USD)",
+    )
+
+# Percentile bands of GDP across the economies of one region (all of them for "All"), kept
+# per region so switching back and forth does not recompute them
+def load_distribution(data, region):
+    if region != "All":
+        metadata = load_metadata()
+        data = data[data["Country Code"].isin(metadata.loc[metadata["Region"] == region, "Country Code"])]
+    wide = data.dropna(subset=["Year"]).pivot(index="Country Code", columns="Year", values="GDP")
+    return percentile_bands(wide.to_numpy(dtype=float), wide.columns.to_numpy(dtype=int))
+
+# Summary statistics of one country's GDP series
+def country_statistics(country):
+    gdp_values = gdp_data.loc[gdp_data["Country"] == country, "GDP"].dropna()
+    mean_gdp = gdp_values.mean()
+    q1, median, q3 = gdp_values.quantile([0.25, 0.5, 0.75])
+    return {
+        "mean": mean_gdp,
+        "median": median,
+        "std": gdp_values.std(),
+        "quartile_deviation": (q3 - q1) / 2,
+        "mean_deviation": (gdp_values - mean_gdp).abs().mean(),
+        "kurtosis": stats.kurtosis(gdp_values),
+        "skewness": stats.skew(gdp_values),
+    }
+
+# URL query parameters of each view besides "view" and "year", so a copied link reopens it
+VIEW_PARAMS = {
+    "Dashboard": ["top_n", "contrib_range"],
+    "Country Analysis": ["country"],
+    "Comparison": ["countries"],
+    "Distribution": ["dist_region", "countries"],
+    "Top/Bottom Performers": ["gdp_bump_countries", "gdp_bump_years", "gdp_movers_start", "gdp_movers_end"],
+    "World Map": ["map_year", "scale"],
+    "CAGR Calculator": ["gdp_cagr_range"],
+    "Regional Breakdown": ["level", "member"],
+    "Inequality": ["gdp_lorenz_years"],
+}
 
 st.sidebar.title("Navigation")
-menu = st.sidebar.radio(
-    "Go to",
-    ["Dashboard", "Country Analysis", "Comparison", "Top/Bottom Performers", "World Map"]
-)
+views = ["Dashboard", "Country Analysis", "Comparison", "Distribution", "Top/Bottom Performers", "World Map", "CAGR Calculator", "Regional Breakdown", "Inequality"]
+url_state("view", views[0], views)
+menu = st.sidebar.radio("Go to", views, key="view")
 
 st.sidebar.header("Key Metrics")
-selected_year = st.sidebar.slider("Select Year", min_value=int(gdp_data["Year"].min()), max_value=int(gdp_data["Year"].max()), value=2022)
+min_year, max_year = int(gdp_data["Year"].min()), int(gdp_data["Year"].max())
+url_state("year", 2022, range(min_year, max_year + 1))
+with control_panel("year") as controls:
+    selected_year = controls.slider("Select Year", min_value=min_year, max_value=max_year, key="year")
 global_gdp_year = gdp_data[gdp_data["Year"] == selected_year]["GDP"].sum()
 top_country_data = gdp_data[gdp_data["Year"] == selected_year].sort_values(by="GDP", ascending=False).iloc[0]
 
@@ -57,11 +197,11 @@ st.sidebar.markdown(
     f"""
     <div class="metric-container">
         <p><strong>Global GDP (USD):</strong></p>
-        <p class="metric-value">{global_gdp_year:,.2f}</p>
+        <p class="metric-value">{global_gdp_year:,.0f}</p>
         <p><strong>Top Country:</strong></p>
         <p class="metric-value">{top_country_data['Country']}</p>
         <p><strong>Top Country GDP:</strong></p>
-        <p class="metric-value">{top_country_data['GDP']:,.2f} USD</p>
+        <p class="metric-value">{top_country_data['GDP']:,.0f} USD</p>
     </div>
     """,
     unsafe_allow_html=True,
@@ -73,24 +213,82 @@ st.sidebar.write(f"Number of Records: {len(gdp_data):,}")
 st.sidebar.write(f"Number of Countries: {gdp_data['Country'].nunique()}")
 
 # App Title
-st.title("Global GDP Analysis Dashboard (1960-2022)")
+st.title(f"Global GDP Analysis Dashboard ({int(gdp_data['Year'].min())}-{int(gdp_data['Year'].max())})")
 
 if menu == "Dashboard":
     st.header("Global GDP Trends")
     global_gdp = gdp_data.groupby("Year")["GDP"].sum().reset_index()
     fig = px.line(global_gdp, x="Year", y="GDP", title="Total Global GDP Over Time", labels={"GDP": "Total GDP (USD)"})
-    st.plotly_chart(fig)
+    plotly_chart(fig)
+    export_data(global_gdp, "global_gdp")
     st.write("""
     **Insights:**
     - Consistent global GDP growth indicates economic development over decades.
     - Significant dips reflect global financial crises or events.
     """)
 
+    # Which economies drove world growth: each one's share of world GDP times its growth,
+    # stacked per year, with the largest contributors over the range shown on their own
+    st.header("Contributions to World GDP Growth")
+    contributions = derived("contributions")
+    contribution_years = contributions["years"]
+    url_state("top_n", 8, range(3, 16))
+    url_state("contrib_range", (1991, int(contribution_years[-1])), range(int(contribution_years[0]), int(contribution_years[-1]) + 1))
+    col1, col2 = st.columns([1, 3])
+    top_n = col1.number_input("Largest Contributors", min_value=3, max_value=15, key="top_n")
+    contrib_range = col2.slider(
+        "Years", int(contribution_years[0]), int(contribution_years[-1]), key="contrib_range"
+    )
+    start_idx = int(np.searchsorted(contribution_years, contrib_range[0]))
+    end_idx = int(np.searchsorted(contribution_years, contrib_range[1])) + 1
+    top_rows, rest = top_contributors(contributions, top_n, start_idx, end_idx)
+    span = contribution_years[start_idx:end_idx]
+    stacked = pd.DataFrame(contributions["contributions"][top_rows, start_idx:end_idx].T,
+                           index=span, columns=contributions["names"][top_rows])
+    stacked["Rest of World"] = rest
+    stacked = stacked.rename_axis("Year").reset_index().melt(
+        id_vars="Year", var_name="Country", value_name="Contribution (pp)"
+    )
+    fig = px.bar(stacked, x="Year", y="Contribution (pp)", color="Country",
+                 title=f"Contributions to World Real GDP Growth, {contrib_range[0]}-{contrib_range[1]}")
+    fig.update_layout(barmode="relative")
+    fig.add_trace(go.Scatter(x=span, y=contributions["world"][start_idx:end_idx], mode="lines+markers",
+                             name="World Growth (%)", line={"color": "black"}))
+    plotly_chart(fig)
+    export_data(stacked, f"gdp_growth_contributions_{contrib_range[0]}_{contrib_range[1]}")
+
+    # Attribution of the selected year's growth, read straight from its column
+    if contribution_years[0] <= selected_year <= contribution_years[-1]:
+        year_idx = int(np.searchsorted(contribution_years, selected_year))
+        year_contributions = contributions["contributions"][:, year_idx]
+        order = np.argsort(-np.abs(year_contributions))[:10]
+        st.write(f"**World growth in {selected_year}: {contributions['world'][year_idx]:.2f}%** "
+                 f"({contributions['coverage'][year_idx]:.0%} of world GDP covered). Largest contributors:")
+        st.dataframe(pd.DataFrame({
+            "Country": contributions["names"][order],
+            "Contribution (pp)": year_contributions[order],
+            "Share of World Growth": year_contributions[order] / contributions["world"][year_idx],
+        }), hide_index=True, column_config={
+            "Contribution (pp)": st.column_config.NumberColumn(format="%.3f"),
+            "Share of World Growth": st.column_config.NumberColumn(format="percent"),
+        })
+    st.write("""
+    **Insights:**
+    - A country's contribution is its share of world GDP in the previous year (current USD) times its real growth, so the bars of a year add up to world growth.
+    - Large economies dominate in most years; in crisis years the bars show which economies pulled world growth down.
+    """)
+
     # Donut Chart for GDP Contribution by Top Countries
     st.header("Top Contributors to GDP")
-    top_countries = gdp_data[gdp_data["Year"] == selected_year].sort_values(by="GDP", ascending=False).head(10)
-    fig = px.pie(top_countries, names="Country", values="GDP", title="Top 10 Countries' Contribution to Global GDP", hole=0.4)
-    st.plotly_chart(fig)
+    rank_names, rank_years, rank_values, rank_index = derived("rank_index")
+    year_idx = int(np.searchsorted(rank_years, selected_year))
+    top_rows, _ = top_bottom(rank_index, year_idx)
+    top_countries = pd.DataFrame({"Country": rank_names[top_rows], "GDP": rank_values[top_rows, year_idx]})
+    rest_of_world = derived("inequality")["totals"][year_idx] - top_countries["GDP"].sum()
+    pie_data = pd.concat([top_countries, pd.DataFrame({"Country": ["Rest of World"], "GDP": [rest_of_world]})])
+    fig = px.pie(pie_data, names="Country", values="GDP", title="Top 10 Countries' Contribution to Global GDP", hole=0.4)
+    plotly_chart(fig)
+    export_data(top_countries, f"gdp_top_10_{selected_year}")
     st.write("""
     **Insights:**
     - The top 10 countries contribute a major portion to global GDP, reflecting their industrial and economic strength.
@@ -100,43 +298,35 @@ if menu == "Dashboard":
 elif menu == "Country Analysis":
     st.header("Country-Specific Analysis")
     countries = gdp_data["Country"].unique()
-    selected_country = st.selectbox("Select a Country", options=countries)
+    url_state("country", countries[0], countries)
+    selected_country = st.selectbox("Select a Country", options=countries, key="country")
     country_data = gdp_data[gdp_data["Country"] == selected_country]
 
     # Line Chart for GDP Trends
     fig = px.line(country_data, x="Year", y="GDP", title=f"GDP Trends for {selected_country}", labels={"GDP": "GDP (USD)"})
-    st.plotly_chart(fig)
-
-    # Calculate previous statistical metrics
-    mean_gdp = country_data["GDP"].mean()
-    median_gdp = country_data["GDP"].median()
-    std_gdp = country_data["GDP"].std()
-
-    # Calculate new statistical metrics
-    gdp_values = country_data.dropna(subset=["GDP"])["GDP"]
-
-    # Quartile Deviation
-    q1 = gdp_values.quantile(0.25)
-    q3 = gdp_values.quantile(0.75)
-    quartile_deviation = (q3 - q1) / 2
-
-    # Mean Deviation
-    mean_deviation = (gdp_values - mean_gdp).abs().mean()
-
-    # Kurtosis and Skewness
-    kurtosis = stats.kurtosis(gdp_values)
-    skewness = stats.skew(gdp_values)
+    plotly_chart(fig)
+    export_data(gdp_data, f"gdp_{selected_country}", rows=gdp_data["Country"] == selected_country)
+
+    # Statistical metrics, computed once per country and shared by every link to this view
+    statistics = view_result(("gdp", data_version, "country_statistics"), ["country"], country_statistics, selected_country)
+    mean_gdp = statistics["mean"]
+    median_gdp = statistics["median"]
+    std_gdp = statistics["std"]
+    quartile_deviation = statistics["quartile_deviation"]
+    mean_deviation = statistics["mean_deviation"]
+    kurtosis = statistics["kurtosis"]
+    skewness = statistics["skewness"]
 
     # Function to format GDP in both full and shortened form
     def format_gdp(value):
         if value >= 1e12:
-            return f"{value:,.2f} USD ({value/1e12:.1f} Trillion)"
+            return f"{value:,.0f} USD ({value/1e12:.1f} Trillion)"
         elif value >= 1e9:
-            return f"{value:,.2f} USD ({value/1e9:.1f} Billion)"
+            return f"{value:,.0f} USD ({value/1e9:.1f} Billion)"
         elif value >= 1e6:
-            return f"{value:,.2f} USD ({value/1e6:.1f} Million)"
+            return f"{value:,.0f} USD ({value/1e6:.1f} Million)"
         else:
-            return f"{value:,.2f} USD"
+            return f"{value:,.0f} USD"
 
     st.subheader("Statistical Metrics")
 
@@ -182,12 +372,23 @@ elif menu == "Country Analysis":
 
 elif menu == "Comparison":
     st.header("Multi-Country Comparison")
-    selected_countries = st.multiselect("Select Countries for Comparison", options=gdp_data["Country"].unique(), default=gdp_data["Country"].unique()[:5])
+    all_countries = gdp_data["Country"].unique()
+    url_state("countries", list(all_countries[:5]), all_countries)
+    selected_countries = st.multiselect("Select Countries for Comparison", options=all_countries, key="countries")
     comparison_data = gdp_data[gdp_data["Country"].isin(selected_countries)]
-    
+
+    # The five charts are independent, so they are built side by side from the one slice
+    figures = build_figures({
+        "line": (comparison_line, {}),
+        "bar": (comparison_bar, {"year": selected_year}),
+        "scatter": (comparison_scatter, {"year": selected_year}),
+        "pie": (comparison_pie, {"year": selected_year}),
+        "donut": (comparison_pie, {"year": selected_year, "hole": 0.4}),
+    }, comparison_data[["Country", "Year", "GDP"]])
+
     # Line Chart for GDP Trends across selected countries
-    fig = px.line(comparison_data, x="Year", y="GDP", color="Country", title="GDP Comparison Across Selected Countries")
-    st.plotly_chart(fig)
+    plotly_chart(figures["line"])
+    export_data(gdp_data, "gdp_comparison", rows=gdp_data["Country"].isin(selected_countries))
 
     with st.expander("Insights for Line Chart"):
         st.write("""
@@ -198,9 +399,7 @@ elif menu == "Comparison":
         """)
 
     # Bar Chart for GDP Comparison in the selected year
-    latest_comparison = comparison_data[comparison_data["Year"] == selected_year]
-    fig = px.bar(latest_comparison, x="Country", y="GDP", color="Country", title=f"GDP in {selected_year}")
-    st.plotly_chart(fig)
+    plotly_chart(figures["bar"])
 
     with st.expander("Insights for Bar Chart"):
         st.write("""
@@ -210,8 +409,7 @@ elif menu == "Comparison":
         """)
 
     # Scatterplot to compare GDP values across countries in a specific year (selected_year)
-    fig = px.scatter(latest_comparison, x="Country", y="GDP", size="GDP", color="Country", hover_name="Country", title=f"GDP Scatter Plot for {selected_year}")
-    st.plotly_chart(fig)
+    plotly_chart(figures["scatter"])
 
     with st.expander("Insights for Scatter Plot"):
         st.write("""
@@ -221,8 +419,7 @@ elif menu == "Comparison":
         """)
 
     # Pie Chart to visualize GDP distribution across the selected countries in the chosen year
-    fig = px.pie(latest_comparison, names="Country", values="GDP", title=f"GDP Distribution Among Selected Countries in {selected_year}")
-    st.plotly_chart(fig)
+    plotly_chart(figures["pie"])
 
     with st.expander("Insights for Pie Chart"):
         st.write("""
@@ -232,8 +429,7 @@ elif menu == "Comparison":
         """)
 
     # Donut chart for GDP distribution among selected countries
-    fig = px.pie(latest_comparison, names="Country", values="GDP", hole=0.4, title=f"GDP Distribution Among Selected Countries (Donut Chart) in {selected_year}")
-    st.plotly_chart(fig)
+    plotly_chart(figures["donut"])
 
     with st.expander("Insights for Donut Chart"):
         st.write("""
@@ -274,11 +470,45 @@ elif menu == "Comparison":
 #     - Bottom performers represent smaller or struggling economies with limited resources or challenges.
 #     """)
 
+elif menu == "Distribution":
+    st.header("Distribution of GDP Over Time")
+    rank_names, rank_years, rank_values, _ = derived("rank_index")
+    regions = sorted(load_metadata()["Region"].dropna().unique())
+    url_state("dist_region", "All", ["All"] + regions)
+    url_state("countries", list(gdp_data["Country"].unique()[:5]), rank_names)
+    col1, col2 = st.columns([1, 2])
+    region = col1.selectbox("Countries From", ["All"] + regions, key="dist_region")
+    selected_countries = col2.multiselect("Highlight Countries", options=rank_names, key="countries")
+    bands = fetch(("gdp", "distribution", data_version, region), load_distribution, gdp_data, region)
+    overlays = {country: (rank_years, rank_values[rank_names == country][0]) for country in selected_countries}
+    table = distribution_view(bands, overlays, "GDP", "GDP (current USD, log scale)", log_y=True, value_format="$.3s")
+    if table is not None:
+        export_data(table, f"gdp_distribution_{region}")
+
+    with st.expander("About This Chart"):
+        st.write("""
+        - The bands show where the economies of the selection stand each year: half of them lie within the darker band, nine in ten within the lighter one, and the line is the median.
+        - Highlighted countries are drawn over the bands, so their position in the distribution can be followed over time, whichever region they belong to.
+        - Only countries with data for a year count towards it, so early years rest on fewer countries.
+        """)
+
 elif menu == "Top/Bottom Performers":
     st.header("Top/Bottom Performers")
-    year_data = gdp_data[gdp_data["Year"] == selected_year].sort_values(by="GDP", ascending=False)
-    top_performers = year_data.head(10)
-    bottom_performers = year_data.tail(10)
+    rank_names, rank_years, rank_values, rank_index = derived("rank_index")
+    year_idx = int(np.searchsorted(rank_years, selected_year))
+
+    # Top and bottom 10 are read from the precomputed rank order
+    top_rows, bottom_rows = top_bottom(rank_index, year_idx)
+    top_performers = pd.DataFrame({"Country": rank_names[top_rows], "GDP": rank_values[top_rows, year_idx]})
+    bottom_performers = pd.DataFrame({"Country": rank_names[bottom_rows[::-1]], "GDP": rank_values[bottom_rows[::-1], year_idx]})
+
+    ranked_rows = rank_index["order"][:rank_index["counts"][year_idx], year_idx]
+    year_data = pd.DataFrame({
+        "Rank": np.arange(1, len(ranked_rows) + 1),
+        "Country": rank_names[ranked_rows],
+        "GDP": rank_values[ranked_rows, year_idx],
+    })
+    export_data(year_data, f"gdp_ranking_{selected_year}")
 
     # Function to format GDP values in a shortened format
     def format_value(value):
@@ -295,7 +525,7 @@ elif menu == "Top/Bottom Performers":
     st.subheader(f"Top 10 Performers in {selected_year}")
     top_performers["Formatted GDP"] = top_performers["GDP"].apply(format_value)
     fig = px.bar(top_performers, x="Country", y="GDP", title="Top 10 Performing Countries", text="Formatted GDP")
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
     # Explanation inside an expander for Top Performers
     with st.expander("Top Performers Insights"):
@@ -310,7 +540,7 @@ elif menu == "Top/Bottom Performers":
     st.subheader(f"Bottom 10 Performers in {selected_year}")
     bottom_performers["Formatted GDP"] = bottom_performers["GDP"].apply(format_value)
     fig = px.bar(bottom_performers, x="Country", y="GDP", title="Bottom 10 Performing Countries", text="Formatted GDP")
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
     # Explanation inside an expander for Bottom Performers
     with st.expander("Bottom Performers Insights"):
@@ -321,35 +551,37 @@ elif menu == "Top/Bottom Performers":
         - **Growth potential** exists through **investments in infrastructure** and **economic reforms**.
         """)
 
+    # Bump Chart of ranks over time
+    st.subheader("GDP Rank Over Time")
+    bump_chart(rank_names, rank_years, rank_index, selected_year, "GDP", key="gdp")
+
+    # Biggest rank movers between two years
+    st.subheader("Biggest Rank Movers")
+    movers = rank_movers_table(rank_names, rank_years, rank_index, "GDP", key="gdp")
+    export_data(movers, "gdp_rank_movers")
+
 
 elif menu == "World Map":
     st.header("Interactive World Map")
 
     # Select Year for the map
-    selected_year = st.sidebar.selectbox("Select Year", gdp_data["Year"].unique())
-
-    # Filter data for selected year
-    year_data = gdp_data[gdp_data["Year"] == selected_year]
-
-    # Customizable Color Scale
-    color_scale = st.sidebar.selectbox(
-        "Select Color Scale", 
-        ['Plasma', 'Viridis', 'Cividis', 'Inferno', 'Blues', 'RdYlGn', 'YlGnBu', 'Turbo']
-    )
-
-    # Interactive Choropleth Map with user-selected color scale
-    fig = px.choropleth(
-        year_data,
-        locations="Country Code",
-        color="GDP",
-        hover_name="Country",
-        title=f"World GDP Distribution in {selected_year}",
-        color_continuous_scale=color_scale,
-        labels={"GDP": "GDP (USD)"}
-    )
-
-    # Display Map
-    st.plotly_chart(fig)
+    map_years = gdp_data["Year"].unique()
+    url_state("map_year", int(map_years[0]), map_years)
+    color_scales = ['Plasma', 'Viridis', 'Cividis', 'Inferno', 'Blues', 'RdYlGn', 'YlGnBu', 'Turbo']
+    url_state("scale", color_scales[0], color_scales)
+    with control_panel("map") as controls:
+        selected_year = controls.selectbox("Select Year", map_years, key="map_year")
+
+        # Customizable Color Scale
+        color_scale = controls.selectbox("Select Color Scale", color_scales, key="scale")
+
+    # Interactive Choropleth Map with user-selected color scale, or its image in low-bandwidth mode
+    if low_bandwidth():
+        map_image(*world_map_image(selected_year, color_scale))
+    else:
+        fig = fetch(("gdp", "map", data_version, selected_year, color_scale), world_map_figure, selected_year, color_scale)
+        plotly_chart(fig)
+    export_data(gdp_data, f"gdp_map_{selected_year}", rows=gdp_data["Year"] == selected_year)
 
     # Add Color Customization Description
     st.subheader("Color Customization")
@@ -365,3 +597,89 @@ elif menu == "World Map":
         You can adjust the color scale and download a detailed report that includes key GDP information and charts.
         """)
 
+
+elif menu == "CAGR Calculator":
+    st.header("Compound Annual Growth Rate (CAGR)")
+    cagr_names, cagr_codes, cagr_years, cumulative_gdp = derived("cumulative")
+    cagr_calculator(cagr_names, cagr_codes, cagr_years, cumulative_gdp, "GDP", key="gdp")
+
+    with st.expander("About CAGR"):
+        st.write("""
+        - **CAGR** is the constant yearly growth rate that takes GDP from its value in the start year to its value in the end year.
+        - **Cumulative Growth** is the total percentage change over the whole range.
+        - GDP is in current USD, so these rates include inflation and exchange-rate movements.
+        """)
+
+
+elif menu == "Regional Breakdown":
+    st.header("Regional and Income Group Breakdown")
+    # The cube is attached from the shared data plane (or built once per process), so it is
+    # read directly rather than through the prefetch store and its disk cache
+    cube = load_cube()
+    url_state("level", "Region", ["Region", "Income Group"])
+    level = st.radio("Group By", ["Region", "Income Group"], horizontal=True, key="level")
+
+    # Roll-up: GDP of every group over time, read from the prebuilt cube
+    group_history = rollup(cube, level, "GDP").T.reset_index(names="Year")
+    group_history = group_history.melt(id_vars="Year", var_name=level, value_name="GDP").dropna()
+    fig = px.area(group_history, x="Year", y="GDP", color=level, title=f"GDP by {level} Over Time", labels={"GDP": "GDP (USD)"})
+    plotly_chart(fig)
+
+    growth_history = rollup(cube, level, "GDP Growth").T.reset_index(names="Year")
+    growth_history = growth_history.melt(id_vars="Year", var_name=level, value_name="GDP Growth").dropna()
+    fig = px.line(growth_history, x="Year", y="GDP Growth", color=level, title=f"GDP-Weighted Real GDP Growth by {level}", labels={"GDP Growth": "GDP Growth (%)"})
+    plotly_chart(fig)
+
+    year_totals = rollup(cube, level, "GDP", selected_year).dropna()
+    fig = px.pie(names=year_totals.index, values=year_totals.values, title=f"GDP Share by {level} in {selected_year}", hole=0.4)
+    plotly_chart(fig)
+
+    # Drill-down: the countries inside one group for the selected year
+    url_state("member", year_totals.index[0], year_totals.index)
+    if st.session_state.member not in year_totals.index:
+        st.session_state.member = year_totals.index[0]
+    member = st.selectbox(f"Drill Down into {level}", options=year_totals.index, key="member")
+    members = view_result(
+        ("gdp", data_version, "drilldown"), ["level", "member", "year"],
+        lambda: drilldown(cube, level, member, "GDP", selected_year).sort_values("GDP", ascending=False),
+    )
+    fig = px.bar(members, x="Country", y="GDP", title=f"GDP of Countries in {member} ({selected_year})", labels={"GDP": "GDP (USD)"})
+    plotly_chart(fig)
+    export_data(members, f"gdp_{member}_{selected_year}")
+
+    with st.expander("About the Groups"):
+        st.write("""
+        - Regions and income groups follow the World Bank country classification.
+        - GDP is summed within each group; growth rates are averaged using each country's GDP as its weight, so large economies count for more than small ones.
+        """)
+
+
+elif menu == "Inequality":
+    st.header("Inequality of GDP Across Countries")
+    trend = inequality_view(derived("inequality"), selected_year, "GDP", key="gdp")
+    export_data(trend, "gdp_inequality")
+
+    with st.expander("About These Measures"):
+        st.write("""
+        - The **Lorenz curve** plots the cumulative share of world GDP held by the poorest x% of countries; the further it bows below the diagonal, the more concentrated GDP is.
+        - The **Gini coefficient** is 0 when every country has the same GDP and approaches 1 when one country holds all of it.
+        - Countries are counted equally, regardless of population.
+        """)
+
+
+# Use the idle time after this run to build what the next click most likely needs: the data
+# of the next menu entry and, on the map, the neighbouring years in the same color scale
+next_view = views[(views.index(menu) + 1) % len(views)]
+prefetch_tasks = {derived_key(name): DERIVED[name] for name in VIEW_NEEDS.get(next_view, [])}
+if menu == "World Map":
+    year_pos = int(np.flatnonzero(map_years == selected_year)[0])
+    for year in map_years[max(year_pos - 1, 0):year_pos + 2]:
+        if low_bandwidth():
+            key, task = map_image_task(*world_map_image(year, color_scale))
+            prefetch_tasks[key] = task
+        else:
+            prefetch_tasks[("gdp", "map", data_version, year, color_scale)] = (world_map_figure, year, color_scale)
+prefetch(prefetch_tasks)
+
+# Keep the address bar in step with the view, so the URL can be shared or bookmarked
+share_view(["view", "year"] + VIEW_PARAMS.get(menu, []))
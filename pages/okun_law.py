@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from analytics.datasets import artifact_hash
+from analytics.okun import okun_fit, okun_matrices, okun_sums, okun_table, pooled_sums
+from components.charts import plotly_chart
+from components.controls import control_panel
+from components.data import load_dataset
+from components.download import export_data
+from components.prefetch import fetch
+from components.view_state import share_view, url_state
+
+panel = load_dataset("growth_unemployment")
+data_version = artifact_hash("growth_unemployment")
+
+# Growth and unemployment-change matrices with their running sums, built once per dataset;
+# the fits of any window are read off the sums, so no interaction refits a country
+@st.cache_resource
+def load_okun(data):
+    codes, names, years, growth, change = okun_matrices(data)
+    sums = okun_sums(growth, change)
+    return {
+        "codes": codes,
+        "names": names,
+        "years": years,
+        "growth": growth,
+        "change": change,
+        "sums": sums,
+        "pooled": pooled_sums(sums),
+    }
+
+# Coefficients of every country for one window, kept per window for all sessions
+def window_fits(okun, start_idx, end_idx):
+    fit = okun_fit(okun["sums"], start_idx, end_idx)
+    pooled = okun_fit(okun["pooled"], start_idx, end_idx)
+    return okun_table(okun["codes"], okun["names"], fit), {key: value[0] for key, value in pooled.items()}
+
+okun = load_okun(panel)
+observed = (~np.isnan(okun["growth"]) & ~np.isnan(okun["change"])).any(axis=0)
+fit_years = okun["years"][observed]
+first_year, last_year = int(fit_years[0]), int(fit_years[-1])
+
+st.title("Okun's Law: Growth and Unemployment")
+st.markdown(
+    "How much does unemployment move with the business cycle? For every country, the yearly change in the "
+    "unemployment rate is regressed on real GDP growth over the selected window."
+)
+
+# Sidebar filters, seeded from the URL so a view can be linked to
+st.sidebar.header("Filter Options")
+url_state("window", (max(first_year, 1991), last_year), range(first_year, last_year + 1))
+with control_panel("window") as controls:
+    start_year, end_year = controls.slider("Select Window", first_year, last_year, key="window")
+start_idx = int(np.searchsorted(okun["years"], start_year))
+end_idx = int(np.searchsorted(okun["years"], end_year))
+
+table, pooled = fetch(("okun", "fits", data_version, start_year, end_year), window_fits, okun, start_idx, end_idx)
+if table.empty:
+    st.warning("No country has enough years with both indicators in this window. Please select a wider window.")
+    st.stop()
+
+countries = table.sort_values("Country")["Country"].tolist()
+url_state("country", "United States" if "United States" in countries else countries[0], countries)
+selected_country = st.sidebar.selectbox("Select Country", countries, key="country")
+
+# Headline: the pooled fit over every country-year in the window
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Pooled Okun Coefficient", f"{pooled['coefficient']:.3f}")
+col2.metric("Threshold Growth", f"{pooled['threshold']:.2f}%")
+col3.metric("R²", f"{pooled['r_squared']:.2f}")
+col4.metric("Countries Fitted", f"{len(table)}")
+
+# Coefficient map
+st.subheader("Okun's Law Around the World")
+measures = ["Okun Coefficient", "Threshold Growth (%)", "R²"]
+url_state("measure", measures[0], measures)
+measure = st.radio("Map", measures, horizontal=True, key="measure")
+fig_map = px.choropleth(
+    table,
+    locations="Country Code",
+    color=measure,
+    hover_name="Country",
+    hover_data={"Country Code": False, "Std. Error": ":.3f", "Years": True},
+    color_continuous_scale="RdBu" if measure == "Okun Coefficient" else "Viridis",
+    color_continuous_midpoint=0 if measure == "Okun Coefficient" else None,
+    title=f"{measure}, {start_year}-{end_year}",
+)
+plotly_chart(fig_map)
+st.write("""
+    - The **Okun coefficient** is the change in the unemployment rate (percentage points) that comes with one more point of GDP growth. It is usually negative; the more negative, the more unemployment reacts to the cycle.
+    - The **threshold growth** is the growth rate at which unemployment holds steady. Below it, unemployment rises.
+""")
+
+# Scatter of every country-year in the window, with the selected country and both fits on top
+st.subheader(f"Growth and Unemployment Changes: {selected_country}")
+window = slice(start_idx, end_idx + 1)
+growth, change = okun["growth"][:, window], okun["change"][:, window]
+both = ~np.isnan(growth) & ~np.isnan(change)
+row = int(np.flatnonzero(okun["names"] == selected_country)[0])
+country_fit = table.set_index("Country").loc[selected_country]
+
+fig_scatter = go.Figure()
+fig_scatter.add_trace(go.Scattergl(
+    x=growth[both], y=change[both], mode="markers", name="All countries",
+    marker={"color": "lightgray", "size": 5, "opacity": 0.5}, hoverinfo="skip",
+))
+fig_scatter.add_trace(go.Scatter(
+    x=growth[row][both[row]], y=change[row][both[row]], mode="markers", name=selected_country,
+    text=okun["years"][window][both[row]], marker={"size": 9},
+    hovertemplate="%{text}<br>Growth: %{x:.1f}%<br>Unemployment change: %{y:.2f} pp<extra></extra>",
+))
+span = np.array([np.nanmin(growth[both]), np.nanmax(growth[both])])
+fig_scatter.add_trace(go.Scatter(
+    x=span, y=pooled["intercept"] + pooled["coefficient"] * span, mode="lines", name="Pooled fit",
+    line={"color": "gray", "dash": "dash"},
+))
+own = np.array([growth[row][both[row]].min(), growth[row][both[row]].max()])
+fig_scatter.add_trace(go.Scatter(
+    x=own, y=country_fit["Intercept"] + country_fit["Okun Coefficient"] * own, mode="lines",
+    name=f"{selected_country} fit",
+))
+fig_scatter.update_layout(
+    xaxis_title="Real GDP Growth (%)",
+    yaxis_title="Change in Unemployment Rate (pp)",
+    title=f"Okun's Law, {start_year}-{end_year}",
+)
+plotly_chart(fig_scatter)
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Okun Coefficient", f"{country_fit['Okun Coefficient']:.3f}", help=f"Std. error {country_fit['Std. Error']:.3f}")
+col2.metric("Threshold Growth", "n/a" if pd.isna(country_fit["Threshold Growth (%)"]) else f"{country_fit['Threshold Growth (%)']:.2f}%")
+col3.metric("Years in Fit", f"{country_fit['Years']}")
+
+# All coefficients
+st.subheader("Coefficients by Country")
+st.dataframe(table.sort_values("Okun Coefficient"), hide_index=True)
+export_data(table, f"okun_{start_year}_{end_year}")
+
+# Keep the address bar in step with the view, so the URL can be shared or bookmarked
+share_view(["window", "country", "measure"])
@@ -1,23 +1,28 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from pathlib import Path
 from scipy.stats import skew, kurtosis
 import numpy as np
-
-# Cache the data loading function for efficiency
-@st.cache_data(ttl=60)
+from analytics.compact import compact_figure
+from analytics.cube import rollup
+from analytics.datasets import artifact_hash
+from analytics.distribution import percentile_bands
+from analytics.sketch import sketch_index, sketch_quantiles, union_sketch
+from components.charts import plotly_chart
+from components.controls import control_panel
+from components.data import load_cube, load_dataset, load_metadata
+from components.distribution import distribution_view
+from components.download import export_data
+from components.mapimage import low_bandwidth, map_image, map_image_task
+from components.prefetch import fetch, prefetch
+from components.quantiles import approximate_mode
+from components.view_state import share_view, url_state, view_result
+
+# Cache the data loading function for efficiency; the result is shared by all sessions
+@st.cache_resource(ttl=60)
 def load_cleaned_data():
-    # Resolve the path to the cleaned dataset
-    file_path = Path(__file__).parent.parent / 'Datasets' / 'New folder' / 'final_cleaned_unemployment_dataset_karlene.csv'
-
-    # Check if the file exists
-    if not file_path.exists():
-        st.error(f"Dataset file not found at: {file_path}")
-        st.stop()
-
-    # Load the cleaned data
-    data = pd.read_csv(file_path)
+    # Load the cleaned data from the canonical dataset artifact
+    data = load_dataset("unemployment").copy()
 
     # Rename columns to match expected names
     data.rename(columns={
@@ -27,55 +32,20 @@ def load_cleaned_data():
         'Unemployment rate - Percent of total labor force - Observations': 'Observations'
     }, inplace=True)
 
-    # Comprehensive region mapping with all countries
-    region_mapping = {
-        # Africa
-        "Algeria": "Africa", "Angola": "Africa", "Benin": "Africa", "Botswana": "Africa",
-        "Burkina Faso": "Africa", "Burundi": "Africa", "Cameroon": "Africa",
-        "Cape Verde": "Africa", "Chad": "Africa", "Congo": "Africa", "Djibouti": "Africa",
-        "Egypt": "Africa", "Ethiopia": "Africa", "Gabon": "Africa", "Ghana": "Africa",
-        "Kenya": "Africa", "Libya": "Africa", "Madagascar": "Africa", "Malawi": "Africa",
-        "Morocco": "Africa", "Mozambique": "Africa", "Nigeria": "Africa", "Rwanda": "Africa",
-        "Senegal": "Africa", "South Africa": "Africa", "Sudan": "Africa", "Tanzania": "Africa",
-        "Tunisia": "Africa", "Uganda": "Africa", "Zambia": "Africa", "Zimbabwe": "Africa",
-
-        # Asia
-        "Afghanistan": "Asia", "Bangladesh": "Asia", "China": "Asia", "India": "Asia",
-        "Indonesia": "Asia", "Iran": "Asia", "Iraq": "Asia", "Japan": "Asia",
-        "Kazakhstan": "Asia", "Malaysia": "Asia", "Pakistan": "Asia", "Philippines": "Asia",
-        "Saudi Arabia": "Asia", "Singapore": "Asia", "South Korea": "Asia",
-        "Sri Lanka": "Asia", "Thailand": "Asia", "Turkey": "Asia", "Uzbekistan": "Asia",
-        "Vietnam": "Asia", "Yemen": "Asia",
-
-        # Europe
-        "Austria": "Europe", "Belgium": "Europe", "Bulgaria": "Europe", "Croatia": "Europe",
-        "Czech Republic": "Europe", "Denmark": "Europe", "Estonia": "Europe",
-        "Finland": "Europe", "France": "Europe", "Germany": "Europe", "Greece": "Europe",
-        "Hungary": "Europe", "Ireland": "Europe", "Italy": "Europe", "Latvia": "Europe",
-        "Lithuania": "Europe", "Netherlands": "Europe", "Norway": "Europe", "Poland": "Europe",
-        "Portugal": "Europe", "Romania": "Europe", "Russia": "Europe", "Serbia": "Europe",
-        "Slovakia": "Europe", "Slovenia": "Europe", "Spain": "Europe", "Sweden": "Europe",
-        "Switzerland": "Europe", "Ukraine": "Europe", "United Kingdom": "Europe",
-
-        # North America
-        "Canada": "North America", "Mexico": "North America", "United States": "North America",
-
-        # South America
-        "Argentina": "South America", "Brazil": "South America", "Chile": "South America",
-        "Colombia": "South America", "Ecuador": "South America", "Paraguay": "South America",
-        "Peru": "South America", "Uruguay": "South America", "Venezuela": "South America",
-
-        # Oceania
-        "Australia": "Oceania", "New Zealand": "Oceania",
-
-        # Other/Unknown
-        "Other": "Other"
-    }
-
-    # Assign regions to each country
-    data['Region'] = data['Country'].map(region_mapping).fillna("Other")
+    # Assign World Bank regions by ISO code; economies outside the classification go to "Other"
+    regions = load_metadata().set_index('Country Code')['Region']
+    data['Region'] = data['ISO_Code'].map(regions).astype(object).fillna("Other").astype("category")
     return data
 
+# Quantile sketches of the rates per (year, region), so the median of any region and year is
+# a merge of sketches rather than a scan of the rows
+@st.cache_resource(ttl=60)
+def load_sketches():
+    data = load_cleaned_data()
+    wide = data.pivot_table(index='Country', columns='Year', values='Observations', observed=True)
+    regions = data.drop_duplicates('Country').set_index('Country')['Region'].astype(object)
+    return sketch_index(wide.to_numpy(dtype=float), wide.columns.to_numpy(dtype=int), regions.reindex(wide.index).to_numpy())
+
 # Load the cleaned dataset
 data = load_cleaned_data()
 
@@ -83,28 +53,36 @@ data = load_cleaned_data()
 st.title("Global Unemployment Rates Dashboard")
 st.markdown("Explore unemployment rates globally with interactive visualizations.")
 
-# Sidebar filters
+# Sidebar filters, seeded from the URL so a filtered view can be linked to
 st.sidebar.header("Filter Options")
 years = sorted(data['Year'].unique())
-selected_year = st.sidebar.slider("Select Year", int(min(years)), int(max(years)), int(max(years)))
+url_state("year", int(max(years)), range(int(min(years)), int(max(years)) + 1))
+with control_panel("filters") as controls:
+    selected_year = controls.slider("Select Year", int(min(years)), int(max(years)), key="year")
 
-regions = sorted(data['Region'].unique())
-selected_region = st.sidebar.selectbox("Select Region", options=["All"] + regions)
+    regions = sorted(data['Region'].unique())
+    url_state("region", "All", ["All"] + regions)
+    selected_region = controls.selectbox("Select Region", options=["All"] + regions, key="region")
 
-# Filter data by region first
-if selected_region != "All":
-    filtered_data = data[data['Region'] == selected_region]
-else:
-    filtered_data = data
+    # Filter data by region first
+    if selected_region != "All":
+        filtered_data = data[data['Region'] == selected_region]
+    else:
+        filtered_data = data
+
+    # Dynamically update available countries based on the selected region
+    available_countries = sorted(filtered_data['Country'].unique())
+    url_state("countries", [], available_countries)
+    selected_countries = controls.multiselect(
+        "Select Countries", options=available_countries, key="countries"
+    )
 
-# Dynamically update available countries based on the selected region
-available_countries = sorted(filtered_data['Country'].unique())
-selected_countries = st.sidebar.multiselect(
-    "Select Countries", options=available_countries, default=[]
-)
+    # Dynamically update search options for countries
+    url_state("search", "", [""] + available_countries)
+    country_search = controls.selectbox("Search Country", options=[""] + available_countries, key="search")
 
-# Dynamically update search options for countries
-country_search = st.sidebar.selectbox("Search Country", options=[""] + available_countries)
+# Exact quantiles by default; sketches for large panels or when switched on
+approximate = approximate_mode(len(data))
 
 # Further filter data based on selected countries
 if selected_countries:
@@ -117,6 +95,44 @@ if country_search:
 # Filter data for the selected year
 year_filtered_data = filtered_data[filtered_data['Year'] == selected_year]
 
+# Choropleth of one year for the current filter; neighbouring years are prefetched in the background.
+# Compacted once here, before the result store shares it between sessions.
+def unemployment_map_figure(data, year):
+    fig = px.choropleth(
+        data[data['Year'] == year],
+        locations="ISO_Code",
+        color="Observations",
+        hover_name="Country",
+        title=f"Unemployment Rates ({year})",
+        labels={"Observations": "Unemployment Rate (%)"},
+        hover_data={"Country": True, "Observations": True},
+        color_continuous_scale="Viridis"
+    )
+    fig.update_geos(fitbounds="locations", visible=True)
+    return compact_figure(fig)
+
+# Percentile bands of unemployment across the countries of a region for every year, kept per
+# region; "All" spans the classified economies, leaving out aggregates filed under "Other"
+def unemployment_distribution(data, region):
+    region_data = data[data['Region'] != "Other"] if region == "All" else data[data['Region'] == region]
+    wide = region_data.pivot_table(index='ISO_Code', columns='Year', values='Observations', observed=True)
+    return percentile_bands(wide.to_numpy(dtype=float), wide.columns.to_numpy(dtype=int))
+
+# The same map as a server-rendered image for the low-bandwidth mode: map_image arguments
+def unemployment_map_image(data, year):
+    year_data = data[data['Year'] == year]
+    return (
+        ("unemployment", artifact_hash("unemployment"), selected_region, tuple(selected_countries), country_search, year),
+        year_data['ISO_Code'].to_numpy(), year_data['Observations'].to_numpy(),
+        f"Unemployment Rates ({year})", "Viridis", "Unemployment Rate (%)",
+    )
+
+map_key = ("unemployment", "map", artifact_hash("unemployment"), selected_region, tuple(selected_countries), country_search)
+
+# Export the current region/country filter
+with st.sidebar:
+    export_data(filtered_data, "unemployment_filtered")
+
 # **INSIGHTS SECTION**
 # Check if insights should be based on region or the entire world
 if selected_region != "All" and not year_filtered_data.empty:
@@ -157,7 +173,7 @@ if selected_region != "All":
         title=f"Distribution of Unemployment Rates in {selected_region} ({selected_year})",
         labels={"Observations": "Unemployment Rate (%)"},
     )
-    st.plotly_chart(fig_hist, use_container_width=True)
+    plotly_chart(fig_hist, use_container_width=True)
 
 else:
     if not year_filtered_data.empty:
@@ -184,18 +200,25 @@ else:
 
 # Choropleth map for selected year
 st.subheader(f"Unemployment Rates in {selected_year}")
-fig_map = px.choropleth(
-    year_filtered_data,
-    locations="ISO_Code",
-    color="Observations",
-    hover_name="Country",
-    title=f"Unemployment Rates ({selected_year})",
-    labels={"Observations": "Unemployment Rate (%)"},
-    hover_data={"Country": True, "Observations": True},
-    color_continuous_scale="Viridis"
-)
-fig_map.update_geos(fitbounds="locations", visible=True)
-st.plotly_chart(fig_map, use_container_width=True)
+if low_bandwidth():
+    map_image(*unemployment_map_image(filtered_data, selected_year))
+else:
+    fig_map = fetch(map_key + (selected_year,), unemployment_map_figure, filtered_data, selected_year)
+    plotly_chart(fig_map, use_container_width=True)
+export_data(year_filtered_data, f"unemployment_{selected_year}")
+
+# **DISTRIBUTION OVER TIME**
+# Percentile bands of the region's countries, with the selected or searched countries drawn over them
+st.subheader(f"Distribution of Unemployment Rates Over Time ({selected_region if selected_region != 'All' else 'Global'})")
+bands = fetch(("unemployment", "distribution", artifact_hash("unemployment"), selected_region),
+              unemployment_distribution, data, selected_region)
+overlays = {
+    country: (country_data['Year'].to_numpy(), country_data['Observations'].to_numpy(dtype=float))
+    for country, country_data in filtered_data.groupby('Country', observed=True)
+} if selected_countries or country_search else {}
+distribution_table = distribution_view(bands, overlays, "Unemployment Rates", "Unemployment Rate (%)", value_format=".2f")
+if distribution_table is not None:
+    export_data(distribution_table, f"unemployment_distribution_{selected_region}")
 
 # **TRENDS AND COMPARISONS**
 # **TRENDS AND COMPARISONS**
@@ -222,7 +245,8 @@ if country_search and len(selected_countries) == 0:
         labels={"Observations": "Unemployment Rate (%)", "Year": "Year"},
         markers=True
     )
-    st.plotly_chart(fig_line_single, use_container_width=True)
+    plotly_chart(fig_line_single, use_container_width=True)
+    export_data(country_data, f"unemployment_{country_search}")
 
 else:
     # Proceed with regular multi-country trends and comparisons
@@ -251,7 +275,7 @@ else:
         labels={"Observations": "Unemployment Rate (%)", "Year": "Year"},
         hover_data={"Year": True, "Observations": True}
     )
-    st.plotly_chart(fig_line, use_container_width=True)
+    plotly_chart(fig_line, use_container_width=True)
 
     # Global Trends by Country
     st.subheader("Global Trends by Country")
@@ -264,21 +288,26 @@ else:
         labels={"Observations": "Unemployment Rate (%)", "Year": "Year"},
         hover_data={"Country": True, "Observations": True}
     )
-    st.plotly_chart(fig_area, use_container_width=True)
+    plotly_chart(fig_area, use_container_width=True)
 
     # Regional Comparison for selected year
     st.subheader(f"Regional Comparison for {selected_year}")
-    regional_data = year_filtered_data.groupby('Region')['Observations'].mean().reset_index()
+    # GDP-weighted regional rates, looked up in the prebuilt aggregation cube
+    regional_rates = rollup(load_cube(), "Region", "Unemployment Rate", selected_year)
+    if selected_region != "All":
+        regional_rates = regional_rates[regional_rates.index == selected_region]
+    regional_data = regional_rates.dropna().rename_axis('Region').reset_index(name='Observations')
     fig_bar_region = px.bar(
         regional_data,
         x="Region",
         y="Observations",
-        title=f"Average Unemployment Rates by Region ({selected_year})",
-        labels={"Observations": "Average Unemployment Rate (%)", "Region": "Region"},
+        title=f"GDP-Weighted Average Unemployment Rates by Region ({selected_year})",
+        labels={"Observations": "GDP-Weighted Unemployment Rate (%)", "Region": "Region"},
         hover_data={"Region": True, "Observations": True},
         color="Region"
     )
-    st.plotly_chart(fig_bar_region, use_container_width=True)
+    plotly_chart(fig_bar_region, use_container_width=True)
+    export_data(regional_data, f"unemployment_regions_{selected_year}")
 
     # Unemployment rates by country
     st.subheader(f"Unemployment Rates by Country in {selected_year}")
@@ -291,38 +320,56 @@ else:
         hover_data={"Country": True, "Observations": True},
         color="Country"
     )
-    st.plotly_chart(fig_bar, use_container_width=True)
+    plotly_chart(fig_bar, use_container_width=True)
 
     # **Skewness and Kurtosis Trends Responsive to Region and Year Range**
 
     # Year range slider
-    year_range = st.slider(
-        "Select Year Range",
-        min_value=int(data['Year'].min()),
-        max_value=int(data['Year'].max()),
-        value=(int(data['Year'].min()), int(data['Year'].max()))
-    )
+    url_state("range", (int(data['Year'].min()), int(data['Year'].max())), range(int(data['Year'].min()), int(data['Year'].max()) + 1))
+    with control_panel("range", st) as controls:
+        year_range = controls.slider(
+            "Select Year Range",
+            min_value=int(data['Year'].min()),
+            max_value=int(data['Year'].max()),
+            key="range"
+        )
 
     # Filter data by selected region and year range
     region_filtered_data = data[(data['Year'] >= year_range[0]) & (data['Year'] <= year_range[1])]
     if selected_region != "All":
         region_filtered_data = region_filtered_data[region_filtered_data['Region'] == selected_region]
 
-    # Calculate skewness and kurtosis trends for the filtered data
-    skewness_karl_trends = region_filtered_data.groupby('Year')['Observations'].apply(
-        lambda x: 3 * (x.mean() - x.median()) / x.std() if x.std() else 0
-    )
-    kurtosis_trends = region_filtered_data.groupby('Year')['Observations'].apply(
-        lambda x: kurtosis(x)
+    # Calculate skewness and kurtosis trends for the filtered data, once per region and range.
+    # In approximate mode the yearly medians come from the merged sketches of the region.
+    def moment_trends(region_filtered_data, approximate):
+        by_year = region_filtered_data.groupby('Year')['Observations']
+        means, stds = by_year.mean(), by_year.std()
+        if approximate:
+            sketches = load_sketches()
+            groups = None if selected_region == "All" else [selected_region]
+            medians = pd.Series(
+                [sketch_quantiles(union_sketch(sketches, years=[year], groups=groups), 0.5)[0] for year in means.index],
+                index=means.index,
+            )
+        else:
+            medians = by_year.median()
+        skewness_karl_trends = (3 * (means - medians) / stds).where(stds != 0, 0)
+        kurtosis_trends = region_filtered_data.groupby('Year')['Observations'].apply(
+            lambda x: kurtosis(x)
+        )
+
+        # Create a DataFrame to store skewness and kurtosis trends
+        return pd.DataFrame({
+            'Year': skewness_karl_trends.index,
+            'Skewness (Karl Pearson)': skewness_karl_trends.values,
+            'Kurtosis': kurtosis_trends.values
+        })
+
+    trends_df = view_result(
+        ("unemployment", artifact_hash("unemployment"), "moment_trends"), ["region", "range", "approx"],
+        moment_trends, region_filtered_data, approximate,
     )
 
-    # Create a DataFrame to store skewness and kurtosis trends
-    trends_df = pd.DataFrame({
-        'Year': skewness_karl_trends.index,
-        'Skewness (Karl Pearson)': skewness_karl_trends.values,
-        'Kurtosis': kurtosis_trends.values
-    })
-
     # Plot the skewness and kurtosis trends
     st.subheader(f"Skewness and Kurtosis Trends ({selected_region if selected_region != 'All' else 'Global'})")
     fig_skew_kurt = px.line(
@@ -333,4 +380,15 @@ else:
         labels={"Year": "Year", "value": "Metric Value", "variable": "Statistic"},
         markers=True
     )
-    st.plotly_chart(fig_skew_kurt, use_container_width=True)
+    plotly_chart(fig_skew_kurt, use_container_width=True)
+    export_data(region_filtered_data, f"unemployment_{year_range[0]}_{year_range[1]}")
+
+# Use the idle time after this run to build the maps for the neighbouring slider positions
+neighbour_years = [year for year in (selected_year - 1, selected_year + 1) if min(years) <= year <= max(years)]
+if low_bandwidth():
+    prefetch(dict(map_image_task(*unemployment_map_image(filtered_data, year)) for year in neighbour_years))
+else:
+    prefetch({map_key + (year,): (unemployment_map_figure, filtered_data, year) for year in neighbour_years})
+
+# Keep the address bar in step with the filters, so the URL can be shared or bookmarked
+share_view(["year", "region", "countries", "search", "range", "approx"])
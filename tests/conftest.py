@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app runs from the repository root (streamlit run app.py), so its packages import from there
+sys.path.insert(0, str(Path(__file__).parent.parent))
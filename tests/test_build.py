@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from analytics import build
+from analytics.datasets import load_manifest
+
+
+@pytest.mark.parametrize("name", ["gdp", "gdp_growth", "unemployment", "country_metadata"])
+def test_rebuild_reproduces_the_manifest_hash(name):
+    # Identical inputs give identical bytes, so a rebuild never churns the artifact names
+    frame, _, _ = build.BUILDERS[name]()
+    data = build._to_parquet_bytes(frame)
+    assert data == build._to_parquet_bytes(frame.copy())
+    assert build._sha256(data) == load_manifest()["artifacts"][name]["sha256"]
+
+
+def test_build_writes_content_addressed_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(build, "BUILD_DIR", tmp_path)
+    monkeypatch.setattr(build, "MANIFEST_PATH", tmp_path / "manifest.json")
+    first = build.build(["gdp", "country_metadata"])
+    second = build.build(["gdp"])
+    entry = second["artifacts"]["gdp"]
+    assert entry == first["artifacts"]["gdp"]
+    assert entry["file"] == f"gdp-{entry['sha256'][:12]}.parquet"
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [entry["file"], first["artifacts"]["country_metadata"]["file"], "manifest.json"]
+    )
+    # A partial rebuild keeps the other artifacts' entries
+    assert json.loads((tmp_path / "manifest.json").read_text()) == second
+    assert "country_metadata" in second["artifacts"]
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from analytics.cagr import cagr, cagr_table, cumulative_log_growth, log_levels
+
+YEARS = np.arange(2000, 2011)
+
+
+@pytest.fixture
+def growth():
+    rng = np.random.default_rng(5)
+    values = rng.normal(3.0, 4.0, (6, len(YEARS)))
+    values[2, 6] = np.nan
+    return values
+
+
+def test_matches_closed_form_from_levels(growth):
+    # Levels at the end of each year, relative to the start of the panel
+    levels = np.cumprod(1 + growth / 100, axis=1)
+    annual, total = cagr(cumulative_log_growth(growth), 1, 9, 8)
+    for i in (0, 1, 3, 4, 5):
+        ratio = levels[i, 9] / levels[i, 1]
+        assert annual[i] == pytest.approx((ratio ** (1 / 8) - 1) * 100)
+        assert total[i] == pytest.approx((ratio - 1) * 100)
+
+
+def test_windows_spanning_a_gap_are_rejected(growth):
+    cumulative = cumulative_log_growth(growth)
+    assert np.isnan(cagr(cumulative, 1, 9, 8)[0][2])
+    # The gap sits in year 6, so a window ending before it is still valid
+    assert not np.isnan(cagr(cumulative, 1, 5, 4)[0][2])
+
+
+def test_level_series_use_their_own_start_and_end():
+    values = np.array([[100.0, 110.0, 121.0, 133.1], [50.0, 0.0, 60.0, 72.0]])
+    annual, total = cagr(log_levels(values), 0, 3, 3)
+    assert annual[0] == pytest.approx(10.0)
+    assert total[0] == pytest.approx(33.1)
+    assert annual[1] == pytest.approx(((72.0 / 50.0) ** (1 / 3) - 1) * 100)
+    annual, _ = cagr(log_levels(values), 1, 3, 2)
+    assert np.isnan(annual[1])
+
+
+def test_table_is_ranked_and_drops_gaps(growth):
+    names = np.array([f"Country {i}" for i in range(len(growth))])
+    codes = np.array([f"C{i:02d}" for i in range(len(growth))])
+    table = cagr_table(names, codes, YEARS, cumulative_log_growth(growth), 2001, 2009)
+    assert "C02" not in set(table["Country Code"])
+    assert list(table["Rank"]) == list(range(1, len(table) + 1))
+    assert table["CAGR (%)"].is_monotonic_decreasing
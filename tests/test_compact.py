@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from analytics.compact import compact_array, compact_figure, compact_frame
+
+
+def test_levels_stay_float64_and_rates_become_float32():
+    frame = pd.DataFrame({
+        "GDP": [2.7e13, 1.8e13, 3.1e9, np.nan],
+        "Growth": [2.9, -0.3, 5.1, np.nan],
+        "Year": np.array([2020, 2021, 2022, 2023], dtype=np.int64),
+        "Region": ["North", "North", "North", "South"],
+    })
+    compact = compact_frame(frame)
+    assert compact["GDP"].dtype == np.float64
+    assert compact["Growth"].dtype == np.float32
+    assert compact["Year"].dtype == np.int16
+    assert isinstance(compact["Region"].dtype, pd.CategoricalDtype)
+    np.testing.assert_array_equal(compact["GDP"], frame["GDP"])
+
+
+
+def test_chart_arrays_only_need_relative_precision():
+    assert compact_array(np.array([2.7e13, 1.8e13, 3.1e9]) / 7).dtype == np.float32
+    assert compact_array(np.array(["1990", "1991"])).dtype == np.int16
+    assert compact_array(np.array(["USA", "CHN"])) is None
+
+
+def test_compact_figure_leaves_the_shared_figure_alone():
+    data = pd.DataFrame({
+        "Year": ["1990", "1991", "1992"] * 2,
+        "Value": np.arange(6) / 7,
+        "Country": ["A"] * 3 + ["B"] * 3,
+    })
+    fig = px.scatter(data, x="Year", y="Value", color="Country", hover_data=["Country"])
+    before = fig.to_json()
+    compact = compact_figure(fig)
+    assert fig.to_json() == before
+    assert compact is not fig and compact._compact
+    assert compact.data[0].y.dtype == np.float32
+    np.testing.assert_allclose(compact.data[1].y, fig.data[1].y, rtol=1e-6)
+    assert "customdata" not in compact.to_dict()["data"][0]
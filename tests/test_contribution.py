@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from analytics.contribution import growth_contributions, top_contributors
+
+YEARS = np.arange(2000, 2016)
+
+
+@pytest.fixture
+def panel():
+    # GDP levels that grow exactly at the given real rates (%)
+    rng = np.random.default_rng(9)
+    growth = rng.normal(3.0, 3.0, (8, len(YEARS)))
+    start = rng.lognormal(26, 1.5, 8)
+    levels = start[:, None] * np.cumprod(1 + growth / 100, axis=1)
+    return levels, growth
+
+
+def test_contributions_sum_to_world_growth(panel):
+    levels, growth = panel
+    result = growth_contributions(levels, growth, YEARS)
+    world = (levels[:, 1:].sum(axis=0) / levels[:, :-1].sum(axis=0) - 1) * 100
+    np.testing.assert_allclose(result["contributions"].sum(axis=0), world)
+    np.testing.assert_allclose(result["world"], world)
+    np.testing.assert_allclose(result["coverage"], 1.0)
+    np.testing.assert_array_equal(result["years"], YEARS[1:])
+
+
+def test_gaps_renormalize_over_the_counted_economies(panel):
+    levels, growth = panel
+    levels, growth = levels.copy(), growth.copy()
+    growth[2, 5] = np.nan
+    levels[4, 8] = np.nan
+    result = growth_contributions(levels, growth, YEARS)
+    # Year 5 leaves out economy 2; year 9 economy 4, which has no previous level
+    for j, missing in ((5, 2), (9, 4)):
+        counted = np.delete(np.arange(len(levels)), missing)
+        previous = levels[counted, j - 1]
+        expected = (previous * (1 + growth[counted, j] / 100)).sum() / previous.sum() - 1
+        assert result["world"][j - 1] == pytest.approx(expected * 100)
+        assert result["contributions"][missing, j - 1] == 0.0
+    assert result["coverage"][4] == pytest.approx(1 - levels[2, 4] / levels[:, 4].sum())
+    assert result["coverage"][8] == 1.0
+
+
+def test_top_contributors_and_the_rest_add_up(panel):
+    levels, growth = panel
+    result = growth_contributions(levels, growth, YEARS)
+    top, rest = top_contributors(result, 3, 2, 10)
+    window = result["contributions"][:, 2:10]
+    assert len(top) == 3
+    assert np.abs(window[top]).sum(axis=1).min() >= np.abs(np.delete(window, top, axis=0)).sum(axis=1).max()
+    np.testing.assert_allclose(window[top].sum(axis=0) + rest, result["world"][2:10])
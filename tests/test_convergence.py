@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from analytics.convergence import beta_convergence, convergence_panel, log_income, window_growth
+
+
+@pytest.fixture
+def income():
+    # GDP per capita of 40 economies over 25 years, poorer ones growing faster, with zeros
+    # standing for the gaps the cleaning step fills
+    rng = np.random.default_rng(11)
+    start = rng.lognormal(8.5, 1.2, 40)
+    rates = 0.05 - 0.004 * (np.log(start) - 8.5) + rng.normal(0, 0.01, 40)
+    years = np.arange(1995, 2020)
+    values = start[:, None] * np.exp(rates[:, None] * (years - years[0]))
+    values[3, :5] = 0.0
+    values[7, 18:] = 0.0
+    return values, years
+
+
+def test_beta_matches_polyfit_for_every_window(income):
+    values, years = income
+    log_values = log_income(values)
+    fit = beta_convergence(log_values, years)
+    for s, e in ((0, 24), (0, 10), (6, 20), (12, 13)):
+        x, y = log_values[:, s], log_values[:, e]
+        both = ~np.isnan(x) & ~np.isnan(y)
+        growth = (y[both] - x[both]) / (years[e] - years[s])
+        beta, intercept = np.polyfit(x[both], growth, 1)
+        assert fit["n"][s, e] == both.sum()
+        assert fit["beta"][s, e] == pytest.approx(beta, rel=1e-6)
+        assert fit["intercept"][s, e] == pytest.approx(intercept, rel=1e-6)
+        assert fit["r_squared"][s, e] == pytest.approx(np.corrcoef(x[both], growth)[0, 1] ** 2, rel=1e-6)
+
+
+def test_backward_and_empty_windows_are_nan(income):
+    values, years = income
+    fit = beta_convergence(log_income(values), years)
+    assert np.isnan(fit["beta"][np.tril_indices(len(years))]).all()
+
+
+def test_panel_sigma_half_life_and_window_slice(income):
+    values, years = income
+    panel = convergence_panel(values, years)
+    np.testing.assert_allclose(panel["sigma"], np.nanstd(log_income(values), axis=0, ddof=1))
+    # Poorer economies grow faster: negative beta, so a finite positive half-life
+    assert panel["beta"][0, -1] < 0
+    assert panel["half_life"][0, -1] == pytest.approx(np.log(2) / panel["speed"][0, -1])
+    initial, growth, s, e = window_growth(panel, 2000, 2010)
+    assert (s, e) == (5, 15)
+    np.testing.assert_allclose(growth, (panel["log_values"][:, 15] - initial) / 10)
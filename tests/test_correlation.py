@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.correlation import cluster_order, correlation_matrix, strongest_pairs
+
+
+@pytest.fixture
+def panel():
+    # Small country x year growth panel (%) with gaps, some rows moving together
+    rng = np.random.default_rng(7)
+    common = rng.normal(2.0, 1.5, 30)
+    values = np.stack([
+        common + rng.normal(0, 0.5, 30),
+        common + rng.normal(0, 0.5, 30),
+        -common + rng.normal(0, 1.0, 30),
+        rng.normal(3.0, 2.0, 30),
+        rng.normal(1.0, 1.0, 30),
+    ])
+    values[0, :4] = np.nan
+    values[2, 10:13] = np.nan
+    values[3, 25:] = np.nan
+    return values
+
+
+def test_matches_pandas_pairwise_correlation(panel):
+    corr, n = correlation_matrix(panel, min_periods=10)
+    expected = pd.DataFrame(panel.T).corr(min_periods=10).to_numpy()
+    np.testing.assert_allclose(corr, expected, atol=1e-12)
+    np.testing.assert_array_equal(n, (~np.isnan(panel)).astype(int) @ (~np.isnan(panel)).T)
+
+
+def test_pairs_with_too_few_common_years_are_nan(panel):
+    panel = panel.copy()
+    panel[4, 8:] = np.nan
+    corr, _ = correlation_matrix(panel, min_periods=10)
+    assert np.isnan(corr[4]).all()
+    assert np.isnan(corr[:, 4]).all()
+    assert not np.isnan(corr[:4, :4]).any()
+
+
+def test_cluster_order_and_strongest_pairs(panel):
+    corr, _ = correlation_matrix(panel)
+    order = list(cluster_order(corr))
+    assert sorted(order) == list(range(len(panel)))
+    assert abs(order.index(0) - order.index(1)) == 1
+    (pos_rows, pos_cols), (neg_rows, neg_cols) = strongest_pairs(corr, n=1)
+    assert {pos_rows[0], pos_cols[0]} == {0, 1}
+    assert 2 in {neg_rows[0], neg_cols[0]}
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.cube import MEASURES, PER_CAPITA, available_measures, build_cube, drilldown, rollup
+from analytics.datasets import read_dataset
+
+
+@pytest.fixture(scope="module")
+def cube():
+    return build_cube(["GDP", "GDP Growth"])
+
+
+def long_with_groups(dataset, value):
+    metadata = read_dataset("country_metadata")
+    data = read_dataset(dataset).drop(columns="Country Name")
+    data = data.melt(id_vars="Country Code", var_name="Year", value_name=value)
+    data["Year"] = data["Year"].astype(int)
+    return data.merge(metadata, on="Country Code")
+
+
+def test_gdp_sums_match_groupby(cube):
+    gdp = long_with_groups("gdp", "GDP")
+    for level in ("Region", "Income Group"):
+        observed = gdp.dropna(subset=["GDP"])
+        expected = observed.groupby([level, "Year"])["GDP"].sum().unstack()
+        table = rollup(cube, level, "GDP")
+        np.testing.assert_allclose(table.loc[expected.index, expected.columns], expected, rtol=1e-9)
+    world = gdp.groupby("Year")["GDP"].sum(min_count=1)
+    np.testing.assert_allclose(rollup(cube, "World", "GDP").loc["World", world.index], world, rtol=1e-9)
+
+
+def test_growth_is_the_gdp_weighted_mean(cube):
+    growth = long_with_groups("gdp_growth", "Growth")
+    gdp = long_with_groups("gdp", "GDP").sort_values("Year")
+    # Weights carry the latest published GDP forward
+    gdp["GDP"] = gdp.groupby("Country Code")["GDP"].ffill()
+    data = growth.merge(gdp[["Country Code", "Year", "GDP"]], on=["Country Code", "Year"]).dropna(subset=["Growth", "GDP"])
+    data["Weighted"] = data["Growth"] * data["GDP"]
+    sums = data.groupby(["Region", "Year"])[["Weighted", "GDP"]].sum()
+    expected = (sums["Weighted"] / sums["GDP"]).unstack()
+    table = rollup(cube, "Region", "GDP Growth")
+    np.testing.assert_allclose(table.loc[expected.index, expected.columns], expected, rtol=1e-9)
+
+
+def test_drilldown_returns_the_members_of_a_group(cube):
+    totals = rollup(cube, "Region", "GDP", 2015)
+    for region, total in totals.dropna().items():
+        members = drilldown(cube, "Region", region, "GDP", 2015)
+        assert members["GDP"].sum() == pytest.approx(total)
+    assert rollup(cube, "Region", "GDP", 1800).isna().all()
+
+
+def test_per_capita_is_a_measure_only_with_population():
+    assert available_measures({"artifacts": {"gdp": {}}}) == MEASURES
+    assert "GDP per Capita" not in MEASURES
+    assert available_measures({"artifacts": {"gdp": {}, "population": {}}}) == {**MEASURES, **PER_CAPITA}
@@ -0,0 +1,67 @@
+import itertools
+import types
+
+import numpy as np
+import pytest
+
+from analytics import diskcache
+
+
+def result(size):
+    return np.zeros(size, dtype=np.uint8)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # A fresh cache file of about 10 KB, with a clock that ticks once per call so the access
+    # order is unambiguous
+    monkeypatch.setattr(diskcache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(diskcache, "CACHE_PATH", tmp_path / "derived.sqlite")
+    monkeypatch.setattr(diskcache, "MAX_BYTES", 10_000)
+    clock = itertools.count(1)
+    monkeypatch.setattr(diskcache, "time", types.SimpleNamespace(time=lambda: float(next(clock))))
+    return diskcache
+
+
+def stored(cache, keys):
+    return [key for key in keys if cache.cache_get(result, (key,))[0]]
+
+
+def test_round_trip(cache):
+    assert cache.cache_get(result, ("a", 2020)) == (False, None)
+    assert cache.cache_put(result, ("a", 2020), {"value": result(10)})
+    found, value = cache.cache_get(result, ("a", np.int64(2020)))
+    assert found
+    np.testing.assert_array_equal(value["value"], result(10))
+    stats = cache.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 1, 1, 1)
+
+
+def test_evicts_least_recently_used_first(cache):
+    for key in "abcd":
+        cache.cache_put(result, (key,), result(2_000))
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.cache_get(result, ("a",))[0]
+    cache.cache_put(result, ("e",), result(2_000))
+    assert stored(cache, "abcde") == ["a", "c", "d", "e"]
+    # The check above read a, c, d, e in that order; a larger entry pushes out as many of
+    # the oldest as it needs
+    cache.cache_put(result, ("f",), result(4_000))
+    assert stored(cache, "abcdef") == ["d", "e", "f"]
+    stats = cache.cache_stats()
+    assert stats["bytes"] <= cache.MAX_BYTES
+    assert stats["evictions"] == 3
+
+
+def test_oversized_and_unpicklable_results_are_not_stored(cache):
+    assert not cache.cache_put(result, ("big",), result(20_000))
+    assert not cache.cache_put(result, ("lambda",), lambda: None)
+    assert cache.cache_stats()["entries"] == 0
+
+
+def test_key_depends_on_function(cache):
+    def other(size):
+        return result(size)
+
+    cache.cache_put(result, ("a",), 1)
+    assert cache.cache_get(other, ("a",)) == (False, None)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from analytics.distribution import MIN_COUNTRIES, PERCENTILES, percentile_bands
+
+
+def test_bands_match_each_years_observed_values():
+    rng = np.random.default_rng(4)
+    values = rng.normal(3.0, 2.0, (40, 12))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    years = np.arange(2000, 2012)
+    result = percentile_bands(values, years)
+    np.testing.assert_array_equal(result["years"], years)
+    for j in range(len(years)):
+        observed = values[:, j][~np.isnan(values[:, j])]
+        assert result["counts"][j] == len(observed)
+        np.testing.assert_allclose(result["bands"][:, j], np.percentile(observed, PERCENTILES))
+    # Bands are ordered from the 5th to the 95th percentile
+    assert (np.diff(result["bands"], axis=0) >= 0).all()
+
+
+def test_sparse_years_are_dropped():
+    values = np.full((10, 4), np.nan)
+    values[:, 0] = np.arange(10)
+    values[:MIN_COUNTRIES - 1, 1] = 1.0
+    values[:MIN_COUNTRIES, 3] = 2.0
+    result = percentile_bands(values, [1990, 1991, 1992, 1993])
+    np.testing.assert_array_equal(result["years"], [1990, 1993])
+    np.testing.assert_array_equal(result["counts"], [10, MIN_COUNTRIES])
+    assert result["bands"].shape == (len(PERCENTILES), 2)
+
+
+def test_no_year_with_enough_countries_gives_empty_bands():
+    result = percentile_bands(np.full((5, 3), np.nan), [2000, 2001, 2002])
+    assert len(result["years"]) == 0
+    assert result["bands"].shape == (len(PERCENTILES), 0)
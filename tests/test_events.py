@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from analytics.events import build_event_index, country_events, detect_recessions, detect_structural_breaks, episodes_in_year
+
+YEARS = np.arange(2000, 2012)
+NAMES = np.array(["Alpha", "Beta"])
+CODES = np.array(["AAA", "BBB"])
+
+
+def growth():
+    return np.array([
+        # Two-year recession recovered in 2005, then a one-year dip made up the next year
+        [2.0, -1.0, -2.0, 1.0, 1.0, 3.0, 2.0, -3.0, 5.0, 1.0, 1.0, 1.0],
+        # Recession running into the last year, never recovered
+        [3.0, 3.0, 3.0, 3.0, 3.0, 3.0, 3.0, 3.0, 3.0, -4.0, -1.0, -2.0],
+    ])
+
+
+def test_runs_depth_and_recovery():
+    recessions, in_run = detect_recessions(NAMES, CODES, YEARS, growth())
+    alpha = recessions[recessions["Country Code"] == "AAA"].reset_index(drop=True)
+    assert list(alpha["Start Year"]) == [2001, 2007]
+    assert list(alpha["End Year"]) == [2002, 2007]
+    assert list(alpha["Duration (Years)"]) == [2, 1]
+    assert list(alpha["Worst Growth (%)"]) == [-2.0, -3.0]
+    assert alpha["Depth (%)"][0] == pytest.approx((0.99 * 0.98 - 1) * 100)
+    assert alpha["Depth (%)"][1] == pytest.approx(-3.0)
+    # 0.99 * 0.98 * 1.01 * 1.01 is still below the peak; 2005's 3% takes output back above it
+    assert list(alpha["Recovery Year"]) == [2005, 2008]
+    assert list(alpha["Recovery Time (Years)"]) == [3, 1]
+
+    beta = recessions[recessions["Country Code"] == "BBB"].iloc[0]
+    assert (beta["Start Year"], beta["End Year"]) == (2009, 2011)
+    assert np.isnan(beta["Recovery Year"])
+    assert in_run.sum() == 6
+
+
+def test_year_lookup_and_country_events():
+    index = build_event_index(NAMES, CODES, YEARS, growth())
+    assert list(episodes_in_year(index, 2002)["Country Name"]) == ["Alpha"]
+    assert list(episodes_in_year(index, 2010)["Country Name"]) == ["Beta"]
+    assert episodes_in_year(index, 1990).empty
+    recessions, _ = country_events(index, "Alpha")
+    assert len(recessions) == 2
+
+
+def test_structural_break_at_the_shift_in_mean_growth():
+    rng = np.random.default_rng(0)
+    years = np.arange(1980, 2020)
+    values = np.stack([
+        np.concatenate([rng.normal(6.0, 1.0, 20), rng.normal(1.0, 1.0, 20)]),
+        rng.normal(2.0, 1.0, 40),
+    ])
+    breaks = detect_structural_breaks(NAMES, CODES, years, values)
+    assert list(breaks["Country Name"]) == ["Alpha"]
+    assert breaks["Break Year"][0] == 2000
+    assert breaks["Mean Growth Before (%)"][0] > breaks["Mean Growth After (%)"][0]
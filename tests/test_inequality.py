@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from analytics.inequality import inequality_panel, lorenz_curve
+
+
+def mean_difference_gini(x):
+    # Textbook definition: mean absolute difference over all pairs, divided by twice the mean
+    return np.abs(x[:, None] - x[None, :]).mean() / (2 * x.mean())
+
+
+def test_gini_of_known_distributions():
+    n = 20
+    values = np.stack([
+        np.full(n, 5.0),                     # everyone equal
+        np.r_[np.full(n - 1, 1e-12), 1.0],   # one country holds almost everything
+        np.arange(1.0, n + 1),               # uniform 1..n
+    ], axis=1)
+    gini = inequality_panel(values, np.arange(3))["gini"]
+    assert gini[0] == pytest.approx(0.0, abs=1e-12)
+    assert gini[1] == pytest.approx((n - 1) / n)
+    assert gini[2] == pytest.approx((n - 1) / (3 * n))
+
+
+def test_matches_the_pairwise_definition_with_gaps():
+    rng = np.random.default_rng(2)
+    values = rng.lognormal(9, 1, (30, 4))
+    values[:5, 1] = np.nan
+    values[10:14, 2] = 0.0
+    panel = inequality_panel(values, np.arange(4))
+    for j in range(4):
+        present = values[:, j][values[:, j] > 0]
+        assert panel["counts"][j] == len(present)
+        assert panel["gini"][j] == pytest.approx(mean_difference_gini(present))
+        ordered = np.sort(present)[::-1]
+        assert panel["top_10_share"][j] == pytest.approx(ordered[:10].sum() / ordered.sum())
+        k = int(np.ceil(0.1 * len(present)))
+        assert panel["top_decile_share"][j] == pytest.approx(ordered[:k].sum() / ordered.sum())
+
+
+def test_lorenz_curve_and_years_with_too_few_countries():
+    values = np.array([[1.0, 4.0], [3.0, np.nan], [np.nan, np.nan]])
+    panel = inequality_panel(values, np.array([2000, 2001]))
+    population, share = lorenz_curve(panel, 2000)
+    np.testing.assert_allclose(population, [0, 0.5, 1])
+    np.testing.assert_allclose(share, [0, 0.25, 1])
+    assert np.isnan(panel["gini"][1])
@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+import pytest
+from matplotlib.colors import to_rgb
+from PIL import Image
+from plotly.colors import sample_colorscale, unlabel_rgb
+
+from analytics.mapimage import MISSING_COLOR, _colormap, equal_earth, load_shapes, render_map
+
+
+@pytest.fixture(scope="module")
+def png():
+    # Values for half the countries only, so the rest are drawn in the missing-value gray
+    codes = load_shapes()["codes"][::2]
+    values = np.linspace(0.0, 100.0, len(codes))
+    return render_map(codes, values, "Test Map", "Viridis", "Value", image_format="png")
+
+
+def test_png_is_quantized_to_a_256_color_palette(png):
+    image = Image.open(io.BytesIO(png))
+    assert image.format == "PNG"
+    assert image.mode == "P"
+    assert len(image.getcolors(maxcolors=256)) <= 256
+
+
+def test_countries_without_values_are_gray(png):
+    pixels = np.asarray(Image.open(io.BytesIO(png)).convert("RGB")).reshape(-1, 3).astype(int)
+    gray = np.round(np.array(to_rgb(MISSING_COLOR)) * 255).astype(int)
+    # The palette may shift a channel by a step or two
+    assert (np.abs(pixels - gray).max(axis=1) <= 2).sum() > 1000
+
+
+def test_webp_is_the_default_format():
+    codes = load_shapes()["codes"][:5]
+    data = render_map(codes, np.arange(5.0), "Test Map", "Plasma", "Value")
+    assert data[:4] == b"RIFF" and data[8:12] == b"WEBP"
+    assert Image.open(io.BytesIO(data)).size == (1000, 560)
+
+
+def test_colormap_follows_the_plotly_scale():
+    cmap = _colormap("Viridis")
+    for position in (0.0, 0.5, 1.0):
+        expected = np.array(unlabel_rgb(sample_colorscale("Viridis", [position])[0])) / 255
+        np.testing.assert_allclose(cmap(position)[:3], expected, atol=1 / 255)
+    np.testing.assert_allclose(cmap(np.nan)[:3], to_rgb(MISSING_COLOR))
+
+
+def test_equal_earth_is_symmetric_about_the_equator_and_meridian():
+    x, y = equal_earth(np.array([0.0, 30.0, -30.0]), np.array([0.0, 45.0, -45.0]))
+    assert (x[0], y[0]) == (0.0, 0.0)
+    assert x[1] == pytest.approx(-x[2])
+    assert y[1] == pytest.approx(-y[2])
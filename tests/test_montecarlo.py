@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from analytics.montecarlo import (
+    QUANTILES, fit_growth, growth_percent, scenario_chunks, scenario_model, scenario_summary, simulate_chunk,
+)
+
+
+@pytest.fixture
+def history():
+    # Three economies with steady growth histories, the first much larger than the others
+    rng = np.random.default_rng(5)
+    years = np.arange(1991, 2024)
+    growth = np.stack([rng.normal(mean, sd, len(years)) for mean, sd in ((2.0, 1.0), (6.0, 2.0), (3.0, 1.5))])
+    growth[2, :25] = np.nan
+    return {
+        "codes": np.array(["AAA", "BBB", "CCC"]),
+        "names": np.array(["Large", "Fast", "Short"]),
+        "base_levels": np.array([20e12, 3e12, 1e12]),
+        "growth": growth,
+        "years": years,
+    }
+
+
+def run(model, n_paths, seed=0):
+    return scenario_summary(model, [simulate_chunk(*args) for args in scenario_chunks(model, n_paths, seed)], 2023)
+
+
+def test_fit_matches_log_growth_moments(history):
+    log_growth, mu, sigma = fit_growth(history["growth"], history["years"], (1991, 2023))
+    expected = np.log1p(history["growth"][0] / 100)
+    assert mu[0] == pytest.approx(expected.mean())
+    assert sigma[0] == pytest.approx(expected.std(ddof=1))
+    # Eight observed years are fewer than MIN_YEARS
+    assert np.isnan(mu[2]) and np.isnan(sigma[2])
+
+
+def test_overrides_round_trip_to_percent(history):
+    model = scenario_model(**history, window=(1991, 2023), horizon=10, overrides={"BBB": (4.0, 3.0)})
+    assert list(model["codes"]) == ["AAA", "BBB"]
+    growth, volatility = growth_percent(model["mu"], model["sigma"])
+    assert growth[1] == pytest.approx(4.0)
+    assert volatility[1] == pytest.approx(3.0)
+
+
+def test_fan_matches_lognormal_quantiles(history):
+    model = scenario_model(**history, window=(1991, 2023), horizon=10, correlated=False)
+    summary = run(model, 20_000)
+    steps = np.arange(1, 11)[:, None]
+    z = stats.norm.ppf(QUANTILES)[:, None, None]
+    expected = np.exp(model["log_base"] + model["mu"] * steps + z * model["sigma"] * np.sqrt(steps))
+    np.testing.assert_allclose(summary["fan"], expected, rtol=0.005)
+    assert summary["n_paths"] == 20_000
+    np.testing.assert_allclose(summary["rank_share"].sum(axis=2), 1.0, rtol=1e-6)
+
+
+def test_chunks_merge_to_the_same_result_however_they_are_split(history):
+    model = scenario_model(**history, window=(1991, 2023), horizon=5)
+    chunks = [simulate_chunk(*args) for args in scenario_chunks(model, 2_500, seed=1)]
+    assert [chunk["n"] for chunk in chunks] == [1000, 1000, 500]
+    forward = scenario_summary(model, chunks, 2023)
+    backward = scenario_summary(model, chunks[::-1], 2023)
+    np.testing.assert_array_equal(forward["fan"], backward["fan"])
+    np.testing.assert_array_equal(forward["passed"], backward["passed"])
+    again = run(model, 2_500, seed=1)
+    np.testing.assert_array_equal(forward["rank_share"], again["rank_share"])
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from analytics.okun import okun_fit, okun_matrices, okun_sums, okun_table, pooled_sums
+
+
+@pytest.fixture
+def okun_panel():
+    # Joined (Country Code, Year) panel with a known Okun relation per country, plus gaps
+    rng = np.random.default_rng(3)
+    rows = []
+    for code, coefficient, intercept in (("AAA", -0.4, 1.0), ("BBB", -0.2, 0.5), ("CCC", -0.6, 1.8)):
+        for year in range(1991, 2021):
+            growth = rng.normal(2.5, 2.0)
+            change = intercept + coefficient * growth + rng.normal(0, 0.3)
+            rows.append({"Country Code": code, "Country": f"Country {code}", "Year": year,
+                         "GDP Growth": growth, "Unemployment Change": change})
+    panel = pd.DataFrame(rows)
+    panel.loc[(panel["Country Code"] == "BBB") & panel["Year"].between(1995, 1998), "Unemployment Change"] = np.nan
+    return panel
+
+
+def test_fit_matches_polyfit_over_any_window(okun_panel):
+    codes, names, years, growth, change = okun_matrices(okun_panel)
+    sums = okun_sums(growth, change)
+    for start, end in ((0, len(years) - 1), (3, 20), (10, 29)):
+        fit = okun_fit(sums, start, end)
+        for i, code in enumerate(codes):
+            g, d = growth[i, start:end + 1], change[i, start:end + 1]
+            both = ~np.isnan(g) & ~np.isnan(d)
+            coefficient, intercept = np.polyfit(g[both], d[both], 1)
+            expected = stats.linregress(g[both], d[both])
+            assert fit["n"][i] == both.sum()
+            assert fit["coefficient"][i] == pytest.approx(coefficient, rel=1e-9)
+            assert fit["intercept"][i] == pytest.approx(intercept, rel=1e-9, abs=1e-12)
+            assert fit["r_squared"][i] == pytest.approx(expected.rvalue ** 2, rel=1e-9)
+            assert fit["std_error"][i] == pytest.approx(expected.stderr, rel=1e-9)
+            assert fit["threshold"][i] == pytest.approx(-intercept / coefficient, rel=1e-9)
+
+
+def test_pooled_fit_matches_polyfit_over_all_country_years(okun_panel):
+    _, _, _, growth, change = okun_matrices(okun_panel)
+    fit = okun_fit(pooled_sums(okun_sums(growth, change)), 0, growth.shape[1] - 1)
+    both = ~np.isnan(growth) & ~np.isnan(change)
+    coefficient, intercept = np.polyfit(growth[both], change[both], 1)
+    assert fit["coefficient"][0] == pytest.approx(coefficient, rel=1e-9)
+    assert fit["intercept"][0] == pytest.approx(intercept, rel=1e-9)
+
+
+def test_short_windows_are_left_out(okun_panel):
+    codes, names, _, growth, change = okun_matrices(okun_panel)
+    fit = okun_fit(okun_sums(growth, change), 2, 8)
+    # Seven years is fewer than MIN_OBSERVATIONS for every country
+    assert np.isnan(fit["coefficient"]).all()
+    assert okun_table(codes, names, fit).empty
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from scipy.stats import rankdata
+
+from analytics.ranks import rank_history, rank_matrix, rank_movers, top_bottom
+
+NAMES = np.array(["Alpha", "Beta", "Gamma", "Delta", "Epsilon"])
+YEARS = np.array([2000, 2001, 2002])
+
+
+@pytest.fixture
+def values():
+    return np.array([
+        [5.0, 1.0, 9.0],
+        [7.0, 7.0, np.nan],
+        [7.0, 3.0, 2.0],
+        [1.0, 9.0, 4.0],
+        [np.nan, 2.0, 8.0],
+    ])
+
+
+def test_ranks_match_ordinal_ranking(values):
+    index = rank_matrix(values)
+    for j in range(values.shape[1]):
+        present = ~np.isnan(values[:, j])
+        expected = rankdata(-values[present, j], method="ordinal")
+        np.testing.assert_array_equal(index["ranks"][present, j], expected)
+        assert np.isnan(index["ranks"][~present, j]).all()
+    np.testing.assert_array_equal(index["counts"], [4, 5, 4])
+
+
+def test_ties_keep_row_order(values):
+    # Beta and Gamma tie in 2000; the earlier row takes the better rank
+    ranks = rank_matrix(values)["ranks"][:, 0]
+    assert (ranks[1], ranks[2]) == (1, 2)
+
+
+def test_top_and_bottom_skip_missing(values):
+    top, bottom = top_bottom(rank_matrix(values), 0, n=2)
+    assert list(NAMES[top]) == ["Beta", "Gamma"]
+    assert list(NAMES[bottom]) == ["Delta", "Alpha"]
+    top, bottom = top_bottom(rank_matrix(values), 2, n=10)
+    assert len(top) == len(bottom) == 4
+
+
+def test_movers_only_cover_countries_ranked_in_both_years(values):
+    movers = rank_movers(rank_matrix(values), NAMES, 0, 2)
+    assert set(movers["Country"]) == {"Alpha", "Gamma", "Delta"}
+    changes = dict(zip(movers["Country"], movers["Rank Change"]))
+    assert changes == {"Alpha": 2, "Gamma": -2, "Delta": 1}
+    assert list(movers["Rank Change"]) == sorted(changes.values(), reverse=True)
+    assert movers["Start Rank"].dtype.kind == "i"
+
+
+def test_history_drops_unranked_years(values):
+    history = rank_history(rank_matrix(values), NAMES, YEARS, np.array([1, 4]))
+    assert len(history) == 4
+    assert list(history[history["Country"] == "Beta"]["Year"]) == [2000, 2001]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import shared
+from analytics.compact import compact_frame
+from analytics.datasets import read_dataset
+
+
+@pytest.fixture
+def plane(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared, "PLANE_DIR", tmp_path)
+    monkeypatch.setattr(shared, "VERSIONS_DIR", tmp_path / "versions")
+    monkeypatch.setattr(shared, "CURRENT", tmp_path / "current")
+    shared.plane_index.cache_clear()
+    yield shared
+    shared.plane_index.cache_clear()
+
+
+def test_write_read_round_trip(tmp_path):
+    frame = pd.DataFrame({
+        "Country": pd.Categorical(["A", "B", "A"]),
+        "Label": ["x", "y", "z"],
+        "Year": np.array([2000, 2001, 2002], dtype=np.int16),
+        "Value": [1.5, np.nan, 3.0],
+    })
+    obj = {"frame": frame, "matrix": np.arange(6.0).reshape(2, 3), "names": np.array(["p", "q"])}
+    files = []
+    spec = shared._write(obj, tmp_path, files)
+    assert len(files) == 4  # category codes, Year, Value and the matrix; labels stay in the spec
+    back = shared._read(spec, tmp_path)
+    pd.testing.assert_frame_equal(back["frame"], frame, check_dtype=False)
+    assert back["frame"]["Year"].dtype == np.int16
+    np.testing.assert_array_equal(back["matrix"], obj["matrix"])
+    np.testing.assert_array_equal(back["names"], obj["names"])
+    # Numeric arrays are mapped from the files, read-only
+    assert not back["matrix"].flags.writeable
+
+
+def test_publish_and_attach(plane):
+    version = plane.publish()
+    assert plane.current_version() == version
+    gdp = plane.attach_dataset(version, "gdp")
+    expected = compact_frame(read_dataset("gdp"))
+    pd.testing.assert_frame_equal(gdp, expected, check_dtype=False, check_categorical=False)
+    # GDP levels keep float64 precision in the plane
+    assert gdp.select_dtypes("number").dtypes.eq(np.float64).all()
+    cube = plane.attach_cube(version)
+    assert cube
+
+
+def test_publishing_the_same_build_again_keeps_the_version(plane):
+    first = plane.publish()
+    mtime = (plane.VERSIONS_DIR / first / "plane.json").stat().st_mtime_ns
+    assert plane.publish() == first
+    assert (plane.VERSIONS_DIR / first / "plane.json").stat().st_mtime_ns == mtime
+    assert [path.name for path in plane.VERSIONS_DIR.iterdir()] == [first]
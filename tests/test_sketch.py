@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from analytics.sketch import (
+    kll_sketch, merge_sketches, quantile_bounds, rank_error, sketch_index, sketch_quantiles, union_sketch,
+)
+
+QS = np.array([0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+
+
+def _rank(values, x):
+    # Fraction of the values at or below x
+    return np.searchsorted(np.sort(values), x, side="right") / len(values)
+
+
+def test_small_input_is_exact():
+    values = np.random.default_rng(1).lognormal(8, 1, 150)
+    sketch = kll_sketch(values)
+    assert rank_error(sketch) == 0
+    np.testing.assert_allclose(sketch_quantiles(sketch, QS), np.quantile(values, QS))
+
+
+def test_quantiles_within_rank_error_bound():
+    values = np.random.default_rng(2).lognormal(8, 1.5, 200_000)
+    sketch = kll_sketch(values)
+    error = rank_error(sketch)
+    assert 0 < error < 0.02
+    ranks = _rank(values, sketch_quantiles(sketch, QS))
+    assert np.all(np.abs(ranks - QS) <= error + 1 / len(values))
+    # The true quantile lies inside the interval quantile_bounds gives for it
+    low, _, high = quantile_bounds(sketch, QS)
+    truth = np.quantile(values, QS)
+    assert np.all((low <= truth) & (truth <= high))
+
+
+def test_merged_sketches_stay_within_bound():
+    rng = np.random.default_rng(3)
+    parts = [rng.normal(loc, 1.0, 20_000) for loc in (0.0, 1.0, 5.0, 10.0)]
+    merged = merge_sketches(kll_sketch(part, seed=i) for i, part in enumerate(parts))
+    values = np.concatenate(parts)
+    assert merged["n"] == len(values)
+    ranks = _rank(values, sketch_quantiles(merged, QS))
+    assert np.all(np.abs(ranks - QS) <= rank_error(merged) + 1 / len(values))
+
+
+def test_union_of_years_and_groups():
+    rng = np.random.default_rng(4)
+    values = rng.lognormal(9, 1, (600, 5))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    groups = np.array(["North", "South", "East"] * 200)
+    index = sketch_index(values, np.arange(2000, 2005), groups)
+    sketch = union_sketch(index, years=[2001, 2003], groups=["North", "East"])
+    chosen = values[np.isin(groups, ["North", "East"])][:, [1, 3]]
+    chosen = chosen[~np.isnan(chosen)]
+    assert sketch["n"] == len(chosen)
+    median = sketch_quantiles(sketch, 0.5)[0]
+    assert abs(_rank(chosen, median) - 0.5) <= rank_error(sketch) + 1 / len(chosen)
+
+
+def test_empty_sketch():
+    sketch = kll_sketch(np.array([np.nan, np.nan]))
+    assert sketch["n"] == 0
+    assert np.isnan(rank_error(sketch))
+    assert np.isnan(sketch_quantiles(sketch, [0.5])).all()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_worst_case_bound_holds(seed):
+    values = np.random.default_rng(seed).standard_cauchy(50_000)
+    sketch = kll_sketch(values, k=50, seed=seed)
+    ranks = _rank(values, sketch_quantiles(sketch, QS))
+    assert np.all(np.abs(ranks - QS) <= sketch["error"] / sketch["n"] + 1 / len(values))
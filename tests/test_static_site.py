@@ -0,0 +1,25 @@
+import pytest
+
+from tools.static_site import MARKER, build_site, main
+
+
+def test_refuses_to_replace_a_directory_it_did_not_write(tmp_path):
+    (tmp_path / "notes.txt").write_text("keep me")
+    with pytest.raises(FileExistsError):
+        build_site(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["-o", str(tmp_path)])
+    assert (tmp_path / "notes.txt").read_text() == "keep me"
+
+
+def test_rebuilds_its_own_output_and_forced_directories(tmp_path):
+    out_dir = tmp_path / "site"
+    out_dir.mkdir()
+    (out_dir / "stale.txt").write_text("")
+    build_site(out_dir, force=True)
+    assert (out_dir / MARKER).exists()
+    assert not (out_dir / "stale.txt").exists()
+    (out_dir / "stale.txt").write_text("")
+    build_site(out_dir)
+    assert (out_dir / "index.html").exists()
+    assert not (out_dir / "stale.txt").exists()
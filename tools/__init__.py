@@ -0,0 +1 @@
+# Developer tooling run from the repository root, e.g. python -m tools.loadtest.
@@ -0,0 +1,108 @@
+import argparse
+import gzip
+import time
+
+import pandas as pd
+import plotly.io as pio
+from streamlit.testing.v1 import AppTest
+
+import analytics.compact
+import components.charts
+from analytics.compact import compact_figure
+from tools.loadtest import ROOT, SCENARIOS
+
+PAGE_FILES = {
+    "GDP Visualization": "pages/gdp_visualization.py",
+    "GDP Per Capita": "pages/GDP_Per_Capita.py",
+    "GDP Growth": "pages/gdp_growth_visualization.py",
+    "Unemployment Rate": "pages/unemployement_rate_visualization.py",
+    "Okun's Law": "pages/okun_law.py",
+    "GDP Scenarios": "pages/gdp_scenarios.py",
+}
+
+
+def _payload(fig, engine):
+    # The spec string st.plotly_chart puts on the wire for this figure, and the CPU seconds
+    # spent producing it (thread time, so the app's own threads are not counted)
+    start = time.thread_time()
+    spec = pio.to_json(fig.to_dict(), validate=False, engine=engine)
+    return spec, time.thread_time() - start
+
+
+def measure(fig, repeat=5):
+    # Default path (stdlib json, figure as built) against the path plotly_chart takes
+    # (compact_figure + the engine components.charts configures, orjson when installed);
+    # gzip sizes stand in for the websocket's permessage-deflate compression
+    plain_spec, compact_spec = None, None
+    plain_cpu, compact_cpu = [], []
+    for _ in range(repeat):
+        plain_spec, cpu = _payload(fig, "json")
+        plain_cpu.append(cpu)
+        start = time.thread_time()
+        compact = compact_figure(fig)
+        compact_cpu_extra = time.thread_time() - start
+        compact_spec, cpu = _payload(compact, pio.json.config.default_engine)
+        compact_cpu.append(cpu + compact_cpu_extra)
+    return {
+        "Bytes": len(plain_spec),
+        "Compact Bytes": len(compact_spec),
+        "Gzip Bytes": len(gzip.compress(plain_spec.encode())),
+        "Compact Gzip Bytes": len(gzip.compress(compact_spec.encode())),
+        "CPU (ms)": min(plain_cpu) * 1000,
+        "Compact CPU (ms)": min(compact_cpu) * 1000,
+    }
+
+
+def collect_figures():
+    # Every figure the pages compact, in plotly_chart or in their cached figure builders,
+    # while the load-test scenarios are driven through AppTest, recorded before compaction
+    figures = []
+
+    def record(fig, tolerance=1e-6):
+        figures.append((page, step, fig))
+        return compact_figure(fig, tolerance)
+
+    analytics.compact.compact_figure = components.charts.compact_figure = record
+    try:
+        for page, steps in SCENARIOS.items():
+            step = "open"
+            at = AppTest.from_file(f"{ROOT}/{PAGE_FILES[page]}", default_timeout=120).run()
+            for kind, label, value in steps:
+                step = f"{label}={value}"
+                widget = [w for w in getattr(at, kind) if w.label == label][-1]
+                if kind == "button":
+                    widget.click()
+                else:
+                    widget.set_value(value)
+                at.run()
+    finally:
+        analytics.compact.compact_figure = components.charts.compact_figure = compact_figure
+    return figures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare chart payload size and serialization CPU, default versus compact path.")
+    parser.add_argument("-o", "--output", help="write the per-chart results to this CSV file")
+    args = parser.parse_args(argv)
+
+    rows, seen = [], set()
+    for page, step, fig in collect_figures():
+        title = fig.layout.title.text or f"({fig.data[0].type if fig.data else 'empty'})"
+        if (page, title) in seen:
+            continue
+        seen.add((page, title))
+        rows.append({"Page": page, "Chart": title[:60], **measure(fig)})
+
+    results = pd.DataFrame(rows).sort_values("Bytes", ascending=False)
+    totals = results.drop(columns=["Page", "Chart"]).sum()
+    print(results.round(1).to_string(index=False))
+    print()
+    print(f"{len(results)} charts: {totals['Bytes'] / 1024:,.0f} KB -> {totals['Compact Bytes'] / 1024:,.0f} KB "
+          f"({totals['Compact Gzip Bytes'] / 1024:,.0f} KB with websocket compression), "
+          f"serialization {totals['CPU (ms)']:,.1f} ms -> {totals['Compact CPU (ms)']:,.1f} ms")
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
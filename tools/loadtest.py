@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Widget sequence each simulated user drives on every page of app.py's navigation,
+# as (widget kind, label, value) in the order a user clicking through would produce
+SCENARIOS = {
+    "GDP Visualization": [
+        ("radio", "Go to", "Country Analysis"),
+        ("radio", "Go to", "Comparison"),
+        ("radio", "Go to", "Distribution"),
+        ("radio", "Go to", "Top/Bottom Performers"),
+        ("slider", "Select Year", 2010),
+        ("radio", "Go to", "World Map"),
+        ("radio", "Go to", "CAGR Calculator"),
+        ("radio", "Go to", "Regional Breakdown"),
+        ("radio", "Go to", "Inequality"),
+    ],
+    "GDP Per Capita": [
+        ("button", "Graphical Analysis", True),
+        ("button", "Statistical Analysis", True),
+        ("slider", "Select Year", 2010),
+        ("button", "Convergence Analysis", True),
+        ("button", "Inequality Analysis", True),
+    ],
+    "GDP Growth": [
+        ("selectbox", "Go to", "Comparison"),
+        ("selectbox", "Go to", "Distribution"),
+        ("selectbox", "Go to", "Global Insights"),
+        ("slider", "Select Year", 2009),
+        ("selectbox", "Go to", "Recession Events"),
+        ("selectbox", "Go to", "CAGR Calculator"),
+    ],
+    "Unemployment Rate": [
+        ("slider", "Select Year", 2010),
+        ("selectbox", "Select Region", "South Asia"),
+        ("selectbox", "Search Country", "India"),
+    ],
+    "Okun's Law": [
+        ("selectbox", "Select Country", "Spain"),
+        ("radio", "Map", "Threshold Growth (%)"),
+    ],
+    "GDP Scenarios": [
+        ("selectbox", "Country", "China"),
+        ("selectbox", "Passes", "United States"),
+        ("slider", "By", 2035),
+    ],
+}
+WIDGET_KINDS = ("radio", "selectbox", "slider", "button", "multiselect")
+
+
+def start_server(port, timeout=60):
+    # A headless server for app.py on the given port, returned once its health check answers
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError(f"Streamlit server did not start on port {port} within {timeout}s")
+
+
+def server_rss(pid):
+    # Resident memory of the server process in bytes (NaN when it cannot be read)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def _widget_state(kind, widget_id, value):
+    state = WidgetState(id=widget_id)
+    if kind == "button":
+        state.trigger_value = True
+    elif kind == "slider":
+        state.double_array_value.data.append(value)
+    elif kind == "multiselect":
+        state.string_array_value.data.extend(value)
+    else:
+        state.string_value = value
+    return state
+
+
+async def _rerun(ws, page_hash, widget_states, widgets):
+    # Send one rerun and read the session's messages until the script finishes. Returns the
+    # rerun latency, the page hashes from the navigation (if sent) and the exceptions shown.
+    msg = BackMsg()
+    msg.rerun_script.page_script_hash = page_hash
+    msg.rerun_script.widget_states.widgets.extend(widget_states.values())
+    start = time.perf_counter()
+    await ws.send(msg.SerializeToString())
+
+    pages, errors = None, 0
+    while True:
+        forward = ForwardMsg()
+        forward.ParseFromString(await ws.recv())
+        kind = forward.WhichOneof("type")
+        if kind == "navigation":
+            pages = {page.page_name: page.page_script_hash for page in forward.navigation.app_pages}
+        elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+            element = forward.delta.new_element
+            element_kind = element.WhichOneof("type")
+            if element_kind in WIDGET_KINDS:
+                widget = getattr(element, element_kind)
+                widgets[element_kind, widget.label] = widget.id
+            elif element_kind == "exception":
+                errors += 1
+        elif kind == "script_finished":
+            return time.perf_counter() - start, pages, errors
+
+
+async def simulate_user(url, rounds, think_time, records):
+    # One browser session: land on the app, then open every page and drive its widgets
+    async with connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        widgets = {}
+        latency, pages, errors = await _rerun(ws, "", {}, widgets)
+        records.append({"page": "(landing)", "step": "open", "latency": latency, "errors": errors})
+
+        for _ in range(rounds):
+            for page, steps in SCENARIOS.items():
+                widgets.clear()
+                widget_states = {}
+                latency, _, errors = await _rerun(ws, pages[page], widget_states, widgets)
+                records.append({"page": page, "step": "open", "latency": latency, "errors": errors})
+
+                for kind, label, value in steps:
+                    await asyncio.sleep(think_time)
+                    widget_id = widgets.get((kind, label))
+                    if widget_id is None:
+                        records.append({"page": page, "step": label, "latency": np.nan, "errors": 1})
+                        continue
+                    widget_states[widget_id] = _widget_state(kind, widget_id, value)
+                    latency, _, errors = await _rerun(ws, pages[page], widget_states, widgets)
+                    records.append({"page": page, "step": f"{label}={value}", "latency": latency, "errors": errors})
+                    # Buttons only fire on the rerun they were clicked in
+                    if kind == "button":
+                        del widget_states[widget_id]
+
+
+async def _sample_rss(pid, samples, interval=0.25):
+    while True:
+        samples.append(server_rss(pid))
+        await asyncio.sleep(interval)
+
+
+async def run_level(url, users, rounds, think_time, pid=None):
+    # n concurrent users against the server; returns the per-rerun records and a summary row
+    records, rss = [], []
+    sampler = asyncio.create_task(_sample_rss(pid, rss)) if pid else None
+    start = time.perf_counter()
+    await asyncio.gather(*(simulate_user(url, rounds, think_time, records) for _ in range(users)))
+    wall = time.perf_counter() - start
+    if sampler:
+        sampler.cancel()
+
+    frame = pd.DataFrame(records)
+    latency_ms = frame["latency"].dropna().to_numpy() * 1000
+    p50, p95, p99 = np.percentile(latency_ms, [50, 95, 99])
+    summary = {
+        "Users": users,
+        "Reruns": len(latency_ms),
+        "Throughput (reruns/s)": len(latency_ms) / wall,
+        "p50 (ms)": p50,
+        "p95 (ms)": p95,
+        "p99 (ms)": p99,
+        "Errors": int(frame["errors"].sum()),
+        "Peak RSS (MB)": np.nanmax(rss) / 2**20 if rss else np.nan,
+    }
+    return frame.assign(users=users), summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard users and report rerun latency and server memory.")
+    parser.add_argument("-u", "--users", default="1,2,4,8", help="comma-separated concurrent user counts to ramp through (default: 1,2,4,8)")
+    parser.add_argument("-r", "--rounds", type=int, default=1, help="passes through every page per user (default: 1)")
+    parser.add_argument("-t", "--think-time", type=float, default=0.0, help="seconds each user waits between interactions (default: 0)")
+    parser.add_argument("-p", "--port", type=int, default=8599, help="port for the local server (default: 8599)")
+    parser.add_argument("--url", help="websocket URL of an already running server instead of starting one, e.g. ws://host:8501/_stcore/stream")
+    parser.add_argument("--pid", type=int, help="process id of that server, for RSS sampling")
+    parser.add_argument("-o", "--output", help="write the per-rerun latencies to this CSV file")
+    args = parser.parse_args(argv)
+    levels = [int(users) for users in args.users.split(",")]
+
+    server = None
+    url, pid = args.url, args.pid
+    if url is None:
+        server = start_server(args.port)
+        url, pid = f"ws://localhost:{args.port}/_stcore/stream", server.pid
+
+    try:
+        # One warm-up session so the shared caches are built before anything is timed
+        asyncio.run(run_level(url, 1, 1, 0.0))
+        frames, summary = [], []
+        for users in levels:
+            frame, row = asyncio.run(run_level(url, users, args.rounds, args.think_time, pid))
+            frames.append(frame)
+            summary.append(row)
+            print(f"{users} users: p95 {row['p95 (ms)']:.0f} ms, {row['Throughput (reruns/s)']:.1f} reruns/s", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(pd.DataFrame(summary).round(1).to_string(index=False))
+    if args.output:
+        pd.concat(frames).to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+// Year/country explorer for one static page. The page embeds window.SITE (data path,
+// measure, labels and the prebuilt figures); the per-year and per-country chunks are
+// fetched on demand and kept in memory, so moving back to a year costs nothing.
+(function () {
+  const site = window.SITE;
+  const chunks = new Map();
+
+  function load(path) {
+    if (!chunks.has(path)) {
+      chunks.set(path, fetch(site.data + path).then((response) => response.json()));
+    }
+    return chunks.get(path);
+  }
+
+  function drawYear(index, year, values) {
+    Plotly.react("map", [{
+      type: "choropleth",
+      locations: index.codes,
+      z: values,
+      text: index.names,
+      colorscale: site.colorscale,
+      colorbar: { title: { text: site.label } },
+    }], { title: { text: `${site.measure} in ${year}` }, margin: { t: 50, l: 0, r: 0, b: 0 } });
+
+    const top = index.codes
+      .map((code, i) => ({ name: index.names[i], value: values[i] }))
+      .filter((row) => row.value !== null)
+      .sort((a, b) => b.value - a.value)
+      .slice(0, 10);
+    Plotly.react("top", [{
+      type: "bar",
+      x: top.map((row) => row.name),
+      y: top.map((row) => row.value),
+    }], { title: { text: `Top 10 in ${year}` }, yaxis: { title: { text: site.label } } });
+  }
+
+  function drawTrend(index, selected, series) {
+    Plotly.react("trend", selected.map((i, k) => ({
+      type: "scatter",
+      mode: "lines",
+      name: index.names[i],
+      x: index.years,
+      y: series[k],
+    })), { title: { text: `${site.measure} Over Time` }, xaxis: { title: { text: "Year" } }, yaxis: { title: { text: site.label } } });
+  }
+
+  load("index.json").then((index) => {
+    const yearSelect = document.getElementById("year");
+    const countrySelect = document.getElementById("countries");
+    index.years.forEach((year) => yearSelect.add(new Option(year, year)));
+    index.names.forEach((name, i) => countrySelect.add(new Option(name, i)));
+
+    // Open on the latest year and the five largest economies in it
+    yearSelect.value = index.years[index.years.length - 1];
+    load(`years/${yearSelect.value}.json`).then((values) => {
+      values
+        .map((value, i) => [value === null ? -Infinity : value, i])
+        .sort((a, b) => b[0] - a[0])
+        .slice(0, 5)
+        .forEach(([, i]) => { countrySelect.options[i].selected = true; });
+      countrySelect.dispatchEvent(new Event("change"));
+    });
+
+    yearSelect.addEventListener("change", () => {
+      const year = yearSelect.value;
+      load(`years/${year}.json`).then((values) => drawYear(index, year, values));
+    });
+    countrySelect.addEventListener("change", () => {
+      const selected = Array.from(countrySelect.selectedOptions, (option) => Number(option.value));
+      Promise.all(selected.map((i) => load(`countries/${index.codes[i]}.json`)))
+        .then((series) => drawTrend(index, selected, series));
+    });
+    yearSelect.dispatchEvent(new Event("change"));
+  });
+
+  const container = document.getElementById("figures");
+  site.figures.forEach((figure) => {
+    const div = document.createElement("div");
+    div.className = "chart";
+    container.appendChild(div);
+    Plotly.newPlot(div, figure.data, figure.layout);
+  });
+})();
@@ -0,0 +1,198 @@
+import argparse
+import json
+import shutil
+from pathlib import Path
+from string import Template
+
+import numpy as np
+import plotly.express as px
+from plotly.offline import get_plotlyjs
+
+from analytics.convergence import convergence_panel
+from analytics.cube import build_cube, country_values, rollup
+from analytics.inequality import inequality_panel
+
+TEMPLATES = Path(__file__).parent / "static"
+ACTIVE = ' class="active"'
+# Left in every output directory, so a rebuild only ever replaces a directory it wrote itself
+MARKER = ".static-site"
+
+# Static counterpart of each page in app.py's navigation, at the same URL path. Every page
+# gets a year/country explorer for its measure plus a few figures that need no input.
+PAGES = {
+    "gdp_visualization": {
+        "title": "GDP Visualization",
+        "measure": "GDP",
+        "dataset": "gdp",
+        "label": "GDP (USD)",
+        "colorscale": "Plasma",
+    },
+    "GDP_Per_Capita": {
+        "title": "GDP Per Capita",
+        "measure": "GDP per Capita",
+        "dataset": "gdp_per_capita",
+        "label": "GDP per Capita (PPP, USD)",
+        "colorscale": "Viridis",
+    },
+    "gdp_growth_visualization": {
+        "title": "GDP Growth",
+        "measure": "GDP Growth",
+        "dataset": "gdp_growth",
+        "label": "GDP Growth (%)",
+        "colorscale": "RdYlGn",
+    },
+    "unemployement_rate_visualization": {
+        "title": "Unemployment Rate",
+        "measure": "Unemployment Rate",
+        "dataset": "unemployment",
+        "label": "Unemployment Rate (%)",
+        "colorscale": "Viridis",
+    },
+}
+
+
+def _slug(measure):
+    return measure.lower().replace(" ", "_")
+
+
+def _number(value):
+    value = float(f"{value:.6g}")
+    return int(value) if value.is_integer() else value
+
+
+def _compact(values):
+    # Six significant digits and null for missing values keep the chunks small
+    return [None if np.isnan(v) else _number(v) for v in values]
+
+
+def _write_json(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, separators=(",", ":")))
+
+
+def write_measure_chunks(cube, measure, dataset, out_dir):
+    # index.json lists the countries and years; years/<year>.json and countries/<code>.json hold
+    # one cross-section or one series each, so the browser only loads what is on screen
+    countries = cube["levels"]["Country"]
+    values = country_values(cube, dataset)
+    observed = ~np.isnan(values)
+    rows = observed.any(axis=1)
+    cols = observed.any(axis=0)
+    codes, names = countries["members"][rows], countries["names"][rows]
+    years, values = cube["years"][cols], values[rows][:, cols]
+
+    base = out_dir / "data" / _slug(measure)
+    _write_json(base / "index.json", {
+        "measure": measure,
+        "years": years.tolist(),
+        "codes": codes.tolist(),
+        "names": names.tolist(),
+    })
+    for j, year in enumerate(years):
+        _write_json(base / "years" / f"{year}.json", _compact(values[:, j]))
+    for i, code in enumerate(codes):
+        _write_json(base / "countries" / f"{code}.json", _compact(values[i]))
+
+
+def _rollup_long(cube, level, measure):
+    frame = rollup(cube, level, measure).T.reset_index(names="Year")
+    return frame.melt(id_vars="Year", var_name=level, value_name=measure).dropna()
+
+
+def page_figures(cube, page):
+    # Figures that are the same for every visitor, rendered once at build time
+    if page == "gdp_visualization":
+        world = _rollup_long(cube, "World", "GDP")
+        return [
+            px.line(world, x="Year", y="GDP", title="Total Global GDP Over Time", labels={"GDP": "Total GDP (USD)"}),
+            px.area(_rollup_long(cube, "Region", "GDP"), x="Year", y="GDP", color="Region", title="GDP by Region Over Time"),
+        ]
+    if page == "GDP_Per_Capita":
+        values = country_values(cube, "gdp_per_capita")
+        keep = ~np.isnan(values).all(axis=0)
+        years, values = cube["years"][keep], values[:, keep]
+        convergence = convergence_panel(values, years)
+        inequality = inequality_panel(values, years)
+        return [
+            px.line(x=years, y=convergence["sigma"], title="Sigma Convergence: Dispersion of Log GDP per Capita",
+                    labels={"x": "Year", "y": "Std. Dev. of Log GDP per Capita"}),
+            px.line(x=years, y=inequality["gini"], title="Gini Coefficient of GDP per Capita Across Countries",
+                    labels={"x": "Year", "y": "Gini"}),
+        ]
+    if page == "gdp_growth_visualization":
+        return [
+            px.line(_rollup_long(cube, "Region", "GDP Growth"), x="Year", y="GDP Growth", color="Region",
+                    title="GDP-Weighted Real GDP Growth by Region", labels={"GDP Growth": "GDP Growth (%)"}),
+        ]
+    return [
+        px.line(_rollup_long(cube, "Region", "Unemployment Rate"), x="Year", y="Unemployment Rate", color="Region",
+                title="GDP-Weighted Unemployment Rate by Region", labels={"Unemployment Rate": "Unemployment Rate (%)"}),
+    ]
+
+
+def write_page(cube, page, out_dir):
+    spec = PAGES[page]
+    figures = [json.loads(fig.to_json()) for fig in page_figures(cube, page)]
+    config = {
+        "data": f"../data/{_slug(spec['measure'])}/",
+        "measure": spec["measure"],
+        "label": spec["label"],
+        "colorscale": spec["colorscale"],
+        "figures": figures,
+    }
+    nav = "\n".join(
+        f'<a href="../{path}/"{ACTIVE if path == page else ""}>{other["title"]}</a>'
+        for path, other in PAGES.items()
+    )
+    html = Template((TEMPLATES / "page.html").read_text()).substitute(
+        title=spec["title"],
+        nav=nav,
+        # "</" would end the inline <script> early
+        config=json.dumps(config, separators=(",", ":")).replace("</", "<\\/"),
+    )
+    (out_dir / page).mkdir(parents=True, exist_ok=True)
+    (out_dir / page / "index.html").write_text(html)
+
+
+def build_site(out_dir, force=False):
+    out_dir = Path(out_dir)
+    if out_dir.exists():
+        if not (out_dir / MARKER).exists() and any(out_dir.iterdir()) and not force:
+            raise FileExistsError(f"{out_dir} exists and was not written by an earlier build; pass --force to replace it")
+        shutil.rmtree(out_dir)
+    assets = out_dir / "assets"
+    assets.mkdir(parents=True)
+    (out_dir / MARKER).touch()
+    (assets / "plotly.min.js").write_text(get_plotlyjs())
+    shutil.copy(TEMPLATES / "controller.js", assets / "controller.js")
+    shutil.copy(TEMPLATES / "style.css", assets / "style.css")
+
+    cube = build_cube()
+    for page, spec in PAGES.items():
+        write_measure_chunks(cube, spec["measure"], spec["dataset"], out_dir)
+        write_page(cube, page, out_dir)
+
+    # The site root opens the first page, like the app's default navigation entry
+    first = next(iter(PAGES))
+    (out_dir / "index.html").write_text(
+        f'<!DOCTYPE html><meta http-equiv="refresh" content="0; url={first}/"><a href="{first}/">{PAGES[first]["title"]}</a>\n'
+    )
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the dashboard into a static site that can be served from a CDN.")
+    parser.add_argument("-o", "--output", default="site", help="output directory, replaced if an earlier build wrote it (default: site)")
+    parser.add_argument("--force", action="store_true", help="replace the output directory even if it holds other files")
+    args = parser.parse_args(argv)
+    try:
+        out_dir = build_site(args.output, args.force)
+    except FileExistsError as error:
+        parser.error(str(error))
+    files = [path for path in out_dir.rglob("*") if path.is_file()]
+    size = sum(path.stat().st_size for path in files)
+    print(f"Wrote {len(files):,} files ({size / 2**20:,.1f} MB) to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from analytics.mapimage import SHAPES_PATH, SHAPES_SCALE, equal_earth
+
+# Natural Earth leaves some ISO codes blank (-99); these are matched by name instead
+ISO_BY_NAME = {"France": "FRA", "Norway": "NOR", "Kosovo": "XKX"}
+# Simplification tolerance in projected units; a 1000-pixel-wide map has about 0.0054 per pixel
+TOLERANCE = 0.0025
+
+
+def read_dbf(path):
+    # Records of a dBase table as dicts of stripped strings
+    data = Path(path).read_bytes()
+    n_records, header_length, record_length = struct.unpack("<IHH", data[4:12])
+    fields, offset = [], 32
+    while data[offset] != 0x0D:
+        name = data[offset:offset + 11].split(b"\0")[0].decode("ascii")
+        fields.append((name, data[offset + 16]))
+        offset += 32
+    records = []
+    for i in range(n_records):
+        start = header_length + i * record_length + 1  # skip the deletion flag
+        record = {}
+        for name, length in fields:
+            record[name] = data[start:start + length].decode("utf-8", errors="replace").strip()
+            start += length
+        records.append(record)
+    return records
+
+
+def read_polygons(path):
+    # Rings of every polygon record of an ESRI shapefile, as lists of (lon, lat) arrays
+    data = Path(path).read_bytes()
+    offset, shapes = 100, []
+    while offset < len(data):
+        _, length = struct.unpack(">ii", data[offset:offset + 8])
+        content = data[offset + 8:offset + 8 + 2 * length]
+        offset += 8 + 2 * length
+        shape_type = struct.unpack("<i", content[:4])[0]
+        if shape_type != 5:
+            shapes.append([])
+            continue
+        n_parts, n_points = struct.unpack("<ii", content[36:44])
+        parts = list(struct.unpack(f"<{n_parts}i", content[44:44 + 4 * n_parts])) + [n_points]
+        points = np.frombuffer(content, "<f8", 2 * n_points, 44 + 4 * n_parts).reshape(n_points, 2)
+        shapes.append([points[parts[k]:parts[k + 1]] for k in range(n_parts)])
+    return shapes
+
+
+def simplify(points, tolerance):
+    # Douglas-Peucker: keep the points that deviate from the chord by more than the tolerance
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        chord = points[last] - points[first]
+        between = points[first + 1:last] - points[first]
+        norm = np.hypot(*chord)
+        if norm == 0:
+            distance = np.hypot(between[:, 0], between[:, 1])
+        else:
+            distance = np.abs(chord[0] * between[:, 1] - chord[1] * between[:, 0]) / norm
+        k = int(np.argmax(distance))
+        if distance[k] > tolerance:
+            keep[first + 1 + k] = True
+            stack += [(first, first + 1 + k), (first + 1 + k, last)]
+    return points[keep]
+
+
+def build_shapes(shapefile, output=SHAPES_PATH, tolerance=TOLERANCE):
+    # Project, simplify and quantize the country polygons of a Natural Earth admin-0 shapefile
+    # into the compact file analytics.mapimage draws from
+    shapefile = Path(shapefile)
+    records = read_dbf(shapefile.with_suffix(".dbf"))
+    shapes = read_polygons(shapefile)
+    codes, rings, ring_country = [], [], []
+    for record, shape in zip(records, shapes):
+        fields = {name.lower(): value for name, value in record.items()}
+        code = fields.get("iso_a3", "-99")
+        if code == "-99":
+            code = ISO_BY_NAME.get(fields.get("name", ""), code)
+        kept = []
+        for ring in shape:
+            projected = simplify(np.stack(equal_earth(ring[:, 0], ring[:, 1]), axis=1), tolerance)
+            if len(projected) >= 4:
+                kept.append(projected)
+        if not kept:
+            continue
+        codes.append(code)
+        rings += kept
+        ring_country += [len(codes) - 1] * len(kept)
+    points = np.concatenate(rings)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        output,
+        codes=np.array(codes),
+        ring_country=np.array(ring_country, dtype=np.int16),
+        ring_offsets=np.concatenate([[0], np.cumsum([len(ring) for ring in rings])]).astype(np.int32),
+        points=np.round(points * SHAPES_SCALE).astype(np.int16),
+    )
+    return output, len(codes), len(rings), len(points)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bundle simplified, pre-projected country polygons for the map images.")
+    parser.add_argument("shapefile", help="Natural Earth admin-0 countries shapefile (.shp, with its .dbf alongside)")
+    parser.add_argument("-o", "--output", default=str(SHAPES_PATH), help=f"output file (default: {SHAPES_PATH})")
+    parser.add_argument("-t", "--tolerance", type=float, default=TOLERANCE,
+                        help=f"simplification tolerance in projected units (default: {TOLERANCE})")
+    args = parser.parse_args(argv)
+    output, n_countries, n_rings, n_points = build_shapes(args.shapefile, args.output, args.tolerance)
+    print(f"Wrote {n_countries} countries, {n_rings:,} rings, {n_points:,} points "
+          f"({output.stat().st_size / 1024:,.1f} KB) to {output}")
+
+
+if __name__ == "__main__":
+    main()